@@ -0,0 +1,657 @@
+"""重複排除・差分圧縮つきのバックアップストア
+
+games.json のバックアップを内容のハッシュ（SHA-256）で管理する。
+    - 直前と同じ内容なら新しい版は作らない（同じ内容の古い版があればそれを参照する）
+    - 新しい版は直前の版との行単位の差分として zlib 圧縮して保存する
+      （差分が大きい場合や差分が MAX_CHAIN 段続いた場合は全体を保存する）
+    - 保持ポリシー（最新N件・1時間ごと・1日ごと・1週間ごと）で古い版を間引く
+    - 版の一覧は index.json にまとめてあるので、一覧表示で各版を開く必要はない
+    - 版ごとにゲーム単位のハッシュ（マニフェスト）を持ち、各版には直前の版から
+      追加・削除・変更されたゲームを記録しておく。2つの版の比較はその間の変更記録を
+      合成するだけなので、カタログ全体ではなく変更されたゲームの数に比例する
+
+保存先:
+    backup/store/index.json
+    backup/store/objects/<sha256>.z        全体（zlib圧縮）
+    backup/store/objects/<sha256>.delta.z  差分（zlib圧縮したJSON）
+    backup/store/manifests/<sha256>.json   ゲームキー → ゲームのハッシュ
+
+コマンドラインからも操作できる:
+    python backup_store.py list
+    python backup_store.py import-legacy
+    python backup_store.py prune
+    python backup_store.py diff <比較元の版> <比較先の版>
+    python backup_store.py export <版ID> <出力先>
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+import zlib
+from bisect import bisect_left
+from datetime import datetime
+
+from catalog_store import atomic_write_bytes
+from game_record import Game, json_default
+
+DEFAULT_BACKUP_DIR = "backup"
+STORE_DIRNAME = "store"
+INDEX_VERSION = 1
+TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+
+# 差分をたどる最大段数（これを超えたら全体を保存する）
+MAX_CHAIN = 16
+
+# 旧形式のバックアップファイル名
+LEGACY_PATTERN = re.compile(r"games_backup_(\d{8}_\d{6})\.json$")
+
+
+class RetentionPolicy:
+    """バックアップの保持ポリシー
+
+    最新 keep_last 件に加えて、直近 hourly 時間・daily 日・weekly 週について
+    それぞれの期間の最新の版を1つずつ残す。
+    """
+
+    def __init__(self, keep_last=10, hourly=24, daily=14, weekly=8):
+        self.keep_last = keep_last
+        self.hourly = hourly
+        self.daily = daily
+        self.weekly = weekly
+
+    def select(self, snapshots):
+        """残す版のインデックスを返す
+
+        Args:
+            snapshots (list): タイムスタンプの古い順に並んだ版
+        """
+        order = sorted(range(len(snapshots)), key=lambda i: snapshots[i]["timestamp"], reverse=True)
+        kept = set(order[:self.keep_last])
+
+        buckets = (
+            (self.hourly, lambda t: t.strftime("%Y%m%d%H")),
+            (self.daily, lambda t: t.strftime("%Y%m%d")),
+            (self.weekly, lambda t: "%d-%02d" % t.isocalendar()[:2]),
+        )
+        for count, bucket_of in buckets:
+            seen = set()
+            for i in order:
+                if len(seen) >= count:
+                    break
+                bucket = bucket_of(datetime.strptime(snapshots[i]["timestamp"], TIMESTAMP_FORMAT))
+                if bucket not in seen:
+                    seen.add(bucket)
+                    kept.add(i)
+        return kept
+
+
+DEFAULT_RETENTION = RetentionPolicy()
+
+
+def make_delta(base_text, new_text):
+    """行単位の差分を作る
+
+    Returns:
+        list: ["c", 開始行, 終了行]（base からコピー）または ["i", 行...]（挿入）の列
+    """
+    base_lines = base_text.splitlines(keepends=True)
+    new_lines = new_text.splitlines(keepends=True)
+    ops = []
+    position = 0
+    for i, j, length in _matching_blocks(base_lines, new_lines):
+        if j > position:
+            ops.append(["i"] + new_lines[position:j])
+        if ops and ops[-1][0] == "c" and ops[-1][2] == i and j == position:
+            ops[-1][2] = i + length
+        else:
+            ops.append(["c", i, i + length])
+        position = j + length
+    if position < len(new_lines):
+        ops.append(["i"] + new_lines[position:])
+    return ops
+
+
+def _matching_blocks(a, b):
+    """a と b で一致する行のまとまり (a の位置, b の位置, 行数) を b の順に返す
+
+    games.json では "}," のような同じ行が何度も現れるので、difflib.SequenceMatcher では
+    大きなカタログで時間がかかりすぎる。先頭と末尾の一致を取り除き、残りは両方に1回だけ
+    現れる行（ゲーム名やURLの行）を目印にして区切る（patience diff と同じ考え方）。
+    """
+    blocks = []
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        a_low, a_high, b_low, b_high = stack.pop()
+        start = 0
+        while a_low + start < a_high and b_low + start < b_high and a[a_low + start] == b[b_low + start]:
+            start += 1
+        if start:
+            blocks.append((a_low, b_low, start))
+            a_low += start
+            b_low += start
+        end = 0
+        while a_low < a_high - end and b_low < b_high - end and a[a_high - end - 1] == b[b_high - end - 1]:
+            end += 1
+        if end:
+            blocks.append((a_high - end, b_high - end, end))
+            a_high -= end
+            b_high -= end
+        if a_low >= a_high or b_low >= b_high:
+            continue
+
+        previous_i, previous_j = a_low, b_low
+        anchors = _unique_anchors(a, a_low, a_high, b, b_low, b_high)
+        for i, j in anchors:
+            blocks.append((i, j, 1))
+            stack.append((previous_i, i, previous_j, j))
+            previous_i, previous_j = i + 1, j + 1
+        if anchors:
+            stack.append((previous_i, a_high, previous_j, b_high))
+    blocks.sort(key=lambda block: block[1])
+    return blocks
+
+
+def _unique_anchors(a, a_low, a_high, b, b_low, b_high):
+    # 範囲内でそれぞれ1回だけ現れる行の組のうち、順序が保たれる最長の並び
+    def unique_positions(lines, low, high):
+        positions = {}
+        for index in range(low, high):
+            line = lines[index]
+            positions[line] = -1 if line in positions else index
+        return positions
+
+    a_positions = unique_positions(a, a_low, a_high)
+    pairs = [(a_positions[line], j) for line, j in unique_positions(b, b_low, b_high).items()
+             if j >= 0 and a_positions.get(line, -1) >= 0]
+    pairs.sort(key=lambda pair: pair[1])
+
+    # a の位置の最長増加部分列（二分探索）
+    tails = []       # 長さ k+1 の増加列の末尾の a の位置
+    tail_index = []  # その pairs 上の添え字
+    previous = [-1] * len(pairs)
+    for index, (i, _) in enumerate(pairs):
+        k = bisect_left(tails, i)
+        if k == len(tails):
+            tails.append(i)
+            tail_index.append(index)
+        else:
+            tails[k] = i
+            tail_index[k] = index
+        previous[index] = tail_index[k - 1] if k > 0 else -1
+    result = []
+    index = tail_index[-1] if tail_index else -1
+    while index >= 0:
+        result.append(pairs[index])
+        index = previous[index]
+    result.reverse()
+    return result
+
+
+def apply_delta(base_text, ops):
+    """make_delta の差分を適用する"""
+    base_lines = base_text.splitlines(keepends=True)
+    parts = []
+    for op in ops:
+        if op[0] == "c":
+            parts.extend(base_lines[op[1]:op[2]])
+        else:
+            parts.extend(op[1:])
+    return "".join(parts)
+
+
+def game_hash(game):
+    """ゲーム1件の内容のハッシュ"""
+    canonical = json.dumps(game, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=json_default)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def keyed_games(games):
+    """ゲームにキーを付ける（キーはゲーム名。同名のゲームは2つ目以降に #2, #3...）
+
+    Returns:
+        list: (キー, ゲーム) のリスト
+    """
+    counts = {}
+    result = []
+    for game in games:
+        name = game.get("name", "") if isinstance(game, (dict, Game)) else ""
+        counts[name] = counts.get(name, 0) + 1
+        key = name if counts[name] == 1 else f"{name}#{counts[name]}"
+        result.append((key, game))
+    return result
+
+
+def build_manifest(games):
+    """ゲームキー → ゲームのハッシュ"""
+    return {key: game_hash(game) for key, game in keyed_games(games)}
+
+
+def diff_manifests(old, new):
+    """2つのマニフェストの差分 {キー: [前のハッシュ, 後のハッシュ]}（ないものはNone）"""
+    changes = {}
+    for key, before in old.items():
+        after = new.get(key)
+        if after != before:
+            changes[key] = [before, after]
+    for key, after in new.items():
+        if key not in old:
+            changes[key] = [None, after]
+    return changes
+
+
+def compose_changes(steps):
+    """連続する変更記録を1つにまとめる（元に戻った変更は消える）"""
+    net = {}
+    for changes in steps:
+        for key, (before, after) in changes.items():
+            if key in net:
+                net[key][1] = after
+            else:
+                net[key] = [before, after]
+    return {key: pair for key, pair in net.items() if pair[0] != pair[1]}
+
+
+# 比較結果の種類
+DIFF_ADDED = "added"
+DIFF_REMOVED = "removed"
+DIFF_CHANGED = "changed"
+
+
+def describe_changes(changes):
+    """変更記録を (キー, 種類, 前のハッシュ, 後のハッシュ) のリストにする"""
+    result = []
+    for key in sorted(changes):
+        before, after = changes[key]
+        if before is None:
+            kind = DIFF_ADDED
+        elif after is None:
+            kind = DIFF_REMOVED
+        else:
+            kind = DIFF_CHANGED
+        result.append((key, kind, before, after))
+    return result
+
+
+def count_games(data):
+    try:
+        return len(json.loads(data.decode('utf-8')))
+    except ValueError:
+        return None
+
+
+class BackupStore:
+    """内容アドレス方式のバックアップストア
+
+    Args:
+        backup_dir (str): バックアップフォルダ（従来の backup/）
+        retention (RetentionPolicy): 保持ポリシー
+    """
+
+    def __init__(self, backup_dir=DEFAULT_BACKUP_DIR, retention=DEFAULT_RETENTION):
+        self.backup_dir = backup_dir
+        self.retention = retention
+        self.store_dir = os.path.join(backup_dir, STORE_DIRNAME)
+        self.objects_dir = os.path.join(self.store_dir, "objects")
+        self.manifests_dir = os.path.join(self.store_dir, "manifests")
+        self.index_path = os.path.join(self.store_dir, "index.json")
+        self.objects = {}
+        self.snapshots = []
+        self._manifest_cache = {}
+        self._games_cache = {}
+        self._load_index()
+
+    # --- 一覧 ----------------------------------------------------------
+
+    def list_snapshots(self):
+        """版の一覧（新しい順）。index.json だけを読むので各版は開かない"""
+        return sorted(self.snapshots, key=lambda s: s["timestamp"], reverse=True)
+
+    def latest(self):
+        return max(self.snapshots, key=lambda s: s["timestamp"]) if self.snapshots else None
+
+    def find(self, snapshot_id):
+        """版ID（ハッシュの先頭部分でもよい）またはタイムスタンプから版を探す"""
+        for snapshot in self.list_snapshots():
+            if snapshot["timestamp"] == snapshot_id or snapshot["sha256"].startswith(snapshot_id):
+                return snapshot
+        return None
+
+    # --- 追加 ----------------------------------------------------------
+
+    def add(self, data, timestamp=None):
+        """内容を新しい版として追加
+
+        Args:
+            data (bytes): games.json の内容
+            timestamp (str): 版のタイムスタンプ（省略時は現在時刻）
+
+        Returns:
+            dict: 追加した版。直前の版と同じ内容なら None
+        """
+        timestamp = timestamp or datetime.now().strftime(TIMESTAMP_FORMAT)
+        sha = hashlib.sha256(data).hexdigest()
+
+        previous = self._previous_snapshot(timestamp)
+        if previous is not None and previous["sha256"] == sha:
+            return None
+        if any(s["timestamp"] == timestamp and s["sha256"] == sha for s in self.snapshots):
+            return None
+
+        if sha not in self.objects:
+            self._write_object(sha, data, previous["sha256"] if previous else None)
+        self._write_manifest(sha, data)
+
+        snapshot = {"timestamp": timestamp, "sha256": sha, "size": len(data), "games": count_games(data)}
+        self.snapshots.append(snapshot)
+        self.snapshots.sort(key=lambda s: s["timestamp"])
+
+        # 追加した版と、その次の版の変更記録を作る
+        position = self.snapshots.index(snapshot)
+        for i in (position, position + 1):
+            if i < len(self.snapshots):
+                self._compute_changes(i)
+        self._save_index()
+        return snapshot
+
+    def import_legacy(self, remove=False):
+        """旧形式の games_backup_*.json を取り込む
+
+        Args:
+            remove (bool): 取り込んだファイルを削除するかどうか
+
+        Returns:
+            tuple: (取り込んだ版の数, 重複としてスキップした数)
+        """
+        added = skipped = 0
+        paths = glob.glob(os.path.join(self.backup_dir, "games_backup_*.json"))
+        for path in sorted(paths, key=os.path.basename):
+            match = LEGACY_PATTERN.search(os.path.basename(path))
+            if not match:
+                continue
+            with open(path, 'rb') as f:
+                data = f.read()
+            if self.add(data, match.group(1)) is None:
+                skipped += 1
+            else:
+                added += 1
+            if remove:
+                os.remove(path)
+        return added, skipped
+
+    # --- 読み出し ------------------------------------------------------
+
+    def read(self, sha):
+        """版の内容（bytes）を復元する"""
+        chain = []
+        current = sha
+        while current is not None:
+            info = self.objects[current]
+            chain.append(current)
+            current = info.get("base")
+
+        text = None
+        for object_sha in reversed(chain):
+            info = self.objects[object_sha]
+            with open(self._object_path(object_sha, info), 'rb') as f:
+                payload = zlib.decompress(f.read())
+            if info.get("base") is None:
+                text = payload.decode('utf-8')
+            else:
+                text = apply_delta(text, json.loads(payload.decode('utf-8')))
+        return text.encode('utf-8')
+
+    def read_games(self, sha):
+        """版のゲーム一覧を読み込む（直近に読んだ版はキャッシュ）"""
+        if sha not in self._games_cache:
+            if len(self._games_cache) >= 4:
+                self._games_cache.pop(next(iter(self._games_cache)))
+            self._games_cache[sha] = json.loads(self.read(sha).decode('utf-8'))
+        return self._games_cache[sha]
+
+    def get_game(self, sha, key):
+        """版の中からキーに対応するゲームを返す（なければNone）"""
+        for game_key, game in keyed_games(self.read_games(sha)):
+            if game_key == key:
+                return game
+        return None
+
+    def manifest(self, sha):
+        """版のマニフェスト（ゲームキー → ハッシュ）"""
+        if sha in self._manifest_cache:
+            return self._manifest_cache[sha]
+        path = os.path.join(self.manifests_dir, sha + ".json")
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        else:
+            # 以前の形式のストアにはマニフェストがないので作る
+            manifest = self._write_manifest(sha, self.read(sha))
+        self._manifest_cache[sha] = manifest
+        return manifest
+
+    def diff(self, old_snapshot, new_snapshot):
+        """2つの版の間で追加・削除・変更されたゲーム
+
+        間にある版の変更記録を合成するので、手間は変更されたゲームの数に比例する。
+
+        Returns:
+            list: (キー, 種類, 前のハッシュ, 後のハッシュ) のリスト（キー順）
+        """
+        reverse = old_snapshot["timestamp"] > new_snapshot["timestamp"]
+        if reverse:
+            old_snapshot, new_snapshot = new_snapshot, old_snapshot
+        start = self.snapshots.index(old_snapshot)
+        end = self.snapshots.index(new_snapshot)
+
+        steps = []
+        updated = False
+        for i in range(start + 1, end + 1):
+            if self.snapshots[i].get("changes") is None:
+                self._compute_changes(i)
+                updated = True
+            steps.append(self.snapshots[i]["changes"])
+        if updated:
+            self._save_index()
+
+        changes = compose_changes(steps)
+        if reverse:
+            changes = {key: [after, before] for key, (before, after) in changes.items()}
+        return describe_changes(changes)
+
+    def diff_with_games(self, snapshot, games):
+        """版と任意のゲーム一覧（現在のカタログなど）の差分（全件を比較する）"""
+        return describe_changes(diff_manifests(self.manifest(snapshot["sha256"]), build_manifest(games)))
+
+    def export(self, snapshot, path):
+        """版を games.json 形式のファイルとして書き出す"""
+        atomic_write_bytes(path, self.read(snapshot["sha256"]))
+
+    # --- 間引き --------------------------------------------------------
+
+    def prune(self, retention=None):
+        """保持ポリシーに従って古い版を削除
+
+        Returns:
+            int: 削除した版の数
+        """
+        retention = retention or self.retention
+        kept = retention.select(self.snapshots)
+        removed = len(self.snapshots) - len(kept)
+        if removed == 0:
+            return 0
+
+        # 削除する版の変更記録は、次に残る版の変更記録に合成する
+        remaining = []
+        pending = []
+        for i, snapshot in enumerate(self.snapshots):
+            changes = snapshot.get("changes")
+            if i not in kept:
+                pending.append(changes)
+                continue
+            if not remaining:
+                snapshot["changes"] = None
+            elif pending and changes is not None and None not in pending:
+                snapshot["changes"] = compose_changes(pending + [changes])
+            elif pending:
+                snapshot["changes"] = None  # 次に比較するときにマニフェストから作り直す
+            remaining.append(snapshot)
+            pending = []
+        self.snapshots = remaining
+
+        referenced = {s["sha256"] for s in self.snapshots}
+        unreferenced = set(self.objects) - referenced
+
+        # 削除するオブジェクトを差分の元にしている版は、全体を保存し直す
+        for sha in sorted(referenced, key=lambda s: self.objects[s].get("depth", 0)):
+            if self._chain_contains(sha, unreferenced):
+                self._write_object(sha, self.read(sha), None)
+
+        for sha in unreferenced:
+            info = self.objects.pop(sha)
+            self._manifest_cache.pop(sha, None)
+            self._games_cache.pop(sha, None)
+            for path in (self._object_path(sha, info), os.path.join(self.manifests_dir, sha + ".json")):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        self._save_index()
+        return removed
+
+    def stats(self):
+        """版の数・元のサイズの合計・保存サイズの合計"""
+        return {
+            "snapshots": len(self.snapshots),
+            "objects": len(self.objects),
+            "original_bytes": sum(s["size"] for s in self.snapshots),
+            "stored_bytes": sum(o["stored"] for o in self.objects.values()),
+        }
+
+    # --- 内部処理 ------------------------------------------------------
+
+    def _previous_snapshot(self, timestamp):
+        previous = None
+        for snapshot in self.snapshots:
+            if snapshot["timestamp"] <= timestamp:
+                previous = snapshot
+        return previous
+
+    def _compute_changes(self, i):
+        """i番目の版の、直前の版からの変更記録を作る"""
+        snapshot = self.snapshots[i]
+        if i == 0:
+            snapshot["changes"] = None
+            return
+        previous = self.snapshots[i - 1]
+        snapshot["changes"] = diff_manifests(self.manifest(previous["sha256"]), self.manifest(snapshot["sha256"]))
+
+    def _write_manifest(self, sha, data):
+        path = os.path.join(self.manifests_dir, sha + ".json")
+        if sha in self._manifest_cache and os.path.exists(path):
+            return self._manifest_cache[sha]
+        try:
+            manifest = build_manifest(json.loads(data.decode('utf-8')))
+        except ValueError:
+            manifest = {}
+        os.makedirs(self.manifests_dir, exist_ok=True)
+        atomic_write_bytes(path, json.dumps(manifest, ensure_ascii=False).encode('utf-8'))
+        self._manifest_cache[sha] = manifest
+        return manifest
+
+    def _chain_contains(self, sha, targets):
+        current = self.objects[sha].get("base")
+        while current is not None:
+            if current in targets:
+                return True
+            current = self.objects[current].get("base")
+        return False
+
+    def _object_path(self, sha, info):
+        suffix = ".z" if info.get("base") is None else ".delta.z"
+        return os.path.join(self.objects_dir, sha + suffix)
+
+    def _write_object(self, sha, data, base_sha):
+        """オブジェクトを書き出す（差分の方が十分小さければ差分で保存）"""
+        os.makedirs(self.objects_dir, exist_ok=True)
+        full = zlib.compress(data, 9)
+        info = {"base": None, "depth": 0, "stored": len(full)}
+        payload = full
+
+        base_info = self.objects.get(base_sha) if base_sha else None
+        if base_info is not None and base_info.get("depth", 0) + 1 <= MAX_CHAIN:
+            ops = make_delta(self.read(base_sha).decode('utf-8'), data.decode('utf-8'))
+            delta = zlib.compress(json.dumps(ops, ensure_ascii=False).encode('utf-8'), 9)
+            if len(delta) < len(full) // 2:
+                info = {"base": base_sha, "depth": base_info.get("depth", 0) + 1, "stored": len(delta)}
+                payload = delta
+
+        old_info = self.objects.get(sha)
+        atomic_write_bytes(self._object_path(sha, info), payload)
+        if old_info is not None and self._object_path(sha, old_info) != self._object_path(sha, info):
+            os.remove(self._object_path(sha, old_info))
+        self.objects[sha] = info
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        self.objects = index.get("objects", {})
+        self.snapshots = sorted(index.get("snapshots", []), key=lambda s: s["timestamp"])
+
+    def _save_index(self):
+        os.makedirs(self.store_dir, exist_ok=True)
+        index = {"version": INDEX_VERSION, "objects": self.objects, "snapshots": self.snapshots}
+        atomic_write_bytes(self.index_path, json.dumps(index, ensure_ascii=False, indent=1).encode('utf-8'))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="games.json のバックアップを管理します")
+    parser.add_argument("--dir", default=DEFAULT_BACKUP_DIR, help="バックアップフォルダ")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="版の一覧を表示")
+    legacy_parser = subparsers.add_parser("import-legacy", help="games_backup_*.json を取り込む")
+    legacy_parser.add_argument("--remove", action="store_true", help="取り込んだファイルを削除")
+    subparsers.add_parser("prune", help="保持ポリシーに従って古い版を削除")
+    diff_parser = subparsers.add_parser("diff", help="2つの版で変わったゲームを表示")
+    diff_parser.add_argument("old", help="比較元の版")
+    diff_parser.add_argument("new", help="比較先の版")
+    export_parser = subparsers.add_parser("export", help="版を書き出す")
+    export_parser.add_argument("snapshot", help="版ID（ハッシュの先頭）またはタイムスタンプ")
+    export_parser.add_argument("output", help="出力先のファイル")
+    args = parser.parse_args(argv)
+
+    store = BackupStore(args.dir)
+    if args.command == "list":
+        for snapshot in store.list_snapshots():
+            print(f"{snapshot['timestamp']}  {snapshot['sha256'][:12]}  {snapshot['games']}件  {snapshot['size']}バイト")
+        stats = store.stats()
+        print(f"\n{stats['snapshots']}版 / 元のサイズ {stats['original_bytes']}バイト → 保存サイズ {stats['stored_bytes']}バイト")
+    elif args.command == "import-legacy":
+        added, skipped = store.import_legacy(remove=args.remove)
+        print(f"{added}版を取り込みました（重複 {skipped}件はスキップ）")
+    elif args.command == "prune":
+        print(f"{store.prune()}版を削除しました")
+    elif args.command == "diff":
+        old, new = store.find(args.old), store.find(args.new)
+        if old is None or new is None:
+            print("版が見つかりません", file=sys.stderr)
+            return 1
+        marks = {DIFF_ADDED: "+", DIFF_REMOVED: "-", DIFF_CHANGED: "~"}
+        for key, kind, _, _ in store.diff(old, new):
+            print(f"{marks[kind]} {key}")
+    elif args.command == "export":
+        snapshot = store.find(args.snapshot)
+        if snapshot is None:
+            print(f"版が見つかりません: {args.snapshot}", file=sys.stderr)
+            return 1
+        store.export(snapshot, args.output)
+        print(f"{snapshot['timestamp']} の版を {args.output} に書き出しました")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
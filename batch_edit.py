@@ -0,0 +1,83 @@
+"""複数のゲームへのまとめての編集
+
+一覧でチェックした（または表示中の）ゲームに、同じ編集をまとめて行うためのもの。
+    - 作者・タグの置換（完全一致、または部分一致で文字列を置き換え）
+    - タグの追加・削除
+
+編集は「ゲームを受け取り、変更後の内容を返す関数（変わらなければ None）」として作り、
+CatalogCore.batch_update に渡して1回の操作として反映する。preview_edit で
+反映する前に変わるゲームを確認できる。
+
+このモジュールは tkinter を import しない。
+"""
+
+
+def split_values(text):
+    """カンマ区切りの入力をリストにする（前後の空白と空の値は除く）"""
+    return [value.strip() for value in (text or "").split(",") if value.strip()]
+
+
+def _unique(values):
+    # 順番を保ったまま重複を除く
+    result = []
+    for value in values:
+        if value and value not in result:
+            result.append(value)
+    return result
+
+
+def _edit_values(field, change):
+    """リスト項目（作者・タグ）の値を change で書き換える編集を作る"""
+    def edit(game):
+        values = list(game.get(field) or ())
+        new_values = _unique(change(values))
+        if new_values == values:
+            return None
+        changed = game.copy()
+        changed[field] = new_values
+        return changed
+    return edit
+
+
+def replace_values(field, find, replacement, partial=False):
+    """作者・タグの値を置き換える編集
+
+    Args:
+        field (str): "authors" または "tags"
+        find (str): 探す値
+        replacement (str): 置き換える値（空なら一致した値を削除）
+        partial (bool): 値の一部に一致したところを置き換える（False なら値全体が一致したものだけ）
+
+    Raises:
+        ValueError: 探す値が空
+    """
+    if not find:
+        raise ValueError("置き換える前の値を入力してください")
+    if partial:
+        return _edit_values(field, lambda values: [value.replace(find, replacement) for value in values])
+    return _edit_values(field, lambda values: [replacement if value == find else value for value in values])
+
+
+def add_values(field, added):
+    """作者・タグを追加する編集（すでにある値は追加しない）"""
+    return _edit_values(field, lambda values: values + list(added))
+
+
+def remove_values(field, removed):
+    """作者・タグを削除する編集"""
+    removed = set(removed)
+    return _edit_values(field, lambda values: [value for value in values if value not in removed])
+
+
+def preview_edit(games, edit):
+    """編集で内容が変わるゲーム
+
+    Returns:
+        list: (ゲーム, 変更後の内容) のリスト
+    """
+    changes = []
+    for game in games:
+        changed = edit(game)
+        if changed is not None:
+            changes.append((game, changed))
+    return changes
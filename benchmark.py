@@ -0,0 +1,419 @@
+"""エディターの処理時間のベンチマーク
+
+合成したカタログ（100〜100,000件）で、読み込み・並べ替え・1文字ごとの検索・追加・更新・
+削除・保存・バックアップ・未保存の変更の確認にかかる時間を測り、JSONに書き出す。
+コミットごとの結果を compare で比べると、遅くなった処理が分かる。
+
+    - core: GUIなしで CatalogCore の処理を測る
+    - gui: GamesEditor のメソッド（一覧の更新などの画面の処理を含む）を測る。
+      画面がない環境では飛ばす
+
+カタログは乱数の種から作るので、同じ種なら毎回同じ内容になる。
+
+コマンドラインから実行する:
+    python benchmark.py run --sizes 100,1000,10000 --output before.json
+    python benchmark.py run --no-gui
+    python benchmark.py compare before.json after.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from catalog import COLLATION_SIMPLE, COLLATION_JAPANESE
+from catalog_core import CatalogCore
+
+RESULT_VERSION = 1
+DEFAULT_SIZES = (100, 1000, 10000, 100000)
+DEFAULT_GUI_SIZES = (100, 1000, 10000)
+DEFAULT_SEED = 20240801
+DEFAULT_REPEAT = 3      # 読み込み・並べ替え・保存などを繰り返す回数
+DEFAULT_EDITS = 20      # 追加・更新・削除を繰り返す回数
+
+# 1文字ずつ入力する検索語
+SEARCH_QUERIES = ("シューティング", "夏チーム", "ドラゴン", "unity")
+
+# 比較で、これより小さい差（秒）は誤差として扱う
+MIN_DELTA = 0.001
+
+# --- 合成カタログ --------------------------------------------------------
+
+_TITLE_HEADS = ("ドラゴン", "魔法", "星降る", "夏色", "冬の", "忍者", "ロボット", "ねこ", "宇宙", "迷宮",
+                "はじまりの", "幻想", "鉄道", "深海", "ひみつの", "勇者", "ゾンビ", "おばけ", "サクラ", "虹色")
+_TITLE_TAILS = ("クエスト", "ランナー", "パズル", "物語", "サバイバー", "アドベンチャー", "シューティング",
+                "の冒険", "ファンタジー", "タワー", "レーサー", "ディフェンス", "エクスプレス", "ダンジョン", "たんけん隊")
+_TITLE_SUFFIXES = ("", "", "", " 2", " DX", "！", "～リメイク～", " ZERO", "（体験版）")
+_AUTHORS = ("藤", "三谷", "橋詰", "森田", "貝原", "佐藤", "鈴木", "高橋", "田中", "伊藤",
+            "渡辺", "山本", "中村", "小林", "加藤", "吉田", "山田", "佐々木", "松本", "井上")
+_GENRES = ("#シューティング", "#パズル", "#アクション", "#ストラテジー", "#RPG", "#ノベル", "#リズム", "#レース")
+_SEASONS = ("夏", "冬", "春")
+_SENTENCES = ("シンプルな横スクロールシューティングゲームです。", "ブロックを動かしてゴールを目指しましょう。",
+              "3分で遊べるカジュアルゲームです。", "チームで1週間かけて制作しました。",
+              "マウスだけで操作できます。", "ハイスコアを目指して何度でも挑戦してください。")
+
+
+def generate_game(rng, index):
+    """合成したゲーム1件（games.json の形式）"""
+    title = rng.choice(_TITLE_HEADS) + rng.choice(_TITLE_TAILS) + rng.choice(_TITLE_SUFFIXES)
+    name = f"{title} #{index}" if rng.random() < 0.5 else title
+    year = rng.choice((2022, 2023, 2024, 2025))
+    tags = [f"#{rng.choice(_SEASONS)}チーム_{year}"] + rng.sample(_GENRES, rng.randint(0, 2))
+    slug = f"game{index:06d}"
+    unityroom = f"https://unityroom.com/games/{slug}" if rng.random() < 0.7 else ""
+    github = f"https://github.com/cgp-{year}/{slug}" if not unityroom or rng.random() < 0.3 else ""
+    image = f"https://os-worker.unityroom.com/unityroom_production/icon/{100000 + index}/icon.png" if unityroom else ""
+    return {
+        "name": name,
+        "authors": rng.sample(_AUTHORS, rng.randint(0, 3)),
+        "tags": tags,
+        "unityroomurl": unityroom,
+        "githuburl": github,
+        "description": "".join(rng.sample(_SENTENCES, rng.randint(0, 3))),
+        "image": image,
+    }
+
+
+def generate_catalog(size, seed=DEFAULT_SEED):
+    """合成したカタログ（ゲームのリスト。ファイル上の並び順は名前順ではない）"""
+    rng = random.Random(f"{seed}-{size}")
+    return [generate_game(rng, index) for index in range(size)]
+
+
+def write_catalog(path, size, seed=DEFAULT_SEED):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(generate_catalog(size, seed), f, ensure_ascii=False, indent=2)
+
+
+# --- 計測 ----------------------------------------------------------------
+
+class Timings:
+    """処理ごとの所要時間（秒）のサンプル"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    def measure(self, op, func, *args, **kwargs):
+        """func を実行して所要時間を op のサンプルに加える（func の戻り値を返す）"""
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.samples[op].append(time.perf_counter() - start)
+        return result
+
+    def add(self, op, seconds):
+        self.samples[op].append(seconds)
+
+    def summary(self, mode, size):
+        """結果のJSONに書く形"""
+        results = []
+        for op, samples in self.samples.items():
+            ordered = sorted(samples)
+            results.append({
+                "mode": mode,
+                "size": size,
+                "op": op,
+                "count": len(samples),
+                "total": sum(samples),
+                "mean": statistics.fmean(samples),
+                "median": statistics.median(samples),
+                "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                "min": ordered[0],
+                "max": ordered[-1],
+            })
+        return results
+
+
+def _typed_prefixes(queries):
+    # 1文字ずつ入力したときの検索語の列
+    return [query[:length] for query in queries for length in range(1, len(query) + 1)]
+
+
+def _edit_targets(games, count, rng):
+    return rng.sample(list(games), min(count, len(games)))
+
+
+def bench_core(path, repeat=DEFAULT_REPEAT, edits=DEFAULT_EDITS, seed=DEFAULT_SEED):
+    """CatalogCore の処理時間を測る（path のカタログを書き換える）"""
+    timings = Timings()
+    backup_dir = os.path.join(os.path.dirname(path), "backup")
+    rng = random.Random(seed)
+
+    core = None
+    for _ in range(repeat):
+        core = CatalogCore(path, backup_dir)
+        timings.measure("load", core.load)
+
+    for _ in range(repeat):
+        timings.measure("sort", core.set_collation, COLLATION_JAPANESE)
+        timings.measure("sort", core.set_collation, COLLATION_SIMPLE)
+
+    for prefix in _typed_prefixes(SEARCH_QUERIES):
+        timings.measure("search_keystroke", core.search, prefix)
+
+    for index in range(edits):
+        timings.measure("add", core.add, generate_game(rng, len(core.games) + index))
+
+    for game in _edit_targets(core.games, edits, rng):
+        data = game.to_dict()
+        data["description"] += "（更新）"
+        timings.measure("update", core.update, core.catalog.id_of(game), data)
+
+    for game in _edit_targets(core.games, edits, rng):
+        timings.measure("delete", core.remove, core.catalog.id_of(game))
+
+    for _ in range(repeat):
+        timings.measure("unsaved_changes", lambda: (core.dirty, core.changes()))
+
+    for _ in range(repeat):
+        timings.measure("backup", core.create_backup)
+        timings.measure("save", core.save)
+        # 次の保存で書く内容を変える（同じ内容のバックアップは作られないため）
+        game = core.games[0]
+        core.update(core.catalog.id_of(game), dict(game.to_dict(), description=f"{time.time()}"))
+
+    # あいまい検索（インデックスを作ると以降の編集でも更新されるので、編集の計測の後に測る）
+    timings.measure("fuzzy_build", core.ensure_fuzzy_index)
+    for prefix in _typed_prefixes(SEARCH_QUERIES):
+        timings.measure("search_fuzzy_keystroke", core.search, prefix, fuzzy=True)
+    core.close()
+    return timings
+
+
+def bench_gui(path, repeat=DEFAULT_REPEAT, edits=DEFAULT_EDITS, seed=DEFAULT_SEED):
+    """GamesEditor のメソッドの処理時間を測る（画面がなければ None）"""
+    import tkinter as tk
+    import games_editor
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return None
+
+    timings = Timings()
+    rng = random.Random(seed)
+    # 削除の確認と終了時の確認には「はい」と答える
+    askyesno = games_editor.messagebox.askyesno
+    games_editor.messagebox.askyesno = lambda *args, **kwargs: True
+    try:
+        def run(op, func, *args):
+            # 画面の更新（idle タスク）まで含めて測る
+            timings.measure(op, lambda: (func(*args), root.update_idletasks()))
+
+        start = time.perf_counter()
+        editor = games_editor.GamesEditor(root, path)
+        editor.auto_commit_enabled.set(False)
+        while editor.loader is not None:
+            root.update()
+        timings.add("load", time.perf_counter() - start)
+        for stage, seconds in editor.load_metrics.times.items():
+            if stage != "window":
+                timings.add(f"load_{stage}", seconds)
+
+        for _ in range(repeat):
+            for collation in (COLLATION_JAPANESE, COLLATION_SIMPLE):
+                editor.collation_var.set(collation)
+                run("sort", editor.on_collation_change)
+
+        for prefix in _typed_prefixes(SEARCH_QUERIES):
+            editor.search_var.set(prefix)
+            run("search_keystroke", editor.on_search_change)
+        editor.search_var.set("")
+        editor.cancel_pending_search()
+        run("refresh_list", editor.show_all_games)
+
+        for index in range(edits):
+            run("add", editor.add_validated_game, generate_game(rng, len(editor.games_data) + index))
+
+        for game in _edit_targets(editor.games_data, edits, rng):
+            editor.exit_new_game_mode()
+            editor.selected_game = game
+            editor.selected_game_id = editor.catalog.id_of(game)
+            editor.load_game_to_fields(game)
+            editor.entry_vars["githuburl"].set(f"https://github.com/cgp-bench/{rng.randrange(10 ** 6)}")
+            run("update", editor.update_current_game)
+
+        for game in _edit_targets(editor.games_data, edits, rng):
+            editor.show_all_games()
+            editor.game_list_view.select(editor.game_list_view.index_of(game))
+            run("delete", editor.delete_game)
+
+        for _ in range(repeat):
+            run("unsaved_changes", editor.update_unsaved_indicator)
+
+        editor.game_list_view.clear_selection()
+        for _ in range(repeat):
+            game = editor.games_data[0]
+            editor.core.update(editor.catalog.id_of(game), dict(game.to_dict(), description=f"{time.time()}"))
+            run("save", editor.save_games)
+
+        editor.fuzzy_search_var.set(True)
+        run("fuzzy_build", editor.on_fuzzy_search_change)
+        for prefix in _typed_prefixes(SEARCH_QUERIES):
+            editor.search_var.set(prefix)
+            run("search_fuzzy_keystroke", editor.on_search_change)
+        editor.search_var.set("")
+        editor.cancel_pending_search()
+
+        editor.on_close()
+    finally:
+        games_editor.messagebox.askyesno = askyesno
+        try:
+            root.destroy()
+        except tk.TclError:
+            pass
+    return timings
+
+
+def current_commit():
+    """ベンチマークを実行したコミット（Git がなければ None）"""
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def run_benchmarks(sizes, gui_sizes, repeat=DEFAULT_REPEAT, edits=DEFAULT_EDITS, seed=DEFAULT_SEED, log=None):
+    """ベンチマークを実行して結果（JSONに書く辞書）を返す"""
+    results = []
+    skipped = []
+    for size in sorted(set(sizes) | set(gui_sizes)):
+        for mode in ("core", "gui"):
+            if size not in (sizes if mode == "core" else gui_sizes):
+                continue
+            with tempfile.TemporaryDirectory(prefix="games_bench_") as directory:
+                path = os.path.join(directory, "games.json")
+                write_catalog(path, size, seed)
+                if log:
+                    log(f"{mode} {size}件...")
+                previous = os.getcwd()
+                os.chdir(directory)  # キャッシュなどは一時フォルダに作る
+                try:
+                    if mode == "core":
+                        timings = bench_core(path, repeat, edits, seed)
+                    else:
+                        timings = bench_gui(path, repeat, edits, seed)
+                finally:
+                    os.chdir(previous)
+            if timings is None:
+                skipped.append({"mode": mode, "size": size, "reason": "画面がないためGUIの計測を飛ばしました"})
+                if log:
+                    log("  画面がないため飛ばしました")
+                continue
+            results.extend(timings.summary(mode, size))
+    return {
+        "version": RESULT_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": current_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "repeat": repeat,
+        "edits": edits,
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+# --- 比較 ----------------------------------------------------------------
+
+def compare_results(old, new, threshold=0.2, metric="median", min_delta=MIN_DELTA):
+    """2つの結果を比べる
+
+    Returns:
+        list: (モード, 件数, 処理, 前の値, 後の値, 比率, 遅くなったか) のリスト
+    """
+    old_results = {(r["mode"], r["size"], r["op"]): r for r in old["results"]}
+    rows = []
+    for result in new["results"]:
+        key = (result["mode"], result["size"], result["op"])
+        before = old_results.get(key)
+        if before is None:
+            continue
+        old_value, new_value = before[metric], result[metric]
+        ratio = new_value / old_value if old_value else float("inf")
+        regressed = ratio > 1 + threshold and new_value - old_value > min_delta
+        rows.append(key + (old_value, new_value, ratio, regressed))
+    return rows
+
+
+def _format_seconds(seconds):
+    return f"{seconds * 1000:.2f}ms" if seconds < 1 else f"{seconds:.2f}s"
+
+
+def print_summary(data):
+    for result in data["results"]:
+        print(f"{result['mode']:4} {result['size']:>7}件 {result['op']:22} "
+              f"中央値 {_format_seconds(result['median']):>10}  p95 {_format_seconds(result['p95']):>10}  "
+              f"({result['count']}回)")
+    for skipped in data.get("skipped", []):
+        print(f"{skipped['mode']:4} {skipped['size']:>7}件 {skipped['reason']}")
+
+
+def _parse_sizes(text):
+    return tuple(int(size) for size in text.split(",") if size.strip())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="エディターの処理時間を合成カタログで測ります")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="ベンチマークを実行")
+    run_parser.add_argument("--sizes", type=_parse_sizes, default=DEFAULT_SIZES, help="GUIなしで測る件数（カンマ区切り）")
+    run_parser.add_argument("--gui-sizes", type=_parse_sizes, default=DEFAULT_GUI_SIZES, help="GUIで測る件数（カンマ区切り）")
+    run_parser.add_argument("--no-gui", action="store_true", help="GUIの計測をしない")
+    run_parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="読み込み・保存などを繰り返す回数")
+    run_parser.add_argument("--edits", type=int, default=DEFAULT_EDITS, help="追加・更新・削除を繰り返す回数")
+    run_parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="合成カタログの乱数の種")
+    run_parser.add_argument("--output", help="結果のJSONの保存先（省略時は benchmark_<コミット>.json）")
+
+    compare_parser = subparsers.add_parser("compare", help="2つの結果を比べる（遅くなった処理があれば終了コード1）")
+    compare_parser.add_argument("old", help="前の結果のJSON")
+    compare_parser.add_argument("new", help="後の結果のJSON")
+    compare_parser.add_argument("--threshold", type=float, default=0.2, help="遅くなったとみなす割合（0.2 = 20%%）")
+    compare_parser.add_argument("--metric", default="median", choices=("median", "mean", "p95", "max"), help="比べる値")
+
+    generate_parser = subparsers.add_parser("generate", help="合成カタログを書き出す")
+    generate_parser.add_argument("size", type=int, help="ゲームの数")
+    generate_parser.add_argument("output", help="出力先")
+    generate_parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="乱数の種")
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        write_catalog(args.output, args.size, args.seed)
+        print(f"{args.size}件のゲームを {args.output} に書き出しました")
+        return 0
+
+    if args.command == "compare":
+        with open(args.old, 'r', encoding='utf-8') as f:
+            old = json.load(f)
+        with open(args.new, 'r', encoding='utf-8') as f:
+            new = json.load(f)
+        rows = compare_results(old, new, args.threshold, args.metric)
+        for mode, size, op, before, after, ratio, regressed in rows:
+            mark = "❌" if regressed else "  "
+            print(f"{mark} {mode:4} {size:>7}件 {op:22} {_format_seconds(before):>10} → {_format_seconds(after):>10} "
+                  f"({ratio:.2f}倍)")
+        regressions = sum(1 for row in rows if row[-1])
+        print(f"{len(rows)}件中 {regressions}件が遅くなりました（{args.metric}、しきい値 {args.threshold:.0%}）")
+        return 1 if regressions else 0
+
+    data = run_benchmarks(args.sizes, () if args.no_gui else args.gui_sizes, args.repeat, args.edits, args.seed,
+                          log=lambda message: print(message, file=sys.stderr, flush=True))
+    output = args.output or f"benchmark_{(data['commit'] or 'nogit')[:8]}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    print_summary(data)
+    print(f"結果を {output} に保存しました")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
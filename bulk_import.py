@@ -0,0 +1,255 @@
+"""CSV / JSONL からのゲームの一括インポート
+
+大会やチームのゲームをまとめて追加するためのもの。取り込みは3段階に分かれる。
+    1. read_import_file でファイルを読み、plan_import で1行ずつ分類する（ImportPlan）
+       - 必須項目のチェックはエディターと同じ validate_game
+       - 同じ名前のゲームがすでにあれば「置き換え」（内容が同じなら「変更なし」）
+       - ファイル内で同じ名前が2回目以降に出てきたら「重複」
+    2. ImportPlan.start_url_check で取り込む行のURLを並行してチェックする（LinkAudit を使うので
+       ホストごとの同時接続数も制限される）
+    3. CatalogCore.import_plan で取り込む。追加は1回の並べ替えでまとめて行う
+
+CSV は1行目に列名（games.json の項目名: name, authors, tags, unityroomurl, githuburl,
+description, image）を書く。作者・タグはエディターと同じくカンマ区切りで1つのセルに書く。
+JSONL は1行に games.json の1要素（オブジェクト）を書く。拡張子が .json のファイルは
+games.json と同じ配列として読む。
+
+このモジュールは tkinter を import しない。
+"""
+import csv
+import json
+import os
+
+from game_record import GAME_FIELDS, LIST_FIELDS, Game, as_game
+
+# 行の分類
+IMPORT_NEW = "new"              # 新しいゲーム
+IMPORT_REPLACE = "replace"      # 同じ名前のゲームを置き換える
+IMPORT_UNCHANGED = "unchanged"  # 同じ名前・同じ内容のゲームがある（取り込まない）
+IMPORT_DUPLICATE = "duplicate"  # ファイル内で同じ名前が前に出てきた（取り込まない）
+IMPORT_INVALID = "invalid"      # 読み取れない・必須項目がない（取り込まない）
+
+IMPORT_LABELS = {
+    IMPORT_NEW: "追加",
+    IMPORT_REPLACE: "置き換え",
+    IMPORT_UNCHANGED: "変更なし",
+    IMPORT_DUPLICATE: "重複",
+    IMPORT_INVALID: "エラー",
+}
+
+
+class ImportFileError(ValueError):
+    """インポートするファイルが読めない"""
+
+
+class ImportRow:
+    """インポートするファイルの1行
+
+    Args:
+        line (int): ファイル内の行番号（CSV の列名の行は 1）
+        game (Game): 読み取ったゲーム（読み取れなければ None）
+        status (str): IMPORT_NEW などの分類
+        message (str): 分類の理由（エラー内容や置き換えるゲーム名）
+    """
+
+    def __init__(self, line, game, status=IMPORT_NEW, message=""):
+        self.line = line
+        self.game = game
+        self.status = status
+        self.message = message
+        self.existing = None   # 置き換える（同じ名前の）カタログのゲーム
+        self.url_errors = []   # 無効だったURL（"表示名: 状態" のリスト）
+
+    @property
+    def name(self):
+        return self.game.get("name", "") if self.game is not None else ""
+
+    @property
+    def actionable(self):
+        """取り込む対象（追加・置き換え）かどうか"""
+        return self.status in (IMPORT_NEW, IMPORT_REPLACE)
+
+
+def _game_from_csv_row(row):
+    data = {}
+    for field in GAME_FIELDS:
+        value = (row.get(field) or "").strip()
+        if field in LIST_FIELDS:
+            data[field] = [item.strip() for item in value.split(",") if item.strip()]
+        else:
+            data[field] = value
+    return Game.from_dict(data)
+
+
+def _read_csv(path):
+    rows = []
+    # Excel で保存した CSV（BOM つき UTF-8）もそのまま読めるように utf-8-sig で開く
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        if reader.fieldnames is None:
+            return rows
+        reader.fieldnames = [(name or "").strip().lower() for name in reader.fieldnames]
+        if "name" not in reader.fieldnames:
+            raise ImportFileError("CSV の1行目に列名（name, authors, tags, unityroomurl など）を書いてください")
+        for row in reader:
+            if not any((value or "").strip() for value in row.values() if isinstance(value, str)):
+                continue
+            rows.append((reader.line_num, _game_from_csv_row(row), None))
+    return rows
+
+
+def _read_json_lines(path):
+    rows = []
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError as e:
+                rows.append((line_number, None, f"JSONとして読めません: {str(e)}"))
+                continue
+            if not isinstance(data, dict):
+                rows.append((line_number, None, "1行に1つのオブジェクトを書いてください"))
+                continue
+            rows.append((line_number, as_game(data), None))
+    return rows
+
+
+def _read_json_array(path):
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        try:
+            data = json.load(f)
+        except ValueError as e:
+            raise ImportFileError(f"JSONとして読めません: {str(e)}")
+    if not isinstance(data, list):
+        raise ImportFileError("games.json と同じ配列の形式で書いてください")
+    return [(index, as_game(item), None) if isinstance(item, dict) else (index, None, "オブジェクトではありません")
+            for index, item in enumerate(data, 1)]
+
+
+def read_import_file(path):
+    """インポートするファイルを読む（拡張子で形式を決める: .csv / .jsonl / .json）
+
+    Returns:
+        list: (行番号, Game または None, 読み取れなかった理由または None) のリスト
+
+    Raises:
+        OSError: ファイルが読めない
+        ImportFileError: 形式が正しくない
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return _read_csv(path)
+    if extension in (".jsonl", ".ndjson"):
+        return _read_json_lines(path)
+    if extension == ".json":
+        return _read_json_array(path)
+    raise ImportFileError(f"対応していない形式です: {extension or path}（.csv / .jsonl / .json）")
+
+
+class ImportPlan:
+    """インポートの内容（行ごとの分類とURLチェックの結果）
+
+    Args:
+        rows (list): ImportRow のリスト（ファイルの順）
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.url_checked = False
+
+    def counts(self):
+        """分類ごとの行数"""
+        counts = dict.fromkeys(IMPORT_LABELS, 0)
+        for row in self.rows:
+            counts[row.status] += 1
+        return counts
+
+    def summary(self):
+        """分類ごとの行数を1行にする"""
+        counts = self.counts()
+        parts = [f"{IMPORT_LABELS[status]} {count}件" for status, count in counts.items() if count]
+        broken = sum(1 for row in self.rows if row.actionable and row.url_errors)
+        if broken:
+            parts.append(f"無効なURLあり {broken}件")
+        return f"{len(self.rows)}行: " + "・".join(parts) if parts else "取り込む行がありません"
+
+    def selected(self, replace=False, allow_broken_links=False):
+        """取り込む行
+
+        Args:
+            replace (bool): 同じ名前のゲームを置き換える
+            allow_broken_links (bool): 無効なURLがある行も取り込む
+        """
+        return [row for row in self.rows
+                if (row.status == IMPORT_NEW or (replace and row.status == IMPORT_REPLACE))
+                and (allow_broken_links or not row.url_errors)]
+
+    def start_url_check(self, cache=None, check_func=None):
+        """取り込む対象の行のURLチェックを始める
+
+        結果は返した LinkAudit の poll で取り出して add_url_results に渡す。
+
+        Returns:
+            LinkAudit: 開始したリンク監査
+        """
+        from link_audit import LinkAudit
+        for row in self.rows:
+            row.url_errors = []
+        games = [row.game for row in self.rows if row.actionable]
+        return LinkAudit(games, cache=cache, check_func=check_func).start()
+
+    def add_url_results(self, results):
+        """LinkAudit の結果（AuditResult のリスト）を行に反映"""
+        rows_by_name = {row.name: row for row in self.rows if row.actionable}
+        for result in results:
+            row = rows_by_name.get(result.game_name)
+            if row is not None and not result.ok:
+                row.url_errors.append(f"{result.label}: {result.status}")
+
+    def check_urls(self, cache=None, check_func=None):
+        """URLをチェックして完了まで待つ（コマンドライン用）"""
+        audit = self.start_url_check(cache=cache, check_func=check_func)
+        audit.wait()
+        self.add_url_results(audit.poll())
+        self.url_checked = True
+
+
+def plan_import(parsed_rows, existing_games, validate):
+    """読み取った行を分類する
+
+    Args:
+        parsed_rows (list): read_import_file の戻り値
+        existing_games (list): 今のカタログのゲーム
+        validate (callable): ゲームを受け取り、問題があればエラーメッセージを返す関数
+
+    Returns:
+        ImportPlan: 行ごとの分類
+    """
+    existing_by_name = {}
+    for game in existing_games:
+        existing_by_name.setdefault(game.get("name", ""), game)
+
+    rows = []
+    seen = {}
+    for line, game, error in parsed_rows:
+        row = ImportRow(line, game)
+        if game is not None:
+            error = validate(game)
+        if error:
+            row.status, row.message = IMPORT_INVALID, error
+        elif row.name in seen:
+            row.status, row.message = IMPORT_DUPLICATE, f"{seen[row.name]}行目と同じ名前です"
+        else:
+            seen[row.name] = line
+            existing = existing_by_name.get(row.name)
+            if existing is not None:
+                row.existing = existing
+                if existing == game:
+                    row.status, row.message = IMPORT_UNCHANGED, "同じ内容のゲームがあります"
+                else:
+                    row.status, row.message = IMPORT_REPLACE, "同じ名前のゲームがあります"
+        rows.append(row)
+    return ImportPlan(rows)
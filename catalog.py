@@ -0,0 +1,310 @@
+"""ゲームカタログ（安定IDとIDマップ）
+
+読み込んだゲームそれぞれに内部用の安定IDを振り、ID→ゲーム、ID→位置の対応表を
+並べ替え・追加・削除のたびに最新に保つ。辞書同士の比較（list.index や ==）で
+ゲームを探す必要がなくなり、内容が同じゲームが2つあっても取り違えない。
+
+IDはエディター内部だけで使い、games.json には書き出さない。
+
+ゲームは名前の照合キー順に並べて保持する。照合キーはゲームごとに一度だけ計算して
+キャッシュし、追加・改名時は二分探索で挿入位置を求めて、そのゲームだけを動かす。
+
+追加・更新・削除は ChangeJournal に記録され、未保存の変更の有無や件数、
+前回保存以降に変わったゲームの一覧をファイルを読み直さずに求められる。
+"""
+import copy
+import unicodedata
+from bisect import bisect_right
+
+from game_record import Game
+
+# 並び順の種類
+COLLATION_SIMPLE = "simple"      # 大文字・小文字だけを区別しない（従来の並び順）
+COLLATION_JAPANESE = "japanese"  # NFKC正規化＋大文字小文字・ひらがなカタカナを区別しない
+COLLATIONS = (COLLATION_SIMPLE, COLLATION_JAPANESE)
+
+# カタカナ→ひらがな変換表（ァ〜ヶ）
+_KATAKANA_TO_HIRAGANA = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+
+
+def collation_key(name, collation=COLLATION_SIMPLE):
+    """ゲーム名から並べ替え用のキーを作る"""
+    name = name or ""
+    if collation == COLLATION_JAPANESE:
+        return unicodedata.normalize("NFKC", name).casefold().translate(_KATAKANA_TO_HIRAGANA)
+    return name.lower()
+
+
+def game_sort_key(game, collation=COLLATION_SIMPLE):
+    """ゲームの並べ替え用のキー（Game なら小文字化済みの名前を使う）"""
+    if collation == COLLATION_SIMPLE and isinstance(game, Game):
+        return game.name_lower
+    return collation_key(game.get("name", ""), collation)
+
+
+# 変更の種類
+CHANGE_ADDED = "added"
+CHANGE_UPDATED = "updated"
+CHANGE_DELETED = "deleted"
+
+
+class ChangeJournal:
+    """前回保存以降の変更の記録
+
+    entries は操作の記録（リビジョン番号付き）。これとは別に、変更されたゲームごとに
+    保存時点の内容（追加されたゲームは None）を持っておき、内容が保存時点に戻ったら
+    変更なしとして扱う。未保存かどうか・件数はどちらも O(1) で求まる。
+    """
+
+    def __init__(self):
+        self.revision = 0
+        self.saved_revision = 0
+        self.entries = []
+        self._baseline = {}
+        self._current = {}
+
+    @property
+    def dirty(self):
+        """未保存の変更があるかどうか"""
+        return bool(self._baseline)
+
+    def __len__(self):
+        """保存時点から内容が変わっているゲームの数"""
+        return len(self._baseline)
+
+    def reset(self):
+        """読み込み直後の状態にする"""
+        self.entries.clear()
+        self._baseline.clear()
+        self._current.clear()
+        self.saved_revision = self.revision
+
+    def mark_saved(self):
+        """現在の内容が保存されたことを記録"""
+        self.reset()
+
+    def record(self, op, game_id, before, after):
+        """操作を記録
+
+        Args:
+            op (str): CHANGE_ADDED / CHANGE_UPDATED / CHANGE_DELETED
+            game_id (int): ゲームのID
+            before (dict): 操作前の内容（追加時は None）
+            after (dict): 操作後の内容（削除時は None）
+        """
+        self.revision += 1
+        snapshot = copy.deepcopy(after) if after is not None else None
+        self.entries.append({"revision": self.revision, "op": op, "id": game_id, "game": snapshot})
+
+        if game_id not in self._baseline:
+            self._baseline[game_id] = copy.deepcopy(before) if before is not None else None
+        if self._baseline[game_id] == snapshot:
+            # 保存時点の内容に戻った（追加してから削除した場合も含む）
+            del self._baseline[game_id]
+            self._current.pop(game_id, None)
+        else:
+            self._current[game_id] = snapshot
+
+    def changes(self):
+        """保存時点から変わったゲームの一覧
+
+        Returns:
+            list: (ID, 変更の種類, ゲーム名) のリスト
+        """
+        result = []
+        for game_id, before in self._baseline.items():
+            after = self._current.get(game_id)
+            if before is None:
+                result.append((game_id, CHANGE_ADDED, after.get("name", "")))
+            elif after is None:
+                result.append((game_id, CHANGE_DELETED, before.get("name", "")))
+            else:
+                result.append((game_id, CHANGE_UPDATED, after.get("name", "")))
+        return result
+
+
+class GameCatalog:
+    """ゲームの一覧と安定IDの対応表
+
+    games は表示順（名前順）のゲームのリストで、エディターの games_data と同じ
+    オブジェクトを共有する。ゲームの更新は辞書をその場で書き換えるので、
+    IDと辞書オブジェクトの対応は削除されるまで変わらない。
+    sort_keys は games と同じ順に並んだ照合キーのリスト。
+    """
+
+    def __init__(self, collation=COLLATION_SIMPLE):
+        self.collation = collation
+        self.games = []
+        self.sort_keys = []
+        self._by_id = {}
+        self._id_by_object = {}
+        self._positions = {}
+        self._keys = {}
+        self._next_id = 1
+        self.journal = ChangeJournal()
+
+    def __len__(self):
+        return len(self.games)
+
+    def __iter__(self):
+        return iter(self.games)
+
+    def __contains__(self, game_id):
+        return game_id in self._by_id
+
+    def load(self, games):
+        """ゲームのリストを読み込み、すべてに新しいIDを振る"""
+        self._by_id.clear()
+        self._id_by_object.clear()
+        self._keys.clear()
+        self._positions.clear()
+        for game in games:
+            self._register(game)
+        self.games[:] = games
+        self.sort()
+        self.journal.reset()
+
+    def extend(self, games):
+        """読み込み途中のゲームを追加して名前順に並べ直す（変更記録には残さない）
+
+        Returns:
+            list: games に対応するID
+        """
+        ids = [self._register(game) for game in games]
+        self.games.extend(games)
+        self.sort()
+        return ids
+
+    def id_of(self, game):
+        """ゲーム（辞書）のIDを返す"""
+        return self._id_by_object[id(game)]
+
+    def find_id(self, game):
+        """ゲームがカタログにあればそのIDを返す（削除済みなら None）"""
+        game_id = self._id_by_object.get(id(game))
+        if game_id is None or self._by_id.get(game_id) is not game:
+            return None
+        return game_id
+
+    def get(self, game_id):
+        """IDからゲームを返す（なければNone）"""
+        return self._by_id.get(game_id)
+
+    def index_of(self, game_id):
+        """IDから games 内の位置を返す（なければNone）"""
+        return self._positions.get(game_id)
+
+    def add(self, game):
+        """ゲームを名前順の位置に挿入してIDを返す"""
+        game_id = self._register(game)
+        sort_key = self._keys[game_id]
+        # 同じキーのゲームの後ろに入れる（追加してから安定ソートしたのと同じ順）
+        position = bisect_right(self.sort_keys, sort_key)
+        self.games.insert(position, game)
+        self.sort_keys.insert(position, sort_key)
+        self._reindex(position)
+        self.journal.record(CHANGE_ADDED, game_id, None, game)
+        return game_id
+
+    def add_many(self, games):
+        """複数のゲームを追加して1回だけ並べ直す（一括インポート用）
+
+        Returns:
+            list: games に対応するID
+        """
+        ids = self.extend(games)
+        for game_id, game in zip(ids, games):
+            self.journal.record(CHANGE_ADDED, game_id, None, game)
+        return ids
+
+    def update(self, game_id, game_data):
+        """ゲームの内容を置き換える（IDと辞書オブジェクトは維持）
+
+        名前が変わって並び順が変わる場合は、そのゲームだけを新しい位置に移す。
+        """
+        game = self._by_id[game_id]
+        before = copy.deepcopy(game)
+        game.clear()
+        game.update(game_data)
+        self.journal.record(CHANGE_UPDATED, game_id, before, game)
+
+        sort_key = game_sort_key(game, self.collation)
+        if sort_key != self._keys[game_id]:
+            self._keys[game_id] = sort_key
+            old_position = self._positions[game_id]
+            del self.games[old_position]
+            del self.sort_keys[old_position]
+            if old_position > 0 and sort_key < self.sort_keys[old_position - 1]:
+                new_position = bisect_right(self.sort_keys, sort_key, 0, old_position)
+            else:
+                new_position = bisect_right(self.sort_keys, sort_key, old_position)
+            self.games.insert(new_position, game)
+            self.sort_keys.insert(new_position, sort_key)
+            self._reindex(min(old_position, new_position), max(old_position, new_position) + 1)
+        return game
+
+    def remove(self, game_id):
+        """ゲームを削除して返す"""
+        position = self._positions.pop(game_id)
+        game = self._by_id.pop(game_id)
+        del self._id_by_object[id(game)]
+        del self._keys[game_id]
+        del self.games[position]
+        del self.sort_keys[position]
+        self._reindex(position)
+        self.journal.record(CHANGE_DELETED, game_id, game, None)
+        return game
+
+    def remove_many(self, game_ids):
+        """複数のゲームを削除して返す（位置の振り直しは1回だけ）"""
+        removed = []
+        for game_id in game_ids:
+            game = self._by_id.pop(game_id, None)
+            if game is None:
+                continue
+            del self._positions[game_id]
+            del self._id_by_object[id(game)]
+            del self._keys[game_id]
+            removed.append((game_id, game))
+        if not removed:
+            return []
+        removed_objects = {id(game) for _, game in removed}
+        kept = [position for position, game in enumerate(self.games) if id(game) not in removed_objects]
+        self.games[:] = [self.games[position] for position in kept]
+        self.sort_keys[:] = [self.sort_keys[position] for position in kept]
+        self._reindex()
+        for game_id, game in removed:
+            self.journal.record(CHANGE_DELETED, game_id, game, None)
+        return [game for _, game in removed]
+
+    def sort(self):
+        """キャッシュ済みの照合キーでゲームを並べ替える"""
+        keys = self._keys
+        id_by_object = self._id_by_object
+        self.games.sort(key=lambda game: keys[id_by_object[id(game)]])
+        self.sort_keys[:] = [keys[id_by_object[id(game)]] for game in self.games]
+        self._reindex()
+
+    def set_collation(self, collation):
+        """並び順の種類を切り替えて照合キーを計算し直す"""
+        if collation not in COLLATIONS:
+            raise ValueError(f"不明な並び順です: {collation}")
+        self.collation = collation
+        for game_id, game in self._by_id.items():
+            self._keys[game_id] = game_sort_key(game, collation)
+        self.sort()
+
+    def _register(self, game):
+        game_id = self._next_id
+        self._next_id += 1
+        self._by_id[game_id] = game
+        self._id_by_object[id(game)] = game_id
+        self._keys[game_id] = game_sort_key(game, self.collation)
+        return game_id
+
+    def _reindex(self, start=0, end=None):
+        # start 以降（end の手前まで）の位置を振り直す
+        id_by_object = self._id_by_object
+        end = len(self.games) if end is None else end
+        for position in range(start, end):
+            self._positions[id_by_object[id(self.games[position])]] = position
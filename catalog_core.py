@@ -0,0 +1,717 @@
+"""GUIなしのカタログ操作とコマンドライン
+
+games.json の読み込み・検索・検証・追加/更新/削除・バックアップ・保存・Gitコミットを
+tkinter なしで行う。エディター（games_editor.py）はこの CatalogCore に画面をかぶせたもので、
+スクリプトやCIからは CatalogCore を直接使うか、コマンドラインから操作する:
+
+    python catalog_core.py list
+    python catalog_core.py search <検索語> [--tag <タグ>] [--author <作者>] [--fuzzy]
+    python catalog_core.py facets [--field tags|authors] [--variants]
+    python catalog_core.py add --name <ゲーム名> --unityroom <URL> [--author ...] [--tag ...]
+    python catalog_core.py validate
+    python catalog_core.py audit [link_audit.py のオプション]
+    python catalog_core.py save [--recover] [--commit] [--push]
+    python catalog_core.py export <出力先>
+    python catalog_core.py import <CSV / JSONL> [--check-urls] [--replace] [--dry-run] [--commit]
+    python catalog_core.py --file games.d list     （シャード形式のフォルダを操作）
+    python catalog_core.py --trace trace.json save  （処理時間のトレースを書き出す）
+    python catalog_core.py gui
+
+tkinter は gui を起動するときだけ読み込み、URLチェックなどのモジュールも
+使うコマンドでだけ読み込むので、起動にかかる時間はごくわずか。
+"""
+import argparse
+import atexit
+import copy
+import json
+import os
+import sys
+from datetime import datetime
+
+from backup_store import BackupStore, DEFAULT_BACKUP_DIR, keyed_games
+from catalog import GameCatalog, COLLATION_SIMPLE
+from bulk_import import IMPORT_LABELS, IMPORT_NEW, IMPORT_REPLACE, ImportFileError, plan_import, read_import_file
+from catalog_loader import CatalogLoader, LoadMetrics
+from catalog_store import CatalogStore, JournalMismatchError, replay_journal
+from game_record import as_game, json_default
+from perf_trace import RECORDER, span
+from facet_index import FACET_FIELDS, FacetIndex
+from fuzzy_search import FuzzyIndex
+from search_index import SearchIndex
+from shard_store import ShardedCatalogStore, is_sharded, export_flat
+
+DEFAULT_JSON_FILE = "games.json"
+
+# いずれか1つは必須のURL
+REQUIRED_URL_FIELDS = ("unityroomurl", "githuburl")
+
+
+def validate_game(game):
+    """ゲームの必須項目をチェック
+
+    Returns:
+        str: 問題があればエラーメッセージ、なければ None
+    """
+    if not game.get("name"):
+        return "ゲーム名を入力してください"
+    if not any((game.get(field) or "").strip() for field in REQUIRED_URL_FIELDS):
+        return "GitHubURLまたはUnityRoomURLのいずれか1つ以上を入力してください"
+    return None
+
+
+def validate_catalog(games):
+    """カタログ全体をチェック（必須項目と名前の重複）
+
+    Returns:
+        list: (ゲーム名, エラーメッセージ) のリスト
+    """
+    problems = []
+    seen = set()
+    for game in games:
+        name = game.get("name", "")
+        error = validate_game(game)
+        if error:
+            problems.append((name, error))
+        if name and name in seen:
+            problems.append((name, "同じ名前のゲームが複数あります"))
+        seen.add(name)
+    return problems
+
+
+def generate_commit_message():
+    """コミットメッセージを自動生成"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
+    return f"Update games.json ({timestamp})"
+
+
+class CatalogCore:
+    """games.json のカタログ（GUIなし）
+
+    ゲームの追加・更新・削除はカタログ・変更記録・検索インデックスをまとめて更新する。
+    games はエディターの games_data と同じリスト（名前順）。
+
+    json_file にフォルダを指定するとシャード形式（shard_store.py）で読み書きする。
+    その場合ゲームは名前だけの状態で読み込まれ、本体は ensure_loaded で必要なときに読む。
+
+    Args:
+        json_file (str): games.json（またはシャード形式のフォルダ）のパス
+        backup_dir (str): バックアップフォルダ
+        collation (str): 並び順の種類
+    """
+
+    def __init__(self, json_file=DEFAULT_JSON_FILE, backup_dir=DEFAULT_BACKUP_DIR, collation=COLLATION_SIMPLE):
+        self.json_file = json_file
+        self.sharded = is_sharded(json_file)
+        # アトミック保存と編集ジャーナル
+        # シャード形式のバックアップは保存の中で変わったシャードの分だけ作る（shard_store を参照）
+        self.store = ShardedCatalogStore(json_file, backup_dir) if self.sharded else CatalogStore(json_file)
+        self.backup_store = BackupStore(backup_dir)  # 重複排除・差分圧縮つきのバックアップ
+        self.catalog = GameCatalog(collation)  # ゲームと安定IDの対応表
+        self.games = self.catalog.games
+        self.search_index = SearchIndex(key_func=self.catalog.id_of, order_func=self.catalog.index_of)
+        self.facet_index = FacetIndex(key_func=self.catalog.id_of)  # タグ・作者 → ゲームID
+        # あいまい検索のインデックス（使わなければメモリを使わないように、最初のあいまい検索で作る）
+        self.fuzzy_index = FuzzyIndex(key_func=self.catalog.id_of, order_func=self.catalog.index_of)
+        self.fuzzy_ready = False
+        self.stale_journal = None  # 読み込み時に退避したジャーナルのパス
+        self._file_ids = []
+
+    @property
+    def dirty(self):
+        """前回の保存（読み込み）以降に未保存の変更があるかどうか"""
+        return self.catalog.journal.dirty
+
+    def changes(self):
+        """前回の保存以降に変更されたゲーム (ID, 変更の種類, ゲーム名) の一覧"""
+        return self.catalog.journal.changes()
+
+    # --- 読み込み ------------------------------------------------------
+
+    def load(self):
+        """games.json を読み込む
+
+        異常終了したセッションのジャーナルが games.json に対応していない場合は
+        .stale に退避して stale_journal にそのパスを入れる。
+
+        Returns:
+            tuple: 復元できる前回の編集 (ヘッダー, 編集のリスト)。なければ None
+        """
+        self._begin_loading()
+        with span("load.parse"):
+            games = self.store.load()
+        self.add_loaded(games)
+        return self.finish_loading()
+
+    def start_loading(self, metrics=None):
+        """バックグラウンドでの読み込みを始める
+
+        返した CatalogLoader の poll で取り出したゲームを add_loaded で追加し、
+        読み込みが終わったら finish_loading を呼ぶ（それまでは編集・保存しないこと）。
+
+        Args:
+            metrics (LoadMetrics): 計測の記録先（省略時は今を起点にする）
+
+        Returns:
+            CatalogLoader: 読み込みの進捗と結果
+        """
+        self._begin_loading()
+        return CatalogLoader(self.store, metrics or LoadMetrics())
+
+    def add_loaded(self, games):
+        """読み込んだゲームをカタログと検索インデックスに追加（変更記録には残さない）"""
+        with span("load.add_batch", games=len(games)):
+            self._file_ids.extend(self.catalog.extend(games))
+            for game in games:
+                self._index_add(game)
+
+    def finish_loading(self):
+        """読み込みを終えて前回のセッションのジャーナルを確認する（戻り値は load と同じ）"""
+        self.stale_journal = None
+        recovery = None
+        try:
+            recovery = self.store.read_journal()
+        except JournalMismatchError:
+            self.store.set_aside_journal()
+            self.stale_journal = self.store.journal_path + ".stale"
+
+        self.catalog.journal.reset()
+        self.store.begin(self._file_ids, self.catalog.journal.revision)
+        return recovery
+
+    def _begin_loading(self):
+        self.catalog.load([])
+        self._file_ids = []
+        self._index_rebuild([])
+
+    def recover(self, recovery):
+        """load が返した前回の編集を適用する
+
+        Returns:
+            int: 適用した編集の数
+        """
+        header, entries = recovery
+        applied = replay_journal(self.catalog, self._file_ids, header, entries)
+        self._index_rebuild(self.games)
+        return applied
+
+    def discard_recovery(self):
+        """前回の編集を復元せずに捨てる"""
+        self.store.discard_journal()
+
+    # --- 検索・並び順 ---------------------------------------------------
+
+    def ensure_loaded(self, game):
+        """シャード形式でまだ読み込んでいないゲームの本体を読み込む"""
+        if self.store.ensure_loaded(game):
+            self._index_update(game)
+        return game
+
+    def load_all(self):
+        """すべてのゲームの本体を読み込む（games.json 形式なら何もしない）"""
+        if self.sharded:
+            for game in list(self.games):
+                self.ensure_loaded(game)
+
+    def search(self, query, facets=None, fuzzy=False):
+        """ゲーム名・作者・タグ・説明で検索（表示順。あいまい検索なら一致度の高い順）
+
+        シャード形式では作者・タグ・説明を検索するために、最初の検索で全ゲームの本体を読み込む。
+
+        Args:
+            query (str): 検索語
+            facets (dict): タグ・作者での絞り込み（filter_by_facets を参照）
+            fuzzy (bool): あいまい検索（表記ゆれ・打ち間違いも一致させる。fuzzy_search を参照）
+        """
+        if query or (facets and any(facets.values())):
+            self.load_all()
+        if fuzzy:
+            self.ensure_fuzzy_index()
+            with span("search.fuzzy", query=query):
+                return self.filter_by_facets(self.fuzzy_index.search(query), facets)
+        with span("search.filter", query=query):
+            return self.filter_by_facets(self.search_index.search(query), facets)
+
+    def ensure_fuzzy_index(self):
+        """あいまい検索のインデックスを作る（作ってあれば何もしない。以降は編集のたびに差分で更新する）"""
+        if self.fuzzy_ready:
+            return
+        self.load_all()
+        with span("search.fuzzy_build", games=len(self.games)):
+            self.fuzzy_index.rebuild(self.games)
+        self.fuzzy_ready = True
+
+    def filter_by_facets(self, games, facets):
+        """タグ・作者で絞り込む（指定したタグ・作者をすべて持つゲームだけを残す）
+
+        Args:
+            games (list): 絞り込むゲーム（順番は保つ）
+            facets (dict): "tags" / "authors" → 値の集合（None や空なら絞り込まない）
+        """
+        keys = self.facet_index.matching(facets) if facets else None
+        if keys is None:
+            return list(games)
+        id_of = self.catalog.id_of
+        return [game for game in games if id_of(game) in keys]
+
+    def set_collation(self, collation):
+        self.catalog.set_collation(collation)
+
+    def find(self, name):
+        """名前が一致する最初のゲーム（なければNone）"""
+        for game in self.games:
+            if game.get("name") == name:
+                return game
+        return None
+
+    # --- 編集 ----------------------------------------------------------
+
+    # 検索インデックスとタグ・作者の索引（作ってあればあいまい検索のインデックスも）は、
+    # カタログと一緒に差分で更新する
+    def _index_add(self, game):
+        self.search_index.add(game)
+        self.facet_index.add(game)
+        if self.fuzzy_ready:
+            self.fuzzy_index.add(game)
+
+    def _index_update(self, game):
+        self.search_index.update(game)
+        self.facet_index.update(game)
+        if self.fuzzy_ready:
+            self.fuzzy_index.update(game)
+
+    def _index_remove(self, game):
+        self.search_index.remove(game)
+        self.facet_index.remove(game)
+        if self.fuzzy_ready:
+            self.fuzzy_index.remove(game)
+
+    def _index_rebuild(self, games):
+        self.search_index.rebuild(games)
+        self.facet_index.rebuild(games)
+        if self.fuzzy_ready:
+            self.fuzzy_index.rebuild(games)
+
+    def add(self, game):
+        """ゲームを名前順の位置に追加してIDを返す（辞書なら Game にする）"""
+        game = as_game(game)
+        game_id = self.catalog.add(game)
+        self._index_add(game)
+        return game_id
+
+    def add_many(self, games):
+        """複数のゲームを追加してIDのリストを返す（並べ替えは1回だけ）"""
+        games = [as_game(game) for game in games]
+        with span("core.add_many", games=len(games)):
+            ids = self.catalog.add_many(games)
+            for game in games:
+                self._index_add(game)
+        return ids
+
+    def update(self, game_id, game_data):
+        """ゲームの内容を置き換える（IDと辞書オブジェクトは維持）"""
+        self.ensure_loaded(self.catalog.get(game_id))
+        game = self.catalog.update(game_id, game_data)
+        self._index_update(game)
+        return game
+
+    def remove(self, game_id):
+        """ゲームを削除して返す"""
+        self.ensure_loaded(self.catalog.get(game_id))
+        self._index_remove(self.catalog.get(game_id))
+        return self.catalog.remove(game_id)
+
+    def batch_update(self, game_ids, edit):
+        """複数のゲームに同じ編集をまとめて反映する（batch_edit.py の編集）
+
+        先にすべてのゲームの変更後の内容を求めてから反映するので、編集が途中で
+        例外を出した場合はどのゲームも変わらない。
+
+        Args:
+            game_ids (list): 編集するゲームのID
+            edit (callable): ゲームを受け取り、変更後の内容（変わらなければ None）を返す関数
+
+        Returns:
+            list: 内容が変わったゲームのID
+        """
+        games = [self.ensure_loaded(self.catalog.get(game_id)) for game_id in game_ids]
+        changes = []
+        for game_id, game in zip(game_ids, games):
+            changed = edit(game)
+            if changed is not None:
+                changes.append((game_id, changed))
+        with span("core.batch_update", games=len(changes)):
+            for game_id, changed in changes:
+                game = self.catalog.update(game_id, changed)
+                self._index_update(game)
+        return [game_id for game_id, _ in changes]
+
+    def remove_many(self, game_ids):
+        """複数のゲームをまとめて削除して返す"""
+        with span("core.remove_many", games=len(game_ids)):
+            for game_id in game_ids:
+                game = self.catalog.get(game_id)
+                if game is not None:
+                    self.ensure_loaded(game)
+                    self._index_remove(game)
+            return self.catalog.remove_many(game_ids)
+
+    def restore(self, games, remove_missing=False):
+        """バックアップや履歴のゲームを反映（同じキーのゲームを置き換える）
+
+        Args:
+            games (dict): ゲームキー → ゲーム（Noneなら現在のゲームを削除）
+            remove_missing (bool): games にないゲームを削除する（カタログ全体の復元）
+
+        Returns:
+            int: 追加・更新・削除したゲームの数
+        """
+        self.load_all()
+        current = dict(keyed_games(list(self.games)))
+        if remove_missing:
+            games = dict(games)
+            for key in current:
+                games.setdefault(key, None)
+
+        changed = 0
+        for key, game in games.items():
+            existing = current.get(key)
+            if game is None:
+                if existing is None:
+                    continue
+                self.remove(self.catalog.id_of(existing))
+            elif existing is None:
+                self.add(copy.deepcopy(game))
+            elif existing != game:
+                self.update(self.catalog.id_of(existing), copy.deepcopy(game))
+            else:
+                continue
+            changed += 1
+        return changed
+
+    def plan_import(self, path):
+        """CSV / JSONL のファイルを読み、行ごとに追加・置き換え・重複・エラーに分類する
+
+        Raises:
+            OSError: ファイルが読めない
+            ImportFileError: 形式が正しくない
+        """
+        # 置き換えかどうかを内容で比べるので、シャード形式では本体を読み込んでおく
+        self.load_all()
+        return plan_import(read_import_file(path), self.games, validate_game)
+
+    def import_plan(self, plan, replace=False, allow_broken_links=False):
+        """plan_import で分類した行を取り込む（保存はしない）
+
+        Args:
+            plan (ImportPlan): 取り込む内容
+            replace (bool): 同じ名前のゲームを置き換える
+            allow_broken_links (bool): 無効なURLがある行も取り込む
+
+        Returns:
+            tuple: (追加した数, 置き換えた数)
+        """
+        new_games = []
+        replaced = 0
+        for row in plan.selected(replace, allow_broken_links):
+            existing_id = self.catalog.find_id(row.existing) if row.status == IMPORT_REPLACE else None
+            if existing_id is not None:
+                self.update(existing_id, row.game.copy())
+                replaced += 1
+            else:
+                # 分類した後に置き換え先が削除されていれば追加する
+                new_games.append(row.game.copy())
+        self.add_many(new_games)
+        return len(new_games), replaced
+
+    def append_journal(self):
+        """未書き込みの編集をジャーナルに追記（自動保存）
+
+        Raises:
+            OSError: 書き込みに失敗した
+        """
+        return self.store.append(self.catalog.journal.entries)
+
+    # --- 保存 ----------------------------------------------------------
+
+    def create_backup(self):
+        """保存前の games.json のバックアップを作成（直前と同じ内容なら新しい版は作らない）"""
+        with span("core.create_backup"):
+            data = self.store.saved_bytes()
+            if data is not None:
+                self.backup_store.add(data)
+                # 保持ポリシーに従って古い版を間引く
+                self.backup_store.prune()
+
+    def save(self):
+        """バックアップを作ってから games.json をアトミックに保存"""
+        self.create_backup()
+        game_ids = [self.catalog.id_of(game) for game in self.games]
+        with span("core.write", games=len(self.games)):
+            self.store.save(self.games, game_ids, self.catalog.journal.revision)
+        self.catalog.journal.mark_saved()
+
+    def export(self, path):
+        """games.json 形式（ランチャーが読む1つの配列）で書き出す"""
+        export_flat(self.store, self.games, path)
+
+    def commit(self, message=None, push=False, remote="origin", branch="main"):
+        """games.json をコミット（とプッシュ）する。完了するまで待つ
+
+        Returns:
+            tuple: (成功したかどうか, メッセージ)
+        """
+        from git_worker import run_git
+
+        repo_dir = os.path.dirname(os.path.abspath(self.json_file))
+        path = os.path.basename(self.json_file)
+        ok, output = run_git(["add", "--", path], repo_dir)
+        if not ok:
+            return False, output
+        ok, output = run_git(["diff", "--staged", "--name-only"], repo_dir)
+        if not ok:
+            return False, output
+        if not output.strip():
+            return True, "コミットする変更がありません"
+        ok, output = run_git(["commit", "-m", message or generate_commit_message()], repo_dir)
+        if not ok:
+            return False, output
+        if push:
+            ok, output = run_git(["push", remote, branch], repo_dir)
+            if not ok:
+                return False, output
+            return True, "コミット・プッシュ完了"
+        return True, "コミット完了"
+
+    def close(self):
+        """正常終了（ジャーナルを残さない。残っていれば次回は異常終了とみなして復元する）"""
+        self.store.discard_journal()
+
+
+# --- コマンドライン ------------------------------------------------------
+
+def _game_from_args(args):
+    return {
+        "name": args.name.strip(),
+        "authors": [author.strip() for author in args.author if author.strip()],
+        "tags": [tag.strip() for tag in args.tag if tag.strip()],
+        "unityroomurl": args.unityroom.strip(),
+        "githuburl": args.github.strip(),
+        "description": args.description.strip(),
+        "image": args.image.strip(),
+    }
+
+
+def _print_games(games, as_json):
+    if as_json:
+        print(json.dumps(games, ensure_ascii=False, indent=2, default=json_default))
+        return
+    for game in games:
+        authors = ", ".join(game.get("authors") or [])
+        print(f"{game.get('name', '')}\t{authors}\t{' '.join(game.get('tags') or [])}")
+
+
+def _load(core, args):
+    """games.json を読み込む（保存するコマンドで前回の編集が残っている場合は False）"""
+    recovery = core.load()
+    if core.stale_journal:
+        print(f"前回の未保存の編集は games.json が変更されているため {core.stale_journal} に退避しました", file=sys.stderr)
+    if recovery is None:
+        return True
+    if getattr(args, "recover", False):
+        print(f"前回保存されなかった編集を{core.recover(recovery)}件復元しました", file=sys.stderr)
+        return True
+    print(f"前回保存されなかった編集が{len(recovery[1])}件あります（--recover で復元できます）", file=sys.stderr)
+    # 保存するとジャーナルが消えるので、復元するかどうかを指定されるまで保存しない
+    return args.command not in ("add", "save", "import")
+
+
+def _print_import_plan(plan):
+    """追加以外の行と無効なURLのある行を表示"""
+    for row in plan.rows:
+        if row.status == IMPORT_NEW and not row.url_errors:
+            continue
+        detail = f": {row.message}" if row.message else ""
+        print(f"{row.line}行目 [{IMPORT_LABELS[row.status]}] {row.name or '名前なし'}{detail}")
+        for error in row.url_errors:
+            print(f"    ❌ {error}")
+    print(plan.summary())
+
+
+def _save(core, args):
+    core.save()
+    print(f"{core.json_file} を保存しました（{len(core.games)}件）")
+    if args.commit or args.push:
+        ok, message = core.commit(push=args.push)
+        print(message if ok else f"Git エラー: {message}", file=sys.stdout if ok else sys.stderr)
+        if not ok:
+            return 1
+    return 0
+
+
+def _export_trace(path):
+    try:
+        count = RECORDER.export_chrome_trace(path)
+    except OSError as e:
+        print(f"トレースを書き出せませんでした: {e}", file=sys.stderr)
+        return
+    print(f"{count}件の記録を {path} に書き出しました", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="games.json をGUIなしで操作します")
+    parser.add_argument("--file", default=DEFAULT_JSON_FILE, help="games.json のパス")
+    parser.add_argument("--backup-dir", default=DEFAULT_BACKUP_DIR, help="バックアップフォルダ")
+    parser.add_argument("--timing", action="store_true", help="読み込みにかかった時間を表示")
+    parser.add_argument("--trace", metavar="FILE", help="終了時に処理時間のトレース（Chrome形式のJSON）を書き出す")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = subparsers.add_parser("list", help="ゲームの一覧を名前順で表示")
+    list_parser.add_argument("--json", action="store_true", help="JSONで出力")
+
+    search_parser = subparsers.add_parser("search", help="ゲーム名・作者・タグ・説明で検索")
+    search_parser.add_argument("query", nargs="?", default="", help="検索語")
+    search_parser.add_argument("--tag", action="append", default=[], help="このタグを持つゲームに絞り込む（複数指定可）")
+    search_parser.add_argument("--author", action="append", default=[], help="この作者のゲームに絞り込む（複数指定可）")
+    search_parser.add_argument("--fuzzy", action="store_true",
+                               help="あいまい検索（全角半角・かな・打ち間違いも一致させ、一致度の高い順に表示）")
+    search_parser.add_argument("--json", action="store_true", help="JSONで出力")
+
+    add_parser = subparsers.add_parser("add", help="ゲームを追加して保存")
+    add_parser.add_argument("--name", required=True, help="ゲーム名")
+    add_parser.add_argument("--author", action="append", default=[], help="作者（複数指定可）")
+    add_parser.add_argument("--tag", action="append", default=[], help="タグ（複数指定可）")
+    add_parser.add_argument("--unityroom", default="", help="unityroomURL")
+    add_parser.add_argument("--github", default="", help="GitHubURL")
+    add_parser.add_argument("--description", default="", help="説明")
+    add_parser.add_argument("--image", default="", help="画像URL")
+    add_parser.add_argument("--check-urls", action="store_true", help="追加する前にURLをチェック")
+    add_parser.add_argument("--force", action="store_true", help="無効なURLがあっても追加")
+
+    facets_parser = subparsers.add_parser("facets", help="タグ・作者ごとのゲーム数を表示")
+    facets_parser.add_argument("--field", choices=FACET_FIELDS, default="tags", help="数える項目")
+    facets_parser.add_argument("--variants", action="store_true", help="表記ゆれの可能性がある値だけを表示")
+
+    subparsers.add_parser("validate", help="必須項目と名前の重複をチェック")
+
+    subparsers.add_parser("audit", help="全リンクを監査（link_audit.py のオプションを指定できます）",
+                          add_help=False)
+
+    save_parser = subparsers.add_parser("save", help="games.json を保存し直す（バックアップを作成）")
+
+    import_parser = subparsers.add_parser("import", help="CSV / JSONL のゲームをまとめて追加して保存")
+    import_parser.add_argument("input", help="取り込むファイル（.csv / .jsonl / .json）")
+    import_parser.add_argument("--replace", action="store_true", help="同じ名前のゲームを置き換える")
+    import_parser.add_argument("--check-urls", action="store_true", help="取り込む前にURLをチェック")
+    import_parser.add_argument("--force", action="store_true", help="無効なURLがあるゲームも取り込む")
+    import_parser.add_argument("--dry-run", action="store_true", help="分類を表示するだけで取り込まない")
+
+    for command_parser in (add_parser, save_parser, import_parser):
+        command_parser.add_argument("--recover", action="store_true", help="前回保存されなかった編集を復元してから保存")
+        command_parser.add_argument("--commit", action="store_true", help="保存後にGitコミット")
+        command_parser.add_argument("--push", action="store_true", help="コミット後にプッシュ")
+
+    export_parser = subparsers.add_parser("export", help="games.json 形式で書き出す（シャード形式からの変換にも使える）")
+    export_parser.add_argument("output", help="出力先のファイル")
+
+    subparsers.add_parser("gui", help="エディターを起動")
+
+    args, extra = parser.parse_known_args(argv)
+    if extra and args.command != "audit":
+        parser.error(f"不明な引数です: {' '.join(extra)}")
+    if args.trace:
+        atexit.register(_export_trace, args.trace)
+
+    if args.command == "gui":
+        # tkinter はここで初めて読み込む
+        from games_editor import main as gui_main
+        gui_main(args.file)
+        return 0
+    core = CatalogCore(args.file, args.backup_dir)
+    metrics = LoadMetrics()
+    if not _load(core, args):
+        return 1
+    if args.timing:
+        metrics.games = len(core.games)
+        if os.path.isfile(args.file):
+            metrics.bytes = os.path.getsize(args.file)
+        metrics.mark("interactive")
+        print(metrics.report(), file=sys.stderr)
+
+    if args.command in ("list", "validate", "facets", "audit"):
+        core.load_all()
+
+    if args.command == "list":
+        _print_games(core.games, args.json)
+    elif args.command == "search":
+        facets = {"tags": set(args.tag), "authors": set(args.author)}
+        _print_games(core.search(args.query, facets, fuzzy=args.fuzzy), args.json)
+    elif args.command == "facets":
+        if args.variants:
+            groups = core.facet_index.variants(args.field)
+            for values in groups:
+                print(" / ".join(f"{value}（{core.facet_index.count(args.field, value)}件）" for value in values))
+            print(f"表記ゆれの可能性: {len(groups)}組")
+        else:
+            for value, count in core.facet_index.counts(args.field):
+                print(f"{count}\t{value}")
+    elif args.command == "audit":
+        # シャード形式でも読めるように、読み込んだゲームを渡す（ファイルは link_audit で開き直さない）
+        from link_audit import main as audit_main
+        return audit_main(extra, games=core.games)
+    elif args.command == "validate":
+        problems = validate_catalog(core.games)
+        for name, message in problems:
+            print(f"❌ {name or '名前なし'}: {message}")
+        print(f"{len(core.games)}件中 {len(problems)}件の問題")
+        return 1 if problems else 0
+    elif args.command == "add":
+        game = _game_from_args(args)
+        error = validate_game(game)
+        if error is None and core.find(game["name"]) is not None:
+            error = f"同じ名前のゲームがすでにあります: {game['name']}"
+        if error:
+            print(error, file=sys.stderr)
+            return 1
+        if args.check_urls:
+            from url_checker import UrlChecker, UrlCheckCache
+            checker = UrlChecker(cache=UrlCheckCache())
+            try:
+                summary = checker.check_game(game)
+                checker.save_cache()
+            finally:
+                checker.shutdown()
+            for line in summary["results"]:
+                print(line)
+            if not summary["all_valid"] and not args.force:
+                print("無効なURLがあるため追加しませんでした（--force で追加できます）", file=sys.stderr)
+                return 1
+        core.add(game)
+        return _save(core, args)
+    elif args.command == "save":
+        return _save(core, args)
+    elif args.command == "import":
+        try:
+            plan = core.plan_import(args.input)
+        except (OSError, ImportFileError) as e:
+            print(f"{args.input} を読み込めません: {str(e)}", file=sys.stderr)
+            return 1
+        if args.check_urls:
+            from url_checker import UrlCheckCache
+            plan.check_urls(cache=UrlCheckCache())
+        _print_import_plan(plan)
+        if args.dry_run:
+            return 0
+        added, replaced = core.import_plan(plan, replace=args.replace, allow_broken_links=args.force)
+        if not added and not replaced:
+            print("取り込むゲームがありませんでした")
+            return 0
+        print(f"{added}件を追加し、{replaced}件を置き換えました")
+        return _save(core, args)
+    elif args.command == "export":
+        core.export(args.output)
+        print(f"{len(core.games)}件のゲームを {args.output} に書き出しました")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
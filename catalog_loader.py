@@ -0,0 +1,127 @@
+"""games.json のバックグラウンド読み込みと起動時間の計測
+
+CatalogLoader はワーカースレッドで CatalogStore.iter_load を回し、解析できたゲームを
+まとめてキューに積む。UIスレッドは poll で取り出してカタログと検索インデックスに
+追加するので、ファイル全体を読み終わる前に一覧を表示して操作を始められる。
+
+LoadMetrics は読み込みの各段階までの時間を記録する。
+    - window: ウィンドウが表示されるまで（UI側で記録する）
+    - first_batch: 最初のゲームを一覧に表示するまで
+    - parsed: ファイルを最後まで解析するまで
+    - interactive: 全ゲームが一覧と検索インデックスに入り、編集・保存できるようになるまで
+
+このモジュールは tkinter を import しない。
+"""
+import threading
+import time
+from collections import deque
+
+from perf_trace import span
+
+# 計測する段階と表示名
+LOAD_STAGES = (
+    ("window", "ウィンドウ表示"),
+    ("first_batch", "最初の表示"),
+    ("parsed", "解析完了"),
+    ("interactive", "操作可能"),
+)
+
+
+class LoadMetrics:
+    """読み込みの各段階までの時間（秒）
+
+    Args:
+        started (float): 計測の起点（time.perf_counter の値。省略時は今）
+    """
+
+    def __init__(self, started=None):
+        self.started = time.perf_counter() if started is None else started
+        self.games = 0
+        self.bytes = 0
+        self.times = {}
+
+    def mark(self, stage):
+        """段階に達した時間を記録（最初の1回だけ）"""
+        if stage not in self.times:
+            self.times[stage] = time.perf_counter() - self.started
+
+    def elapsed(self, stage):
+        """起点からその段階までの秒数（まだなら None）"""
+        return self.times.get(stage)
+
+    def report(self):
+        """1行の報告にする"""
+        parts = [f"{label} {self.times[stage]:.2f}秒" for stage, label in LOAD_STAGES if stage in self.times]
+        size = f"{self.bytes / 1024:.0f}KB" if self.bytes else "0KB"
+        return f"{self.games}件（{size}）を読み込みました: " + "・".join(parts)
+
+
+class CatalogLoader:
+    """カタログをワーカースレッドで読み込む
+
+    Args:
+        store (CatalogStore): 読み込むストア（読み込みが終わるまで他から使わないこと）
+        metrics (LoadMetrics): 計測の記録先（省略時は今を起点に新しく作る）
+    """
+
+    def __init__(self, store, metrics=None):
+        self.store = store
+        self.metrics = metrics or LoadMetrics()
+        self.bytes_read = 0
+        self.total_bytes = 0
+        self.error = None
+        self._batches = deque()
+        self._done = False
+        self._cancelled = False
+        self._thread = threading.Thread(target=self._run, name="catalog-loader", daemon=True)
+        self._thread.start()
+
+    @property
+    def progress(self):
+        """読み込んだ割合（0.0〜1.0）"""
+        if not self.total_bytes:
+            return 1.0 if self._done else 0.0
+        return min(1.0, self.bytes_read / self.total_bytes)
+
+    @property
+    def done(self):
+        """ファイルを最後まで読んだ（または失敗した）うえで、結果をすべて取り出したかどうか"""
+        return self._done and not self._batches
+
+    def poll(self):
+        """解析できたゲームを取り出す
+
+        Returns:
+            list: Game のリストのリスト（読み込んだ順）
+        """
+        batches = []
+        while self._batches:
+            batches.append(self._batches.popleft())
+        return batches
+
+    def cancel(self):
+        """読み込みを打ち切る（解析中のまとまりが終わったところで止まる）"""
+        self._cancelled = True
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def _on_progress(self, read, total):
+        self.bytes_read = read
+        self.total_bytes = total
+
+    def _run(self):
+        try:
+            with span("load.parse"):
+                for batch in self.store.iter_load(progress=self._on_progress):
+                    if self._cancelled:
+                        return
+                    self._batches.append(batch)
+            self.metrics.bytes = self.total_bytes
+            self.metrics.mark("parsed")
+        except Exception as e:
+            # 想定外の例外でも error に残す（読み込めたところまでで保存されないように）
+            self.error = e
+        finally:
+            self._done = True
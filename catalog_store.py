@@ -0,0 +1,421 @@
+"""games.json の保存と編集ジャーナル
+
+保存は一時ファイルに書き出して fsync してから名前を置き換えるので、
+書き込み中にクラッシュしたりディスクが一杯になったりしても games.json が
+途中で切れた状態になることはない。
+
+保存と保存の間の編集は、追記専用のジャーナル（games.json.journal）に1行ずつ
+書き出す（自動保存）。エディターが異常終了した場合は、次に読み込むときに
+ジャーナルを再生して未保存の編集を復元できる。
+
+読み込みは iter_load で games.json を少しずつ読みながら解析し、ゲームをまとめて返す
+（ファイル全体を読み終わる前に一覧を表示できる）。
+
+ジャーナルの形式（JSON Lines）:
+    1行目: {"type": "header", "version": 1, "base_sha256": ..., "ids": [...]}
+           ids は保存済みファイルの並び順に対応するゲームのID
+    2行目以降: {"type": "edit", "revision": ..., "op": ..., "id": ..., "game": {...}}
+"""
+import codecs
+import hashlib
+import json
+import os
+import stat
+import tempfile
+
+from catalog import CHANGE_ADDED, CHANGE_UPDATED, CHANGE_DELETED
+from game_record import Game, as_game, json_default
+
+JOURNAL_SUFFIX = ".journal"
+JOURNAL_VERSION = 1
+
+# 読み込みで一度に読むバイト数
+READ_CHUNK_SIZE = 64 * 1024
+# 読み込みでまとめて返すゲームの数（最初は少なくして早く表示し、倍々に増やす）
+FIRST_BATCH_SIZE = 100
+MAX_BATCH_SIZE = 5000
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+def serialize_games(games, newline="\n", trailer=""):
+    """games.json と同じ形式で文字列にする
+
+    Args:
+        games (list): ゲームのリスト
+        newline (str): 改行文字（読み込んだファイルが CRLF なら "\r\n"）
+        trailer (str): 配列の後に付ける空白（読み込んだファイルの末尾の改行など）
+    """
+    text = json.dumps(games, ensure_ascii=False, indent=2, default=json_default)
+    if newline != "\n":
+        # 文字列の中の改行は \n とエスケープされるので、置き換わるのは行の区切りだけ
+        text = text.replace("\n", newline)
+    return text + trailer
+
+
+def detect_layout(head, tail):
+    """ファイルの改行文字と、配列の後の空白を調べる（保存で元の書式を保つため）
+
+    Args:
+        head (bytes): ファイルの先頭
+        tail (bytes): ファイルの末尾
+
+    Returns:
+        tuple: (改行文字, 配列の後の空白)
+    """
+    newline = "\r\n" if b"\r\n" in head else "\n"
+    end = tail.rfind(b"]")
+    trailer = tail[end + 1:] if end >= 0 else b""
+    if trailer.strip(_WHITESPACE.encode('ascii')):
+        trailer = b""
+    return newline, trailer.decode('ascii')
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def iter_json_array(chunks):
+    """JSON の配列を、文字列の断片を受け取りながら要素ごとに返す
+
+    要素の途中で断片が切れていたら、次の断片を待ってから解析し直す。
+
+    Args:
+        chunks (iterable): ファイルの内容を順に分けた文字列
+
+    Raises:
+        ValueError: 配列の形式が正しくない
+    """
+    buffer = ""
+    position = 0
+    started = False        # "[" を読んだか
+    expect_value = True    # 次は要素（"," の直後）か
+    finished = False
+    for chunk in chunks:
+        buffer = buffer[position:] + chunk
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            if position >= len(buffer) or finished:
+                break
+            char = buffer[position]
+            if not started:
+                if char != "[":
+                    raise ValueError("games.json の先頭が配列ではありません")
+                started = True
+                position += 1
+            elif char == "]":
+                finished = True
+                position += 1
+            elif not expect_value:
+                if char != ",":
+                    raise ValueError(f"games.json の形式が正しくありません（{char!r} の前に , がありません）")
+                expect_value = True
+                position += 1
+            else:
+                try:
+                    value, end = _decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    break  # 要素が次の断片に続いている
+                if end >= len(buffer):
+                    break  # 数値などは続きがあるかもしれない
+                yield value
+                position = end
+                expect_value = False
+    rest = buffer[position:].strip(_WHITESPACE)
+    if not finished:
+        if rest:
+            # 最後まで読んでも解析できない要素はそのままエラーにする
+            _decoder.raw_decode(rest)
+        raise ValueError("games.json が途中で終わっています")
+    if rest:
+        raise ValueError("games.json の配列の後に余分なデータがあります")
+
+
+def _fsync_directory(path):
+    # 名前の置き換えをディスクに確定させる（Windowsではディレクトリを開けないので省略）
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _file_mode(path):
+    """保存するファイルの権限（既存のファイルの権限、なければ 0o666 から umask を引いたもの）"""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def atomic_write_bytes(path, data):
+    """一時ファイルに書いて fsync し、名前を置き換えて保存する"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp は 0600 で作るので、置き換える前に元のファイル（なければ umask）の権限にそろえる
+        os.chmod(temp_path, _file_mode(path))
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_directory(path)
+
+
+class JournalMismatchError(Exception):
+    """ジャーナルが現在の games.json に対応していない"""
+
+
+def _game_from_element(data, index):
+    """配列の要素から Game を作る（オブジェクトでなければ、途中までのカタログで上書き保存しないように ValueError）"""
+    if not isinstance(data, dict):
+        raise ValueError(f"games.json の {index} 番目の要素がオブジェクトではありません: {data!r}")
+    return Game.from_dict(data)
+
+
+class CatalogStore:
+    """games.json の読み込み・アトミック保存・編集ジャーナル
+
+    Args:
+        path (str): games.json のパス
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.journal_path = path + JOURNAL_SUFFIX
+        self.base_hash = None
+        # 読み込んだ games.json の改行文字と末尾の空白（保存しても書式だけの差分が出ないように保つ）
+        self.newline = "\n"
+        self.trailer = ""
+        self._header = None
+        self._written_revision = 0
+        self._journal_file = None
+
+    def load(self):
+        """games.json を読み込む（ファイル上の並び順の Game のリストを返す）"""
+        if not os.path.exists(self.path):
+            self.base_hash = None
+            return []
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        self.base_hash = content_hash(data)
+        self.newline, self.trailer = detect_layout(data[:READ_CHUNK_SIZE], data[-READ_CHUNK_SIZE:])
+        return [_game_from_element(game, index) for index, game in enumerate(json.loads(data.decode('utf-8')))]
+
+    def iter_load(self, progress=None, first_batch=FIRST_BATCH_SIZE, max_batch=MAX_BATCH_SIZE):
+        """games.json を少しずつ読みながら、ファイル上の並び順で Game をまとめて返す
+
+        最後まで読み終わると base_hash が設定される（load と同じ結果になる）。
+
+        Args:
+            progress (callable): progress(読んだバイト数, ファイルのバイト数) を読むたびに呼ぶ
+            first_batch (int): 最初にまとめて返すゲームの数（以降は倍々に増やす）
+            max_batch (int): まとめて返すゲームの数の上限
+        """
+        self.base_hash = None
+        if not os.path.exists(self.path):
+            return
+        digest = hashlib.sha256()
+        total = os.path.getsize(self.path)
+
+        edges = {"head": b"", "tail": b""}  # ファイルの先頭と末尾（改行文字と末尾の空白を調べる）
+
+        def chunks(f):
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            read = 0
+            while True:
+                data = f.read(READ_CHUNK_SIZE)
+                digest.update(data)
+                if data:
+                    if not edges["head"]:
+                        edges["head"] = data
+                    edges["tail"] = (edges["tail"] + data)[-2 * READ_CHUNK_SIZE:]
+                read += len(data)
+                if progress is not None:
+                    progress(read, total)
+                if not data:
+                    yield decoder.decode(b"", final=True)
+                    return
+                yield decoder.decode(data)
+
+        batch = []
+        batch_size = first_batch
+        with open(self.path, 'rb') as f:
+            for index, data in enumerate(iter_json_array(chunks(f))):
+                batch.append(_game_from_element(data, index))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+                    batch_size = min(batch_size * 2, max_batch)
+        self.base_hash = digest.hexdigest()
+        self.newline, self.trailer = detect_layout(edges["head"], edges["tail"])
+        if batch:
+            yield batch
+
+    def saved_bytes(self):
+        """保存済みの games.json の内容（バックアップ用。ファイルがなければ None）"""
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def ensure_loaded(self, game):
+        """ゲームの本体を読み込む（games.json は全体を読み込み済みなので何もしない）"""
+        return False
+
+    def full_games(self, games):
+        """ゲームの本体のリスト"""
+        return games
+
+    def save(self, games, ids, revision):
+        """games.json をアトミックに保存し、ジャーナルを新しく始める
+
+        Args:
+            games (list): 保存するゲーム（この順でファイルに書かれる）
+            ids (list): games に対応するゲームID
+            revision (int): 保存時点の変更記録のリビジョン
+        """
+        data = serialize_games(games, self.newline, self.trailer).encode('utf-8')
+        atomic_write_bytes(self.path, data)
+        self.base_hash = content_hash(data)
+        self.discard_journal()
+        self.begin(ids, revision)
+
+    def begin(self, ids, revision):
+        """現在の games.json を基準にジャーナルを始める（最初の追記時に書き出す）"""
+        self._close_journal()
+        self._header = {
+            "type": "header",
+            "version": JOURNAL_VERSION,
+            "base_sha256": self.base_hash,
+            "ids": list(ids),
+        }
+        self._written_revision = revision
+
+    def append(self, entries):
+        """未書き込みの編集をジャーナルに追記（自動保存）
+
+        Args:
+            entries (list): ChangeJournal.entries
+        """
+        new_entries = [e for e in entries if e["revision"] > self._written_revision]
+        if not new_entries or self._header is None:
+            return 0
+
+        lines = [json.dumps(dict(e, type="edit"), ensure_ascii=False, default=json_default) + "\n" for e in new_entries]
+        if self._journal_file is None:
+            # ヘッダーと最初の編集をまとめてアトミックに書き、以降は追記する
+            header = json.dumps(self._header, ensure_ascii=False) + "\n"
+            atomic_write_bytes(self.journal_path, (header + "".join(lines)).encode('utf-8'))
+            self._journal_file = open(self.journal_path, 'a', encoding='utf-8')
+        else:
+            self._journal_file.write("".join(lines))
+            self._journal_file.flush()
+            os.fsync(self._journal_file.fileno())
+        self._written_revision = new_entries[-1]["revision"]
+        return len(new_entries)
+
+    def read_journal(self):
+        """前回のセッションのジャーナルを読む
+
+        Returns:
+            tuple: (ヘッダー, 編集のリスト)。ジャーナルがなければ None
+
+        Raises:
+            JournalMismatchError: ジャーナル作成後に games.json が変わっている場合
+        """
+        self._close_journal()
+        if not os.path.exists(self.journal_path):
+            return None
+
+        header = None
+        entries = []
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # 書き込み途中で止まった最後の行は捨てる
+                    break
+                if record.get("type") == "header":
+                    header = record
+                elif record.get("type") == "edit":
+                    entries.append(record)
+
+        if header is None or not entries:
+            return None
+        if header.get("version") != JOURNAL_VERSION or header.get("base_sha256") != self.base_hash:
+            raise JournalMismatchError("ジャーナル作成後に games.json が変更されています")
+        return header, entries
+
+    def set_aside_journal(self):
+        """使えないジャーナルを .stale に退避する（手作業で確認できるように残す）"""
+        self._close_journal()
+        if os.path.exists(self.journal_path):
+            os.replace(self.journal_path, self.journal_path + ".stale")
+
+    def discard_journal(self):
+        """ジャーナルを削除"""
+        self._close_journal()
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def close(self):
+        self._close_journal()
+
+    def _close_journal(self):
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+
+
+def replay_journal(catalog, file_ids, header, entries):
+    """ジャーナルの編集をカタログに適用する
+
+    Args:
+        catalog (GameCatalog): games.json を読み込んだ直後のカタログ
+        file_ids (list): ファイル上の並び順に対応する、現在のカタログのID
+        header (dict): ジャーナルのヘッダー
+        entries (list): ジャーナルの編集
+
+    Returns:
+        int: 適用した編集の数
+    """
+    if len(header["ids"]) != len(file_ids):
+        raise JournalMismatchError("ジャーナルのゲーム数が games.json と一致しません")
+
+    # 前回のセッションのID → 現在のID
+    id_map = dict(zip(header["ids"], file_ids))
+    applied = 0
+    for entry in entries:
+        op = entry["op"]
+        if op == CHANGE_ADDED:
+            id_map[entry["id"]] = catalog.add(as_game(entry["game"]))
+        elif op == CHANGE_UPDATED:
+            game_id = id_map.get(entry["id"])
+            if game_id not in catalog:
+                continue
+            catalog.update(game_id, entry["game"])
+        elif op == CHANGE_DELETED:
+            game_id = id_map.pop(entry["id"], None)
+            if game_id not in catalog:
+                continue
+            catalog.remove(game_id)
+        else:
+            continue
+        applied += 1
+    return applied
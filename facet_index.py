@@ -0,0 +1,130 @@
+"""タグ・作者の絞り込み（ファセット）の索引
+
+タグ → ゲームのキーの集合、作者 → ゲームのキーの集合を持ち、ゲームの追加・更新・削除の
+たびに差分で更新する。タグや作者ごとのゲーム数はカタログを数え直さずに求まり、
+複数のタグ・作者での絞り込みは集合の共通部分で求める。
+
+表記ゆれ（"#シューティング" と "シューティング"、全角と半角、ひらがなとカタカナなど）は、
+正規化すると同じになる値をまとめて variants で取り出せる。
+
+このモジュールは tkinter を import しない。
+"""
+from catalog import COLLATION_JAPANESE, collation_key
+
+FACET_FIELDS = ("tags", "authors")
+
+
+def variant_key(value):
+    """表記ゆれを比べるためのキー（NFKC・大文字小文字・かな・先頭の#・空白を無視）"""
+    return "".join(collation_key(value, COLLATION_JAPANESE).lstrip("#").split())
+
+
+class FacetIndex:
+    """タグ・作者 → ゲームのキーの集合
+
+    Args:
+        key_func (callable): ゲームからキー（カタログのID）を返す関数
+        fields (tuple): 索引を作る項目
+    """
+
+    def __init__(self, key_func=id, fields=FACET_FIELDS):
+        self.key_func = key_func
+        self.fields = fields
+        self.version = 0
+        self._keys = {field: {} for field in fields}   # 項目 → 値 → キーの集合
+        self._values = {}                              # キー → 項目ごとの値のタプル
+
+    def __len__(self):
+        return len(self._values)
+
+    def rebuild(self, games):
+        """全ゲームから索引を作り直す"""
+        for keys in self._keys.values():
+            keys.clear()
+        self._values.clear()
+        for game in games:
+            self.add(game)
+
+    def add(self, game):
+        """ゲームを索引に追加"""
+        key = self.key_func(game)
+        values = tuple(tuple(dict.fromkeys(game.get(field) or ())) for field in self.fields)
+        self._values[key] = values
+        for field, field_values in zip(self.fields, values):
+            keys_by_value = self._keys[field]
+            for value in field_values:
+                keys_by_value.setdefault(value, set()).add(key)
+        self.version += 1
+
+    def remove(self, game):
+        """ゲームを索引から削除"""
+        key = self.key_func(game)
+        values = self._values.pop(key, None)
+        if values is None:
+            return
+        for field, field_values in zip(self.fields, values):
+            keys_by_value = self._keys[field]
+            for value in field_values:
+                keys = keys_by_value.get(value)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del keys_by_value[value]
+        self.version += 1
+
+    def update(self, game):
+        """内容が変わったゲームを索引し直す"""
+        self.remove(game)
+        self.add(game)
+
+    def count(self, field, value):
+        return len(self._keys[field].get(value, ()))
+
+    def counts(self, field, within=None):
+        """値ごとのゲーム数（多い順、同じ数なら値の順）
+
+        Args:
+            field (str): "tags" または "authors"
+            within (set): 指定するとこのキーの中だけで数える（絞り込み中の件数）
+
+        Returns:
+            list: (値, ゲーム数) のリスト
+        """
+        if within is None:
+            items = [(value, len(keys)) for value, keys in self._keys[field].items()]
+        else:
+            items = [(value, len(keys & within)) for value, keys in self._keys[field].items()]
+        items.sort(key=lambda item: (-item[1], item[0]))
+        return items
+
+    def matching(self, filters):
+        """すべての条件に当てはまるゲームのキー
+
+        Args:
+            filters (dict): 項目 → 値の集合（値はすべて持っているものを選ぶ）
+
+        Returns:
+            set: キーの集合（条件がなければ None）
+        """
+        sets = [self._keys[field].get(value, set()) for field, values in filters.items() for value in values]
+        if not sets:
+            return None
+        sets.sort(key=len)
+        result = set(sets[0])
+        for keys in sets[1:]:
+            result &= keys
+            if not result:
+                break
+        return result
+
+    def variants(self, field):
+        """表記ゆれの可能性がある値の組
+
+        Returns:
+            list: 正規化すると同じになる値のリスト（2つ以上）のリスト
+        """
+        groups = {}
+        for value in self._keys[field]:
+            groups.setdefault(variant_key(value), []).append(value)
+        return sorted((sorted(values) for values in groups.values() if len(values) > 1),
+                      key=lambda values: values[0])
@@ -0,0 +1,246 @@
+"""あいまい検索（表記ゆれ・打ち間違いに強い検索と、一致度順の並べ替え）
+
+通常の検索（search_index）は小文字化した部分文字列の一致なので、"space parabox" で
+"Space Parrabox" は見つからず、全角と半角・ひらがなとカタカナの違いでも見つからない。
+あいまい検索では次のようにする。
+    - ゲームごとに名前・作者・タグ・説明を正規化（NFKC・大文字小文字・かな・空白）したテキストを
+      索引に追加するときに1回だけ作って持っておく
+    - 正規化したテキストの3文字の N-gram（トライグラム）を項目ごとに転置インデックスにする
+    - 検索語のトライグラムのうち、項目に含まれる割合（一致度）が FUZZY_THRESHOLD 以上なら一致とし、
+      一致度に項目の重み（名前 > 作者・タグ > 説明）を掛けた点数の高い順に並べる
+キーストロークごとの検索では、検索語のトライグラムを含むゲームだけを数えるので、
+全ゲームの文字列を比べ直すことはない。
+
+このモジュールは tkinter を import しない。
+"""
+import sys
+import threading
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+from catalog import COLLATION_JAPANESE, collation_key
+
+# 項目と重み（一致度に掛ける。名前の一致を作者・タグ、説明の一致より上に並べる）
+FUZZY_FIELDS = (
+    ("name", 1.0),
+    ("authors", 0.6),
+    ("tags", 0.6),
+    ("description", 0.3),
+)
+
+# 検索語のトライグラムのうち、この割合以上が含まれる項目を一致とする
+FUZZY_THRESHOLD = 0.6
+
+# 名前と検索語が似ているほど（名前が短く、検索語に近いほど）上に並べるための加点の最大値
+NAME_SIMILARITY_BONUS = 0.1
+
+# 複数の値（作者・タグ）をつなぐ文字（部分文字列の確認で値をまたいで一致しないように）
+VALUE_SEPARATOR = "\x00"
+
+# 検索中にキャンセルを確認する間隔（候補数）
+CANCEL_CHECK_INTERVAL = 512
+
+
+def normalize_text(text):
+    """あいまい検索用に正規化（NFKC・大文字小文字・ひらがなとカタカナを同一視し、空白を1つにまとめる）"""
+    return " ".join(collation_key(str(text or ""), COLLATION_JAPANESE).split())
+
+
+def trigrams(text):
+    """正規化したテキストのトライグラムの集合（前後に空白を足して、語の始まりと終わりも数える）"""
+    if not text:
+        return set()
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@lru_cache(maxsize=4096)
+def _normalized_value(value):
+    # 作者・タグは同じ値が多くのゲームに付くので、正規化とトライグラムを使い回す
+    text = normalize_text(value)
+    return text, frozenset(trigrams(text))
+
+
+def _field_texts(game):
+    """ゲームの項目ごとの正規化したテキストとトライグラム（FUZZY_FIELDS の順）"""
+    texts = []
+    grams = []
+    for field, _ in FUZZY_FIELDS:
+        value = game.get(field)
+        if isinstance(value, (list, tuple)):
+            values = [_normalized_value(str(item)) for item in value]
+            texts.append(VALUE_SEPARATOR.join(text for text, _ in values))
+            grams.append(frozenset().union(*(value_grams for _, value_grams in values)))
+        else:
+            text = normalize_text(value)
+            texts.append(text)
+            grams.append(trigrams(text))
+    return tuple(texts), grams
+
+
+class FuzzyIndex:
+    """ゲームのあいまい検索インデックス
+
+    SearchIndex と同じく、ゲームの追加・更新・削除は差分で反映し、検索はワーカースレッドからも
+    呼ばれるので操作はロックで直列化する。結果は点数の高い順、同じ点数なら order_func
+    （キー→表示位置）の順に並べる。
+
+    Args:
+        key_func (callable): ゲームからキー（カタログのID）を返す関数
+        order_func (callable): キーから表示位置を返す関数
+    """
+
+    def __init__(self, key_func=id, order_func=None):
+        self.key_func = key_func
+        self.order_func = order_func
+        self.version = 0
+        self._lock = threading.RLock()
+        self._games = {}
+        self._texts = {}    # キー → 項目ごとの正規化したテキスト
+        self._postings = [defaultdict(set) for _ in FUZZY_FIELDS]   # 項目ごとのトライグラム → キーの集合
+
+    def __len__(self):
+        return len(self._games)
+
+    def rebuild(self, games):
+        """全ゲームからインデックスを作り直す"""
+        with self._lock:
+            self._games.clear()
+            self._texts.clear()
+            for postings in self._postings:
+                postings.clear()
+            for game in games:
+                self.add(game)
+
+    def add(self, game):
+        """ゲームをインデックスに追加"""
+        with self._lock:
+            key = self.key_func(game)
+            texts, grams = _field_texts(game)
+            self._games[key] = game
+            self._texts[key] = texts
+            for postings, field_grams in zip(self._postings, grams):
+                for gram in field_grams:
+                    postings[gram].add(key)
+            self.version += 1
+
+    def remove(self, game):
+        """ゲームをインデックスから削除"""
+        with self._lock:
+            key = self.key_func(game)
+            texts = self._texts.pop(key, None)
+            if texts is None:
+                return
+            del self._games[key]
+            for postings, text in zip(self._postings, texts):
+                for gram in _text_grams(text):
+                    keys = postings.get(gram)
+                    if keys is not None:
+                        keys.discard(key)
+                        if not keys:
+                            del postings[gram]
+            self.version += 1
+
+    def update(self, game):
+        """内容が変わったゲームを索引し直す"""
+        with self._lock:
+            self.remove(game)
+            self.add(game)
+
+    def search(self, query, cancelled=None):
+        """検索語に近いゲームを点数の高い順に返す（検索語が空なら全ゲームを表示順で返す）
+
+        Args:
+            query (str): 検索語
+            cancelled (callable): Trueを返したら検索を打ち切る（Noneを返す）
+        """
+        with self._lock:
+            scored = self.scores(query, cancelled)
+            if scored is None:
+                return None
+            if self.order_func is not None:
+                order_func = self.order_func
+                scored.sort(key=lambda item: (-item[1], _position_or_last(order_func(item[0]))))
+            else:
+                scored.sort(key=lambda item: -item[1])
+            return [self._games[key] for key, _ in scored]
+
+    def scores(self, query, cancelled=None):
+        """検索語に一致するゲームのキーと点数
+
+        Returns:
+            list: (キー, 点数) のリスト（順不同。キャンセルされたら None）
+        """
+        query = normalize_text(query)
+        with self._lock:
+            if not query:
+                return [(key, 0.0) for key in self._games]
+            query_grams = trigrams(query)
+            if len(query) < 3:
+                # トライグラムが作れない短い検索語は、正規化したテキストの部分一致で探す
+                return self._short_scores(query, cancelled)
+
+            total = len(query_grams)
+            needed = FUZZY_THRESHOLD * total
+            # 部分文字列として含んでいれば、前後の空白を含むトライグラム2つ以外は必ず一致する
+            floor = min(needed, total - 2)
+            best = {}
+            for index, (postings, (_, weight)) in enumerate(zip(self._postings, FUZZY_FIELDS)):
+                counts = Counter()
+                for gram in query_grams:
+                    keys = postings.get(gram)
+                    if keys:
+                        counts.update(keys)
+                candidates = [key for key, count in counts.items() if count >= floor]
+                for start in range(0, len(candidates), CANCEL_CHECK_INTERVAL):
+                    if cancelled is not None and cancelled():
+                        return None
+                    for key in candidates[start:start + CANCEL_CHECK_INTERVAL]:
+                        text = self._texts[key][index]
+                        coverage = 1.0 if query in text else counts[key] / total
+                        if coverage < FUZZY_THRESHOLD:
+                            continue
+                        score = coverage * weight
+                        if index == 0:
+                            score += NAME_SIMILARITY_BONUS * _similarity(query_grams, text)
+                        if score > best.get(key, 0.0):
+                            best[key] = score
+            return list(best.items())
+
+    def _short_scores(self, query, cancelled):
+        scored = []
+        items = list(self._texts.items())
+        for start in range(0, len(items), CANCEL_CHECK_INTERVAL):
+            if cancelled is not None and cancelled():
+                return None
+            for key, texts in items[start:start + CANCEL_CHECK_INTERVAL]:
+                # 重みの大きい項目から見て、最初に含んでいた項目の重みを点数にする（名前は前方一致に加点）
+                for index, text in enumerate(texts):
+                    if query in text:
+                        score = FUZZY_FIELDS[index][1]
+                        if index == 0 and text.startswith(query):
+                            score += NAME_SIMILARITY_BONUS
+                        scored.append((key, score))
+                        break
+        return scored
+
+
+def _position_or_last(position):
+    return position if position is not None else sys.maxsize
+
+
+def _text_grams(text):
+    """正規化したテキスト（作者・タグは VALUE_SEPARATOR でつないだもの）のトライグラム"""
+    grams = set()
+    for value in text.split(VALUE_SEPARATOR):
+        grams |= trigrams(value)
+    return grams
+
+
+def _similarity(query_grams, text):
+    """検索語と名前のトライグラムの Jaccard 係数（名前が検索語に近いほど1に近い）"""
+    grams = trigrams(text)
+    if not grams:
+        return 0.0
+    common = len(query_grams & grams)
+    return common / (len(query_grams) + len(grams) - common)
@@ -0,0 +1,228 @@
+"""ゲーム1件のレコード（games.json の1要素）
+
+読み込んだゲームは辞書ではなく Game として保持する。
+    - フィールドは __slots__ に持つので、辞書より1件あたりのメモリが少ない
+    - 作者・タグはタプルにして文字列を sys.intern する（同じタグは1つの文字列を共有する）
+    - 小文字化した名前と検索用の連結テキストは最初に使ったときに作ってキャッシュし、
+      フィールドが変わったら捨てる
+辞書と同じ get / [] / keys / items / update などが使えるので、これまでのコードはそのまま動く。
+games.json との変換は読み書きするところ（CatalogStore など）で from_dict / json_default を使う。
+
+games.json にない項目があっても失わないように、知らない項目は extra に辞書で残す。
+読み込んだ要素の項目の並びが GAME_FIELDS と違う（項目が欠けている・順番が違う）場合は、
+その並びを覚えておき、to_dict で同じ並びに戻す（欠けていた項目は空のままなら書かない）。
+読み込んで保存し直しても games.json が変わらないようにするため。
+"""
+import copy
+import sys
+
+GAME_FIELDS = ("name", "authors", "tags", "unityroomurl", "githuburl", "description", "image")
+LIST_FIELDS = ("authors", "tags")
+_FIELD_SET = frozenset(GAME_FIELDS)
+
+# 検索用テキストでフィールドをつなぐ文字（検索語がフィールドをまたいで一致しないように）
+FIELD_SEPARATOR = "\x00"
+
+
+def searchable_text(game):
+    """検索対象（名前・作者・タグ・説明）を小文字化して連結（Game ならキャッシュを使う）"""
+    if isinstance(game, Game):
+        return game.search_text
+    return _joined_text(game)
+
+
+def _joined_text(game):
+    parts = [str(game.get("name") or "")]
+    parts.extend(str(author) for author in game.get("authors") or ())
+    parts.extend(str(tag) for tag in game.get("tags") or ())
+    parts.append(str(game.get("description") or ""))
+    return FIELD_SEPARATOR.join(parts).lower()
+
+
+# 読み込んだ要素の項目の並び（同じ並びのゲームで1つのタプルを共有する）
+_KEY_ORDERS = {}
+
+
+def _source_keys(data):
+    """要素の項目の並び（GAME_FIELDS の順で全部そろっていれば None）"""
+    keys = tuple(data)
+    if keys[:len(GAME_FIELDS)] == GAME_FIELDS:
+        return None
+    return _KEY_ORDERS.setdefault(keys, keys)
+
+
+def _intern_all(values):
+    if not isinstance(values, (list, tuple)):
+        return values
+    return tuple(sys.intern(value) if isinstance(value, str) else value for value in values)
+
+
+class Game:
+    """ゲーム1件（辞書と同じように読み書きできる）"""
+
+    __slots__ = GAME_FIELDS + ("extra", "_name_lower", "_search_text", "_source_keys")
+
+    def __init__(self, name="", authors=(), tags=(), unityroomurl="", githuburl="", description="", image=""):
+        self.name = name
+        self.authors = _intern_all(authors)
+        self.tags = _intern_all(tags)
+        self.unityroomurl = unityroomurl
+        self.githuburl = githuburl
+        self.description = description
+        self.image = image
+        self.extra = None
+        self._name_lower = None
+        self._search_text = None
+        self._source_keys = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """games.json の1要素（辞書）から作る"""
+        game = cls()
+        game.fill_from_dict(data)
+        return game
+
+    def fill_from_dict(self, data):
+        """読み込んだ要素で項目を埋め、項目の並びを覚える（シャードのスタブに本体を読み込むときなど）"""
+        self.update(data)
+        self._source_keys = data._source_keys if isinstance(data, Game) else _source_keys(data)
+
+    def to_dict(self):
+        """games.json に書く形（辞書）にする（読み込んだときの項目の並びを保つ）"""
+        data = {}
+        for field in GAME_FIELDS:
+            value = getattr(self, field)
+            data[field] = list(value) if isinstance(value, tuple) else value
+        if self.extra:
+            data.update(copy.deepcopy(self.extra))
+        if self._source_keys is None:
+            return data
+        ordered = {key: data.pop(key) for key in self._source_keys if key in data}
+        for key, value in data.items():
+            # 読み込んだときになかった項目は、空のままなら書かない
+            if key in _FIELD_SET and not value:
+                continue
+            ordered[key] = value
+        return ordered
+
+    # --- 正規化したフィールド ---------------------------------------------
+
+    @property
+    def name_lower(self):
+        """小文字化したゲーム名"""
+        if self._name_lower is None:
+            self._name_lower = str(self.name or "").lower()
+        return self._name_lower
+
+    @property
+    def search_text(self):
+        """検索対象（名前・作者・タグ・説明）を小文字化して連結したテキスト"""
+        if self._search_text is None:
+            self._search_text = _joined_text(self)
+        return self._search_text
+
+    # --- 辞書と同じ操作 ---------------------------------------------------
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in _FIELD_SET:
+            setattr(self, key, _intern_all(value) if key in LIST_FIELDS else value)
+            self._name_lower = None
+            self._search_text = None
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        if key in _FIELD_SET:
+            self[key] = () if key in LIST_FIELDS else ""
+        elif self.extra and key in self.extra:
+            del self.extra[key]
+        else:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        if self.extra:
+            return self.extra.get(key, default)
+        return default
+
+    def __contains__(self, key):
+        return key in _FIELD_SET or bool(self.extra and key in self.extra)
+
+    def keys(self):
+        return list(GAME_FIELDS) + list(self.extra or ())
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(GAME_FIELDS) + len(self.extra or ())
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def update(self, other=(), **kwargs):
+        items = other.items() if hasattr(other, "items") else other
+        for key, value in items:
+            self[key] = value
+        for key, value in kwargs.items():
+            self[key] = value
+
+    def clear(self):
+        """すべての項目を空にする（オブジェクトと、読み込んだときの項目の並びは同じまま）"""
+        source_keys = self._source_keys
+        Game.__init__(self)
+        self._source_keys = source_keys
+
+    def copy(self):
+        game = Game.__new__(Game)
+        for slot in Game.__slots__:
+            setattr(game, slot, getattr(self, slot))
+        if self.extra:
+            game.extra = copy.deepcopy(self.extra)
+        return game
+
+    __copy__ = copy
+
+    def __deepcopy__(self, memo):
+        # 作者・タグはタプル、ほかは文字列なので共有してよい
+        return self.copy()
+
+    def _fields(self):
+        return tuple(getattr(self, field) for field in GAME_FIELDS) + (self.extra or None,)
+
+    def __eq__(self, other):
+        if isinstance(other, Game):
+            return self._fields() == other._fields()
+        if isinstance(other, dict):
+            return self._fields() == Game.from_dict(other)._fields()
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Game({self.name!r})"
+
+
+def as_game(data):
+    """辞書なら Game にする（Game ならそのまま返す）"""
+    return data if isinstance(data, Game) else Game.from_dict(data)
+
+
+def json_default(value):
+    """json.dumps の default に渡して Game を辞書として書き出す"""
+    if isinstance(value, Game):
+        return value.to_dict()
+    raise TypeError(f"{type(value).__name__} は JSON に変換できません")
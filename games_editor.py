@@ -1,34 +1,111 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import json
 import os
-import shutil
-import subprocess
+import sys
+import base64
+import difflib
+import json
 from datetime import datetime
-import urllib.request
-import urllib.error
 import threading
+import time
+
+# 起動時間の計測の起点（ウィンドウ表示・読み込み完了までの時間をここから測る）
+STARTED_AT = time.perf_counter()
+
+from url_checker import UrlChecker, UrlCheckCache
+from link_audit import LinkAudit, format_host_stats
+from search_index import SearchWorker
+from list_view import ListView
+from catalog_core import CatalogCore, validate_game, generate_commit_message
+from bulk_import import IMPORT_LABELS, IMPORT_NEW, IMPORT_REPLACE, ImportFileError
+from batch_edit import split_values, replace_values, add_values, remove_values, preview_edit
+from catalog_loader import LoadMetrics
+from facet_index import FACET_FIELDS
+from game_record import LIST_FIELDS, json_default
+from perf_trace import RECORDER, timed, format_duration, HISTOGRAM_BOUNDS_MS
+from git_worker import GitWorker
+from thumbnail_cache import ThumbnailCache
+from git_history import GitHistory, GitHistoryError, KIND_LABELS
+from backup_store import keyed_games, DIFF_ADDED, DIFF_REMOVED, DIFF_CHANGED
+from catalog import COLLATION_SIMPLE, COLLATION_JAPANESE, CHANGE_ADDED, CHANGE_UPDATED, CHANGE_DELETED
+
+# 検索入力が止まってから検索を実行するまでの待ち時間（ミリ秒）
+SEARCH_DEBOUNCE_MS = 200
+
+# Gitワーカーの進捗を確認する間隔（ミリ秒）
+GIT_POLL_MS = 200
+
+# バックグラウンド読み込みの進捗を確認する間隔（ミリ秒）
+LOAD_POLL_MS = 30
+
+# 処理時間ウィンドウの更新間隔（ミリ秒）
+PERF_OVERLAY_MS = 500
+
+# 画像URLの入力が止まってからサムネイルを読み込むまでの待ち時間（ミリ秒）
+THUMBNAIL_DELAY_MS = 300
+# 選択中のゲームの前後何件の画像を先読みするか
+THUMBNAIL_PREFETCH = 3
 
 class GamesEditor:
-    def __init__(self, root):
+    def __init__(self, root, json_file="games.json"):
         self.root = root
         self.root.title("Games.json エディター")
         self.root.geometry("600x750")
         self.root.resizable(False, False)  # 画面サイズ固定
         
-        # JSONファイルのパス
-        self.json_file = "games.json"
-        self.games_data = []
+        # JSONファイルのパス（フォルダを指定するとシャード形式で読み書きする）
+        self.json_file = json_file
+        self.core = CatalogCore(self.json_file)  # 読み込み・編集・検索・保存（GUIなしの処理）
+        self.store = self.core.store
+        self.backup_store = self.core.backup_store
+        self.catalog = self.core.catalog
+        self.games_data = self.core.games
         self.filtered_games = []  # 検索結果用
+        self.search_index = self.core.search_index
+        self.search_worker = SearchWorker(self.search_index, self.core.fuzzy_index)
+        self.search_delay_ms = SEARCH_DEBOUNCE_MS
+        self.search_after_id = None
+        # タグ・作者での絞り込み（項目 → 選んだ値の集合。検索語と組み合わせて絞り込む）
+        self.facet_filters = {field: set() for field in FACET_FIELDS}
+        self.facet_window = None
         self.is_new_game_mode = False  # 新規追加モードフラグ
         
+        # バックグラウンド読み込み（読み込み中・失敗時は編集と保存を止める）
+        self.loader = None
+        self.load_error = None
+        self.load_metrics = None
+        
         # 選択中のゲーム情報を追跡
         self.selected_game = None
-        self.selected_game_index = None
+        self.selected_game_id = None
+        
+        # URL検証エンジン（保存時のURLチェックをバックグラウンドで実行）
+        self.url_checker = UrlChecker(cache=UrlCheckCache())
+        self.url_check_job = None
+        
+        # 画像URLのサムネイル（メモリとディスクの2段キャッシュ・バックグラウンドで先読み）
+        self.thumbnail_cache = ThumbnailCache()
+        self.thumbnail_url = None
+        self.thumbnail_after_id = None
+        self.thumbnail_poll_id = None
+        
+        # 並び順の設定
+        self.collation_var = tk.StringVar(value=self.catalog.collation)
+        # あいまい検索（表記ゆれ・打ち間違いも探し、一致度の高い順に表示する）
+        self.fuzzy_search_var = tk.BooleanVar(value=False)
         
         # Git自動コミット設定
         self.auto_commit_enabled = tk.BooleanVar(value=True)  # デフォルトで有効
         self.auto_push_enabled = tk.BooleanVar(value=False)   # デフォルトで無効（プッシュは慎重に）
+        repo_dir = os.path.dirname(os.path.abspath(__file__))
+        # git はリポジトリで実行するので、開いているカタログのファイルはリポジトリからの相対パス（/ 区切り）で渡す
+        git_path = os.path.relpath(os.path.abspath(self.json_file), repo_dir).replace(os.sep, "/")
+        self.git_worker = GitWorker(repo_dir, paths=(git_path,))  # コミット・プッシュはバックグラウンドで実行
+        # ゲームごとの変更履歴（開いているカタログのファイルの履歴）
+        self.git_history = GitHistory(repo_dir, path=git_path)
+        
+        # 処理時間の表示ウィンドウ（F12 で開閉）
+        self.perf_overlay = None
         
         # GUI要素の初期化
         self.setup_ui()
@@ -37,28 +114,65 @@ class GamesEditor:
         self.add_new_game()
         # 閉じるボタンのプロトコル設定
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(GIT_POLL_MS, self._poll_git_worker)
 
     def has_unsaved_changes(self):
-        """メモリ上のデータとJSONファイルを比較して未保存の変更があるかチェック"""
-        try:
-            if not os.path.exists(self.json_file):
-                # ファイルが存在しない場合、メモリにデータがあれば未保存
-                return len(self.games_data) > 0
-            
-            with open(self.json_file, 'r', encoding='utf-8') as f:
-                file_data = json.load(f)
+        """前回の保存（読み込み）以降に未保存の変更があるかチェック"""
+        return self.core.dirty
+        
+    def update_unsaved_indicator(self):
+        """ステータスバーの未保存件数を更新"""
+        count = len(self.catalog.journal)
+        if count:
+            self.unsaved_label.configure(text=f"未保存の変更: {count}件", foreground="orange")
+        else:
+            self.unsaved_label.configure(text="", foreground="black")
             
-            # メモリ上のデータとファイルのデータを比較
-            return self.games_data != file_data
+    def on_catalog_changed(self):
+        """ゲームの追加・更新・削除の後処理（未保存件数の表示とジャーナルへの自動保存）"""
+        self.update_unsaved_indicator()
+        # 削除・復元でなくなったゲームのチェックを外す
+        removed = [key for key in self.game_list_view.marked_keys if key not in self.catalog]
+        if removed:
+            self.game_list_view.unmark(removed)
+        # 絞り込みウィンドウの件数を更新（索引は差分で更新済みなので数え直すだけ）
+        if self.facet_window is not None and self.facet_window.window.winfo_exists():
+            self.facet_window.refresh()
+        try:
+            self.core.append_journal()
+        except OSError as e:
+            self.show_status(f"自動保存に失敗しました: {str(e)}", "warning", auto_clear=False)
             
-        except Exception:
-            # ファイル読み込みエラーの場合は安全側に倒して未保存とみなす
-            return True
+    def show_unsaved_changes(self):
+        """前回の保存以降に変更されたゲームを一覧表示"""
+        changes = self.core.changes()
+        if not changes:
+            messagebox.showinfo("未保存の変更", "未保存の変更はありません")
+            return
+        labels = {CHANGE_ADDED: "追加", CHANGE_UPDATED: "更新", CHANGE_DELETED: "削除"}
+        lines = [f"[{labels[kind]}] {name or '名前なし'}" for _, kind, name in changes]
+        messagebox.showinfo("未保存の変更", f"{len(changes)}件の未保存の変更があります:\n\n" + "\n".join(lines))
 
     def on_close(self):
         if self.has_unsaved_changes():
             if not messagebox.askyesno("警告", "保存されていない変更があります。終了してもよろしいですか？"):
                 return
+        if self.loader is not None or self.load_error is not None:
+            # 読み込みが終わっていなければ前回のジャーナルを確認していないので、そのまま残す
+            if self.loader is not None:
+                self.loader.cancel()
+        else:
+            # 正常終了時はジャーナルを残さない（残っていれば異常終了とみなして次回復元する）
+            self.core.close()
+        self.cancel_url_check()
+        self.url_checker.shutdown()
+        self.search_worker.shutdown()
+        self.thumbnail_cache.shutdown()
+        # まとめるために待機しているコミットがあれば実行してから終了する
+        if self.git_worker.pending:
+            self.show_status("Gitコミットの完了を待っています...", "info", auto_clear=False)
+            self.root.update_idletasks()
+        self.git_worker.close()
         self.root.destroy()
 
     def show_status(self, message, status_type="info", auto_clear=True, duration=3000):
@@ -86,76 +200,67 @@ class GamesEditor:
         """ステータスバーをクリア"""
         self.status_label.configure(text="準備完了", foreground="green")
 
-    def run_git_command(self, command, show_output=True):
-        """Gitコマンドを実行"""
-        try:
-            result = subprocess.run(
-                command, 
-                shell=True, 
-                capture_output=True, 
-                text=True, 
-                cwd=os.path.dirname(os.path.abspath(__file__))
-            )
-            
-            if result.returncode == 0:
-                if show_output and result.stdout.strip():
-                    self.show_status(f"Git: {result.stdout.strip()}", "success")
-                return True, result.stdout.strip()
-            else:
-                error_msg = result.stderr.strip() or "Gitコマンドが失敗しました"
-                self.show_status(f"Git エラー: {error_msg}", "error", auto_clear=False)
-                return False, error_msg
-                
-        except Exception as e:
-            self.show_status(f"Git コマンド実行エラー: {str(e)}", "error", auto_clear=False)
-            return False, str(e)
-
     def git_commit_and_push(self, commit_message):
-        """Gitにコミットし、オプションでプッシュ"""
-        if not self.auto_commit_enabled.get():
-            return True
-            
-        self.show_status("Gitコミット中...", "info", auto_clear=False)
+        """Gitへのコミット（とオプションでプッシュ）をワーカーに依頼する
         
-        # ステージング
-        success, _ = self.run_git_command("git add games.json", show_output=False)
-        if not success:
-            return False
-            
-        # 変更があるかチェック
-        success, output = self.run_git_command("git diff --staged --name-only", show_output=False)
-        if not success:
-            return False
-            
-        if not output.strip():
-            self.show_status("コミットする変更がありません", "info")
+        コミットはバックグラウンドで実行され、続けて保存した場合は1回にまとめられる。
+        """
+        if not self.auto_commit_enabled.get():
             return True
             
-        # コミット
-        commit_cmd = f'git commit -m "{commit_message}"'
-        success, _ = self.run_git_command(commit_cmd, show_output=False)
-        if not success:
-            return False
-            
-        self.show_status("コミット完了", "success")
-        
-        # プッシュ（有効な場合）
-        if self.auto_push_enabled.get():
-            self.show_status("GitHubにプッシュ中...", "info", auto_clear=False)
-            success, _ = self.run_git_command("git push origin main", show_output=False)
-            if success:
-                self.show_status("プッシュ完了", "success")
-            else:
-                return False
-                
+        self.git_worker.request_commit(commit_message, push=self.auto_push_enabled.get())
         return True
+        
+    def _poll_git_worker(self):
+        """Gitワーカーの進捗をステータスバーに表示"""
+        for status_type, message in self.git_worker.poll():
+            self.show_status(message, status_type, auto_clear=status_type in ("success", "info"))
+        self.root.after(GIT_POLL_MS, self._poll_git_worker)
 
     def generate_commit_message(self):
         """コミットメッセージを自動生成"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-        return f"Update games.json ({timestamp})"
+        return generate_commit_message()
         
     def setup_ui(self):
+        # メニューバー
+        menubar = tk.Menu(self.root)
+        tools_menu = tk.Menu(menubar, tearoff=0)
+        tools_menu.add_command(label="全リンクを監査...", command=self.open_link_audit)
+        tools_menu.add_command(label="CSV / JSONL から一括インポート...", command=self.open_bulk_import)
+        tools_menu.add_command(label="未保存の変更を表示...", command=self.show_unsaved_changes)
+        tools_menu.add_command(label="バックアップを比較・復元...", command=self.open_backup_browser)
+        tools_menu.add_command(label="選択したゲームの変更履歴...", command=self.show_game_history)
+        tools_menu.add_separator()
+        tools_menu.add_command(label="処理時間のトレースを書き出す...", command=self.export_trace)
+        menubar.add_cascade(label="ツール", menu=tools_menu)
+        
+        # 一括編集（一覧で Ctrl+クリック・スペースキーでチェックしたゲームが対象）
+        batch_menu = tk.Menu(menubar, tearoff=0)
+        batch_menu.add_command(label="表示中のゲームをすべてチェック", command=lambda: self.game_list_view.mark_all())
+        batch_menu.add_command(label="チェックをすべて外す", command=lambda: self.game_list_view.clear_marks())
+        batch_menu.add_separator()
+        batch_menu.add_command(label="作者・タグを置換...", command=lambda: self.open_batch_edit("replace"))
+        batch_menu.add_command(label="タグを追加...", command=lambda: self.open_batch_edit("add"))
+        batch_menu.add_command(label="タグを削除...", command=lambda: self.open_batch_edit("remove"))
+        batch_menu.add_separator()
+        batch_menu.add_command(label="チェックしたゲームを削除...", command=self.delete_marked_games)
+        menubar.add_cascade(label="一括編集", menu=batch_menu)
+        
+        # 並び順
+        view_menu = tk.Menu(menubar, tearoff=0)
+        view_menu.add_radiobutton(label="名前順（大文字・小文字を区別しない）", variable=self.collation_var,
+                                  value=COLLATION_SIMPLE, command=self.on_collation_change)
+        view_menu.add_radiobutton(label="名前順（全角半角・ひらがなカタカナを区別しない）", variable=self.collation_var,
+                                  value=COLLATION_JAPANESE, command=self.on_collation_change)
+        view_menu.add_separator()
+        view_menu.add_checkbutton(label="あいまい検索（表記ゆれ・打ち間違いも探す）", variable=self.fuzzy_search_var,
+                                  command=self.on_fuzzy_search_change)
+        view_menu.add_command(label="タグ・作者で絞り込み...", command=self.open_facet_window)
+        view_menu.add_command(label="処理時間を表示", accelerator="F12", command=self.toggle_perf_overlay)
+        menubar.add_cascade(label="表示", menu=view_menu)
+        self.root.configure(menu=menubar)
+        self.root.bind('<F12>', lambda e: self.toggle_perf_overlay())
+        
         # メインフレーム
         main_frame = ttk.Frame(self.root, padding="10")
         main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -166,13 +271,14 @@ class GamesEditor:
         
         ttk.Label(search_frame, text="検索:").pack(side=tk.LEFT, padx=(0, 5))
         self.search_var = tk.StringVar()
-        self.search_var.trace('w', self.on_search_change)
+        self.search_var.trace('w', self.on_search_text_change)
         search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=30)
         search_entry.pack(side=tk.LEFT, padx=(0, 5))
         ttk.Button(search_frame, text="クリア", command=self.clear_search).pack(side=tk.LEFT)
         
         # ゲームリスト
         list_frame = ttk.LabelFrame(main_frame, text="ゲーム一覧", padding="5")
+        self.list_frame = list_frame
         list_frame.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
         
         # リストボックスとスクロールバー
@@ -186,15 +292,24 @@ class GamesEditor:
         # リストボックスの選択イベント
         self.game_listbox.bind('<<ListboxSelect>>', self.on_game_select)
         
+        # 一覧の表示層（差分更新・件数が多い場合は仮想表示）
+        self.game_list_view = ListView(self.game_listbox, scrollbar, label_func=lambda game: game.get("name", "名前なし"),
+                                       key_func=self.catalog.id_of, on_marks_changed=self.update_mark_indicator)
+        
         # ボタンフレーム
         button_frame = ttk.Frame(list_frame)
         button_frame.grid(row=1, column=0, columnspan=2, pady=(5, 0))
         
         ttk.Button(button_frame, text="新規ゲーム追加", command=self.add_new_game).pack(side=tk.LEFT, padx=(0, 5))
         ttk.Button(button_frame, text="選択したゲームを更新", command=self.update_current_game).pack(side=tk.LEFT, padx=(0, 5))
-        ttk.Button(button_frame, text="選択したゲームを削除", command=self.delete_game).pack(side=tk.LEFT, padx=(0, 5))
-        ttk.Button(button_frame, text="保存", command=self.save_games).pack(side=tk.LEFT, padx=(0, 5))
-        ttk.Button(button_frame, text="再読み込み", command=self.load_games).pack(side=tk.LEFT)
+        delete_button = ttk.Button(button_frame, text="選択したゲームを削除", command=self.delete_game)
+        delete_button.pack(side=tk.LEFT, padx=(0, 5))
+        save_button = ttk.Button(button_frame, text="保存", command=self.save_games)
+        save_button.pack(side=tk.LEFT, padx=(0, 5))
+        reload_button = ttk.Button(button_frame, text="再読み込み", command=self.load_games)
+        reload_button.pack(side=tk.LEFT)
+        # 読み込み中は無効にするボタン
+        self.loading_buttons = [delete_button, save_button, reload_button]
         
         # Git設定フレーム
         git_frame = ttk.LabelFrame(main_frame, text="Git設定", padding="5")
@@ -218,6 +333,13 @@ class GamesEditor:
         self.status_label = ttk.Label(status_frame, text="準備完了", foreground="green")
         self.status_label.pack(side=tk.LEFT)
         
+        # 未保存の変更件数
+        self.unsaved_label = ttk.Label(status_frame, text="")
+        self.unsaved_label.pack(side=tk.RIGHT)
+        
+        # 読み込みの進捗（読み込み中だけ表示）
+        self.load_progress = ttk.Progressbar(status_frame, length=120, mode="determinate", maximum=100)
+        
         # グリッド設定
         main_frame.columnconfigure(0, weight=1)
         main_frame.rowconfigure(3, weight=1)  # 編集フレームが3行目に移動
@@ -260,6 +382,7 @@ class GamesEditor:
         for field, label in basic_fields:
             ttk.Label(parent, text=label + ":").grid(row=row, column=0, sticky=tk.W, padx=(0, 5), pady=2)
             var = tk.StringVar()
+            var.trace('w', self.on_edit_field_change)
             entry = ttk.Entry(parent, textvariable=var, width=50)
             entry.grid(row=row, column=1, sticky=(tk.W, tk.E), pady=2)
             self.entry_vars[field] = var
@@ -276,6 +399,7 @@ class GamesEditor:
         for field, label in url_fields:
             ttk.Label(parent, text=label + ":").grid(row=row, column=0, sticky=tk.W, padx=(0, 5), pady=2)
             var = tk.StringVar()
+            var.trace('w', self.on_edit_field_change)
             entry = ttk.Entry(parent, textvariable=var, width=50)
             entry.grid(row=row, column=1, sticky=(tk.W, tk.E), pady=2)
             self.entry_vars[field] = var
@@ -287,17 +411,25 @@ class GamesEditor:
         ttk.Label(parent, text="その他の情報", font=('', 10, 'bold')).grid(row=row, column=0, columnspan=2, sticky=tk.W, pady=(0, 5))
         row += 1
         
+        # 画像URLのサムネイル（その他の情報の右側）
+        self.thumbnail_label = ttk.Label(parent, text="", anchor=tk.CENTER, width=8)
+        self.thumbnail_label.grid(row=row, column=2, rowspan=len(other_fields), padx=(5, 0))
+        
         for field, label in other_fields:
             ttk.Label(parent, text=label + ":").grid(row=row, column=0, sticky=tk.W, padx=(0, 5), pady=2)
             
             if field in ["description"]:
                 # 複数行テキスト
                 text_widget = tk.Text(parent, height=3, width=50)
+                text_widget.bind('<<Modified>>', self.on_text_field_modified)
                 text_widget.grid(row=row, column=1, sticky=(tk.W, tk.E), pady=2)
                 self.entry_vars[field] = text_widget
             else:
                 # 単一行テキスト
                 var = tk.StringVar()
+                var.trace('w', self.on_edit_field_change)
+                if field == "image":
+                    var.trace('w', self.on_image_field_change)
                 entry = ttk.Entry(parent, textvariable=var, width=50)
                 entry.grid(row=row, column=1, sticky=(tk.W, tk.E), pady=2)
                 self.entry_vars[field] = var
@@ -316,52 +448,151 @@ class GamesEditor:
         
 
             
+    @timed("ui.load_games")
     def load_games(self):
-        """games.jsonファイルを読み込む"""
-        try:
-            if os.path.exists(self.json_file):
-                with open(self.json_file, 'r', encoding='utf-8') as f:
-                    self.games_data = json.load(f)
+        """games.jsonファイルをバックグラウンドで読み込む（読み込んだ分から一覧に表示）
+        
+        ウィンドウはすぐに表示し、ファイルの解析はワーカースレッドで行う。
+        読み込み中も一覧の表示と検索はできるが、編集・保存は読み込みが終わるまで止める。
+        """
+        if self.loader is not None:
+            return
+        # 初回はプロセスの起動から、再読み込みはボタンを押したときから測る
+        metrics = LoadMetrics(STARTED_AT if self.load_metrics is None else None)
+        if self.load_metrics is None:
+            self.root.after_idle(metrics.mark, "window")
+        self.load_metrics = metrics
+        self.load_error = None
+        
+        self.cancel_pending_search()
+        self.clear_edit_fields()
+        self.selected_game = None
+        self.selected_game_id = None
+        # 読み込み直すとIDが変わるのでチェックと絞り込みも外す
+        self.game_list_view.clear_marks()
+        self.clear_facet_filters(refresh=False)
+        self.loader = self.core.start_loading(metrics)
+        self.show_all_games()
+        self.set_loading(True)
+        self.show_status("ゲームデータを読み込み中...", "info", auto_clear=False)
+        self.root.after(LOAD_POLL_MS, self._poll_loader)
+        
+    @timed("ui.poll_loader")
+    def _poll_loader(self):
+        """読み込んだゲームをカタログに追加して一覧を更新し、終わったら後処理をする"""
+        loader = self.loader
+        batches = loader.poll()
+        for batch in batches:
+            self.core.add_loaded(batch)
+        if batches:
+            self.show_loaded_games()
+            loader.metrics.mark("first_batch")
+        self.load_progress.configure(value=loader.progress * 100)
+        if not loader.done:
+            self.root.after(LOAD_POLL_MS, self._poll_loader)
+            return
+            
+        self.loader = None
+        self.set_loading(False)
+        if loader.error is not None:
+            # 途中までしか読めていないので、上書きしないように保存を止めたままにする
+            self.load_error = loader.error
+            self.show_status(f"ファイルの読み込みに失敗しました: {str(loader.error)}", "error", auto_clear=False)
+            return
+        self.finish_loading(loader.metrics)
+        
+    def finish_loading(self, metrics):
+        """読み込みの後処理（前回の未保存の編集があれば復元を確認）"""
+        # 異常終了したセッションのジャーナルを確認
+        recovery = self.core.finish_loading()
+        if self.core.stale_journal:
+            messagebox.showwarning("警告", "前回の未保存の編集は games.json が変更されているため復元できません。\n"
+                                   f"{self.core.stale_journal} に退避しました。")
+            
+        if recovery is not None:
+            _, entries = recovery
+            if messagebox.askyesno("復元", f"前回保存されなかった編集が{len(entries)}件あります。復元しますか？"):
+                self.core.recover(recovery)
             else:
-                self.games_data = []
+                self.core.discard_recovery()
                 
-            # アルファベット順を維持
-            self.maintain_alphabetical_order()
+        self.show_loaded_games()
+        self.on_catalog_changed()
+        
+        metrics.games = len(self.games_data)
+        metrics.mark("interactive")
+        self.show_status(metrics.report(), "success", duration=6000)
+        
+    def show_loaded_games(self):
+        """読み込み済みのゲームで一覧を表示し直す（検索中なら検索し直す）"""
+        if self.search_var.get():
+            self._start_search()
+        else:
+            self.show_all_games()
             
-            self.clear_edit_fields()
-            self.show_status("ゲームデータを読み込みました", "success")
+    def set_loading(self, loading):
+        """読み込み中の表示（進捗バーとボタンの無効化）"""
+        state = "disabled" if loading else "normal"
+        for button in self.loading_buttons:
+            button.configure(state=state)
+        if loading:
+            self.load_progress.configure(value=0)
+            self.load_progress.pack(side=tk.RIGHT, padx=(0, 10))
+        else:
+            self.load_progress.pack_forget()
             
-        except Exception as e:
-            self.show_status(f"ファイルの読み込みに失敗しました: {str(e)}", "error", auto_clear=False)
+    def is_loading(self):
+        """読み込み中・読み込みに失敗した場合はステータスに表示して True を返す"""
+        if self.loader is not None:
+            self.show_status("ゲームデータを読み込み中です。読み込みが終わるまでお待ちください", "warning")
+            return True
+        if self.load_error is not None:
+            self.show_status("読み込みに失敗したため編集・保存できません。再読み込みしてください", "error", auto_clear=False)
+            return True
+        return False
             
-    def maintain_alphabetical_order(self):
-        """ゲームデータをアルファベット順に維持する"""
-        if self.games_data:
-            self.games_data.sort(key=lambda game: game.get("name", "").lower())
-            self.filtered_games = self.games_data.copy()
-            self.refresh_game_list()
+    def show_all_games(self):
+        """全ゲームを名前順で表示する（タグ・作者で絞り込み中ならその中だけ）"""
+        self.filtered_games = self.core.filter_by_facets(self.games_data, self.facet_filters)
+        self.refresh_game_list()
+        
+    def on_collation_change(self):
+        """並び順の種類を切り替える"""
+        self.core.set_collation(self.collation_var.get())
+        self.on_search_change()
+        
+    def on_fuzzy_search_change(self):
+        """あいまい検索を切り替える（初めて使うときにインデックスを作る）"""
+        if self.fuzzy_search_var.get() and not self.core.fuzzy_ready:
+            self.show_status("あいまい検索の準備中...", "info", auto_clear=False)
+            self.root.update_idletasks()
+            self.core.ensure_fuzzy_index()
+            self.show_status("あいまい検索にしました（一致度の高い順に表示します）", "success")
+        self.on_search_change()
             
+    @timed("ui.refresh_game_list")
     def refresh_game_list(self):
-        """ゲームリストを更新"""
-        self.game_listbox.delete(0, tk.END)
-        for game in self.filtered_games:
-            self.game_listbox.insert(tk.END, game.get("name", "名前なし"))
+        """ゲームリストを更新（変わった行だけを反映）"""
+        self.game_list_view.set_items(self.filtered_games)
             
+    @timed("ui.on_game_select")
     def on_game_select(self, event):
         """ゲーム選択時の処理"""
-        selection = self.game_listbox.curselection()
-        if selection:
+        index = self.game_list_view.selected_index()
+        if index is not None:
             # 新規追加モードを終了
             if self.is_new_game_mode:
                 self.exit_new_game_mode()
                 
-            index = selection[0]
             if index < len(self.filtered_games):
                 game = self.filtered_games[index]
+                # シャード形式では選択したときに本体を読み込む
+                self.core.ensure_loaded(game)
                 # 選択されたゲーム情報を保存
                 self.selected_game = game
-                self.selected_game_index = self.get_actual_index(index)
+                self.selected_game_id = self.catalog.id_of(game)
                 self.load_game_to_fields(game)
+                self.prefetch_thumbnails(index)
             
     def update_edit_frame_title(self, game_name=None):
         """編集フレームのタイトルを更新"""
@@ -380,9 +611,7 @@ class GamesEditor:
         for field, widget in self.entry_vars.items():
             value = game.get(field, "")
             
-            if field == "authors" and isinstance(value, list):
-                value = ", ".join(value)
-            elif field == "tags" and isinstance(value, list):
+            if field in LIST_FIELDS and isinstance(value, (list, tuple)):
                 value = ", ".join(value)
                 
             if isinstance(widget, tk.Text):
@@ -419,20 +648,11 @@ class GamesEditor:
         return game_data
         
     def validate_game_data(self, game_data):
-        """ゲームデータのバリデーション"""
-        # ゲーム名必須チェック
-        if not game_data.get("name"):
-            self.show_status("ゲーム名を入力してください", "warning", auto_clear=False)
-            return False
-            
-        # URL必須チェック（GitHubURL、UnityRoomURLのいずれか1つ以上）
-        url_fields = ["unityroomurl", "githuburl"]
-        has_url = any(game_data.get(field, "").strip() for field in url_fields)
-        
-        if not has_url:
-            self.show_status("GitHubURLまたはUnityRoomURLのいずれか1つ以上を入力してください", "warning", auto_clear=False)
+        """ゲームデータのバリデーション（ゲーム名とURLのいずれか1つ以上が必須）"""
+        error = validate_game(game_data)
+        if error:
+            self.show_status(error, "warning", auto_clear=False)
             return False
-            
         return True
         
     def add_new_game(self):
@@ -441,11 +661,11 @@ class GamesEditor:
         self.clear_edit_fields()
         
         # 選択をクリア
-        self.game_listbox.selection_clear(0, tk.END)
+        self.game_list_view.clear_selection()
         
         # 選択情報をクリア
         self.selected_game = None
-        self.selected_game_index = None
+        self.selected_game_id = None
         
         # 新規追加モードに設定
         self.is_new_game_mode = True
@@ -471,17 +691,46 @@ class GamesEditor:
         self.show_status("新しいゲームの情報を入力してください", "info")
         
     def save_new_game(self):
-        """新しいゲームを保存"""
+        """新しいゲームを保存（URL検証はバックグラウンドで実行）"""
         game_data = self.get_current_game_data()
         
         # バリデーションチェック
         if not self.validate_game_data(game_data):
             return
         
-        # URL検証を実行
-        url_check_result = self._check_urls_sync(game_data)
+        # 実行中のURL検証があれば破棄してやり直す
+        self.cancel_url_check()
+        
+        job = self.url_checker.start(game_data)
+        if job.total == 0:
+            self.add_validated_game(game_data)
+            return
+            
+        self.url_check_job = job
+        self.save_new_button.configure(state="disabled")
+        self.show_status(f"URL検証中... (0/{job.total})", "info", auto_clear=False)
+        self.root.after(100, self._poll_url_check, job, game_data)
+        
+    def _poll_url_check(self, job, game_data):
+        """URL検証の進捗をステータスバーに反映し、完了したら保存処理へ進む"""
+        if job is not self.url_check_job or job.cancelled:
+            return
+            
+        if job.poll():
+            self.show_status(f"URL検証中... ({job.completed}/{job.total})", "info", auto_clear=False)
+            
+        if not job.done:
+            self.root.after(100, self._poll_url_check, job, game_data)
+            return
+            
+        self.url_check_job = None
+        self.url_checker.save_cache()
+        if self.is_new_game_mode:
+            self.save_new_button.configure(state="normal")
+        self.on_url_check_complete(game_data, job.summary())
         
-        # URL検証結果を表示
+    def on_url_check_complete(self, game_data, url_check_result):
+        """URL検証結果を表示し、問題なければゲームを追加"""
         if url_check_result['has_urls']:
             # 検証結果のダイアログを表示
             if url_check_result['results']:
@@ -491,30 +740,131 @@ class GamesEditor:
                 if not url_check_result['all_valid']:
                     result_message += "\n\n無効なURLがありますが、このまま保存しますか？"
                     if not messagebox.askyesno("URL検証結果", result_message):
+                        self.clear_status()
                         return
                 else:
                     # URL検証結果の成功部分のみステータスバーに表示
                     success_count = url_check_result['valid_count']
                     total_count = url_check_result['total_count']
                     self.show_status(f"URL検証完了: {success_count}/{total_count} 個のURLが有効", "success")
+                    
+        self.add_validated_game(game_data)
+        
+    def cancel_url_check(self, message=None):
+        """実行中のURL検証をキャンセル"""
+        job = self.url_check_job
+        if job is None:
+            return
+        self.url_check_job = None
+        job.cancel()
+        if self.is_new_game_mode:
+            self.save_new_button.configure(state="normal")
+        if message:
+            self.show_status(message, "warning")
+            
+    def on_edit_field_change(self, *args):
+        """編集フィールドが変更された時の処理"""
+        if self.url_check_job is not None:
+            self.cancel_url_check("内容が編集されたためURL検証をキャンセルしました")
+            
+    def on_image_field_change(self, *args):
+        """画像URLが変更された時の処理（入力が止まってからサムネイルを表示）"""
+        if self.thumbnail_after_id is not None:
+            self.root.after_cancel(self.thumbnail_after_id)
+        self.thumbnail_after_id = self.root.after(THUMBNAIL_DELAY_MS, self.show_thumbnail)
+        
+    def show_thumbnail(self):
+        """画像URLのサムネイルを表示（キャッシュになければバックグラウンドで読み込む）"""
+        self.thumbnail_after_id = None
+        url = self.entry_vars["image"].get().strip()
+        self.thumbnail_url = url
+        if not url:
+            self.thumbnail_label.configure(image="", text="")
+            return
+        thumbnail = self.thumbnail_cache.get(url)
+        if thumbnail is None:
+            self.thumbnail_label.configure(image="", text="読み込み中...")
+            self.thumbnail_cache.request(url)
+            self._schedule_thumbnail_poll()
+        else:
+            self._display_thumbnail(thumbnail)
+            
+    def prefetch_thumbnails(self, index):
+        """選択したゲームの前後のゲームの画像を先読み"""
+        start = max(0, index - THUMBNAIL_PREFETCH)
+        neighbours = self.filtered_games[start:index + THUMBNAIL_PREFETCH + 1]
+        self.thumbnail_cache.prefetch([(game.get("image") or "").strip() for game in neighbours])
+        self._schedule_thumbnail_poll()
+        
+    def _schedule_thumbnail_poll(self):
+        if self.thumbnail_poll_id is None:
+            self.thumbnail_poll_id = self.root.after(50, self._poll_thumbnails)
             
-        self.games_data.append(game_data)
+    def _poll_thumbnails(self):
+        """読み込みが終わったサムネイルをデコードしてメモリキャッシュに入れる"""
+        self.thumbnail_poll_id = None
+        for result in self.thumbnail_cache.poll():
+            thumbnail = self._decode_thumbnail(result)
+            self.thumbnail_cache.put(result.url, thumbnail)
+            if result.url == self.thumbnail_url:
+                self._display_thumbnail(thumbnail)
+        if self.thumbnail_cache.pending:
+            self._schedule_thumbnail_poll()
+            
+    def _decode_thumbnail(self, result):
+        """読み込み結果から PhotoImage を作る（失敗した場合は理由の文字列）"""
+        if result.error:
+            return result.error
+        try:
+            photo = tk.PhotoImage(data=base64.b64encode(result.data))
+        except tk.TclError:
+            return "画像を読み込めません"
+        if not result.thumbnail:
+            # Pillow がない場合はここで縮小して、縮小したPNGをディスクに保存する
+            size = self.thumbnail_cache.size
+            factor = -(-max(photo.width(), photo.height()) // size)
+            if factor > 1:
+                photo = photo.subsample(factor)
+            try:
+                png_data = self.root.tk.call(photo.name, "data", "-format", "png")
+                self.thumbnail_cache.store_thumbnail(result.url, base64.b64decode(png_data))
+            except tk.TclError:
+                pass
+        return photo
         
-        # アルファベット順を維持
-        self.maintain_alphabetical_order()
+    def _display_thumbnail(self, thumbnail):
+        if isinstance(thumbnail, str):
+            self.thumbnail_label.configure(image="", text="画像なし")
+            self.show_status(f"画像: {thumbnail}", "warning")
+        else:
+            self.thumbnail_label.configure(image=thumbnail, text="")
+            
+    def on_text_field_modified(self, event):
+        """複数行テキストが変更された時の処理"""
+        widget = event.widget
+        if widget.edit_modified():
+            widget.edit_modified(False)
+            self.on_edit_field_change()
+        
+    def add_validated_game(self, game_data):
+        """検証済みのゲームをリストに追加"""
+        if self.is_loading():
+            return
+        # 名前順の位置に挿入される（辞書は Game に変換されて登録される）
+        game = self.catalog.get(self.core.add(game_data))
+        self.on_catalog_changed()
         
-        # 検索をクリアして全ゲームを表示
+        # 検索と絞り込みをクリアして全ゲームを表示
         self.search_var.set("")
-        self.filtered_games = self.games_data.copy()
-        self.refresh_game_list()
+        self.cancel_pending_search()
+        self.clear_facet_filters(refresh=False)
+        self.show_all_games()
         
         # 新しく追加したゲームを選択
-        try:
-            new_index = next(i for i, game in enumerate(self.filtered_games) if game == game_data)
-            self.game_listbox.selection_set(new_index)
-            self.load_game_to_fields(game_data)
-        except StopIteration:
-            pass
+        new_index = self.game_list_view.index_of(game)
+        if new_index is not None:
+            self.game_list_view.select(new_index)
+            self.load_game_to_fields(game)
         
         # 新規追加モードを終了
         self.exit_new_game_mode()
@@ -524,11 +874,13 @@ class GamesEditor:
         
     def cancel_new_game(self):
         """新規ゲーム追加をキャンセル"""
+        self.cancel_url_check()
         self.clear_edit_fields()
         self.exit_new_game_mode()
         
     def exit_new_game_mode(self):
         """新規追加モードを終了"""
+        self.cancel_url_check()
         self.is_new_game_mode = False
         
         # 編集フレームのタイトルを元に戻す
@@ -551,12 +903,13 @@ class GamesEditor:
         
     def delete_game(self):
         """選択したゲームを削除"""
-        selection = self.game_listbox.curselection()
-        if not selection:
+        if self.is_loading():
+            return
+        index = self.game_list_view.selected_index()
+        if index is None:
             self.show_status("削除するゲームを選択してください", "warning")
             return
             
-        index = selection[0]
         if index >= len(self.filtered_games):
             return
             
@@ -565,8 +918,8 @@ class GamesEditor:
         
         if messagebox.askyesno("確認", f"ゲーム '{game_name}' を削除しますか？"):
             # 元のリストからも削除
-            actual_index = self.games_data.index(game)
-            del self.games_data[actual_index]
+            self.core.remove(self.catalog.id_of(game))
+            self.on_catalog_changed()
             
             # フィルターリストも更新
             self.on_search_change()
@@ -574,20 +927,22 @@ class GamesEditor:
             
             # 選択情報をクリア
             self.selected_game = None
-            self.selected_game_index = None
+            self.selected_game_id = None
             self.update_edit_frame_title()
             
             self.show_status("ゲームを削除しました", "success")
             
     def update_current_game(self):
         """現在選択中のゲームを更新"""
+        if self.is_loading():
+            return
         # 新規追加モードの場合は何もしない
         if self.is_new_game_mode:
             self.show_status("新規追加モードです。「新しいゲームを保存」ボタンを使用してください", "warning")
             return
             
         # 保存されたゲーム情報を使用
-        if not self.selected_game or self.selected_game_index is None:
+        if not self.selected_game or self.selected_game_id not in self.catalog:
             self.show_status("更新するゲームを選択してください", "warning")
             return
             
@@ -597,160 +952,1254 @@ class GamesEditor:
         if not self.validate_game_data(game_data):
             return
             
-        # 保存されたインデックスを使用してゲームデータを更新
-        if self.selected_game_index < len(self.games_data):
-            old_name = self.games_data[self.selected_game_index].get("name", "")
-            new_name = game_data.get("name", "")
+        # 保存されたIDを使用してゲームデータを更新
+        # 名前が変更された場合は、カタログがそのゲームだけを名前順の位置に移す
+        game = self.core.update(self.selected_game_id, game_data)
+        self.on_catalog_changed()
+        
+        # フィルターリストも更新
+        self.on_search_change()
+        
+        # 更新したゲームを再選択（可能であれば）
+        new_index = self.game_list_view.index_of(game)
+        if new_index is not None:
+            self.game_list_view.select(new_index)
             
-            self.games_data[self.selected_game_index] = game_data
-            
-            # 選択されたゲーム情報も更新
-            self.selected_game = game_data
-            
-            # 名前が変更された場合はアルファベット順を維持
-            if old_name != new_name:
-                self.maintain_alphabetical_order()
-                # 新しい位置のインデックスを取得
-                for i, game in enumerate(self.games_data):
-                    if game == game_data:
-                        self.selected_game_index = i
-                        break
-            else:
-                # フィルターリストも更新
-                self.on_search_change()
-            
-            # 更新したゲームを再選択（可能であれば）
-            try:
-                new_index = self.filtered_games.index(game_data)
-                self.game_listbox.selection_set(new_index)
-            except ValueError:
-                pass
-                
-            game_name = game_data.get("name", "Unknown Game")
-            self.show_status("ゲーム情報を更新しました", "success")
+        self.show_status("ゲーム情報を更新しました", "success")
         
+    @timed("ui.save_games")
     def save_games(self):
         """現在の編集内容を反映してからJSONファイルに保存"""
-        selection = self.game_listbox.curselection()
-        if selection:
+        if self.is_loading():
+            return
+        index = self.game_list_view.selected_index()
+        if index is not None:
             # 現在選択中のゲームがあれば更新
-            index = selection[0]
             game_data = self.get_current_game_data()
             if self.validate_game_data(game_data):
-                # 検索フィルターがある場合は元のインデックスを取得
-                actual_index = self.get_actual_index(index)
-                self.games_data[actual_index] = game_data
+                game = self.filtered_games[index]
+                self.core.update(self.catalog.id_of(game), game_data)
             else:
                 return  # バリデーションエラーの場合は保存を中止
-                
+        self.save_catalog()
+        
+    def save_catalog(self):
+        """カタログを保存してGitコミットを依頼する（編集欄の内容は反映しない）
+        
+        Returns:
+            bool: 保存できたかどうか
+        """
         try:
-            # バックアップを作成
-            self.create_backup()
-            
-            with open(self.json_file, 'w', encoding='utf-8') as f:
-                json.dump(self.games_data, f, ensure_ascii=False, indent=2)
+            # バックアップを作成してから、一時ファイルに書いて置き換える（途中で失敗しても games.json は壊れない）
+            self.core.save()
+            self.update_unsaved_indicator()
             self.show_status("games.jsonを保存しました", "success")
             
             # Gitコミット
             commit_message = self.generate_commit_message()
             self.git_commit_and_push(commit_message)
+            return True
             
         except Exception as e:
             self.show_status(f"保存に失敗しました: {str(e)}", "error", auto_clear=False)
+            return False
             
-    def create_backup(self):
-        """バックアップファイルを作成"""
-        if os.path.exists(self.json_file):
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_dir = "backup"
-            if not os.path.exists(backup_dir):
-                os.makedirs(backup_dir)
-            backup_name = os.path.join(backup_dir, f"games_backup_{timestamp}.json")
-            shutil.copy2(self.json_file, backup_name)
+    def restore_games(self, games, remove_missing=False):
+        """バックアップのゲームを現在のカタログに反映（同じキーのゲームを置き換える）
+        
+        Args:
+            games (dict): ゲームキー → ゲーム（Noneなら現在のゲームを削除）
+            remove_missing (bool): games にないゲームを削除する（カタログ全体の復元）
             
-    def on_search_change(self, *args):
-        """検索テキストが変更された時の処理"""
-        search_text = self.search_var.get().lower()
+        Returns:
+            int: 追加・更新・削除したゲームの数
+        """
+        if self.is_loading():
+            return 0
+        changed = self.core.restore(games, remove_missing)
+        if changed:
+            self.on_catalog_changed()
+            self.on_search_change()
+            # 編集中のゲームが置き換わった・削除された場合は編集欄を合わせる
+            if self.selected_game_id is not None and not self.is_new_game_mode:
+                if self.selected_game_id in self.catalog:
+                    self.load_game_to_fields(self.catalog.get(self.selected_game_id))
+                else:
+                    self.clear_edit_fields()
+                    self.selected_game = None
+                    self.selected_game_id = None
+                    self.update_edit_frame_title()
+        return changed
+        
+    def open_backup_browser(self):
+        """バックアップの比較・復元ウィンドウを開く"""
+        if self.is_loading():
+            return
+        self.core.load_all()
+        BackupBrowserWindow(self.root, self.backup_store, lambda: self.games_data,
+                            on_restore=self.restore_games, on_status=self.show_status)
+            
+    def on_search_text_change(self, *args):
+        """検索テキストが変更された時の処理（入力が止まるまで待ってから検索）"""
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+        self.search_after_id = self.root.after(self.search_delay_ms, self._start_search)
+        
+    def _start_search(self):
+        """バックグラウンドで検索を開始（古い検索はキャンセルされる）"""
+        self.search_after_id = None
+        query = self.search_var.get()
+        if query:
+            # シャード形式では最初の検索で全ゲームの本体を読み込む（ワーカーが読むのは検索インデックスだけ）
+            self.core.load_all()
+        fuzzy = self.fuzzy_search_var.get()
+        if fuzzy:
+            self.core.ensure_fuzzy_index()
+        generation = self.search_worker.submit(query, fuzzy=fuzzy)
+        self.root.after(20, self._poll_search, generation)
+        
+    def _poll_search(self, generation):
+        """最新の検索結果が届いていればリストに反映"""
+        if generation != self.search_worker.generation:
+            return
+        result = self.search_worker.poll()
+        if result is None:
+            self.root.after(20, self._poll_search, generation)
+            return
+        _, games = result
+        self.show_search_results(self.core.filter_by_facets(games, self.facet_filters))
         
-        if not search_text:
-            self.filtered_games = self.games_data.copy()
-        else:
-            self.filtered_games = []
-            for game in self.games_data:
-                # ゲーム名、作者、タグ、説明で検索
-                if (search_text in game.get("name", "").lower() or
-                    any(search_text in author.lower() for author in game.get("authors", [])) or
-                    any(search_text in tag.lower() for tag in game.get("tags", [])) or
-                    search_text in game.get("description", "").lower()):
-                    self.filtered_games.append(game)
-                    
+    def cancel_pending_search(self):
+        """待機中・実行中の検索を取り消す"""
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+            self.search_after_id = None
+        self.search_worker.cancel()
+        
+    @timed("ui.on_search_change")
+    def on_search_change(self, *args):
+        """現在の検索テキストで即座に絞り込む"""
+        self.cancel_pending_search()
+        # ゲーム名、作者、タグ、説明で検索（インデックスで候補を絞り込む）
+        self.show_search_results(self.core.search(self.search_var.get(), self.facet_filters,
+                                                  fuzzy=self.fuzzy_search_var.get()))
+        
+    def show_search_results(self, games):
+        """検索結果を一覧に表示（あいまい検索では一致度の高い順なので、先頭が見えるようにする）"""
+        self.filtered_games = games
         self.refresh_game_list()
+        if self.fuzzy_search_var.get() and self.search_var.get() and games:
+            self.game_list_view.see(0)
+        
+    def update_mark_indicator(self):
+        """チェックしたゲームの数と、タグ・作者での絞り込みを一覧の見出しに表示"""
+        notes = []
+        values = [value for field in FACET_FIELDS for value in sorted(self.facet_filters[field])]
+        if values:
+            notes.append("絞り込み: " + ", ".join(values))
+        count = len(self.game_list_view.marked_keys)
+        if count:
+            notes.append(f"{count}件をチェック")
+        self.list_frame.configure(text=f"ゲーム一覧（{' / '.join(notes)}）" if notes else "ゲーム一覧")
+        
+    def open_facet_window(self):
+        """タグ・作者で絞り込むウィンドウを開く（開いていれば前面に出す）"""
+        if self.facet_window is not None and self.facet_window.window.winfo_exists():
+            self.facet_window.window.lift()
+            return
+        # タグ・作者を数えるので、シャード形式では本体を読み込んでおく
+        self.core.load_all()
+        self.facet_window = FacetWindow(self.root, self.core.facet_index, self.facet_filters,
+                                        on_change=self.on_facet_change)
+        
+    def on_facet_change(self):
+        """絞り込むタグ・作者が変わったら、検索語と組み合わせて一覧を絞り込み直す"""
+        self.update_mark_indicator()
+        self.on_search_change()
+        
+    def clear_facet_filters(self, refresh=True):
+        """タグ・作者での絞り込みを解除"""
+        if not any(self.facet_filters.values()):
+            return
+        for values in self.facet_filters.values():
+            values.clear()
+        self.update_mark_indicator()
+        if self.facet_window is not None and self.facet_window.window.winfo_exists():
+            self.facet_window.refresh()
+        if refresh:
+            self.on_search_change()
+        
+    def marked_games(self):
+        """一覧でチェックしたゲーム（名前順。検索で隠れているゲームも含む）"""
+        marked = self.game_list_view.marked_keys
+        return [game for game in self.games_data if self.catalog.id_of(game) in marked]
+        
+    def batch_targets(self):
+        """一括編集の対象（チェックがなければ、確認してから表示中のゲームすべて）"""
+        games = self.marked_games()
+        if games:
+            return games
+        if not self.filtered_games:
+            self.show_status("編集するゲームがありません", "warning")
+            return None
+        message = (f"チェックしたゲームがありません。表示中の{len(self.filtered_games)}件すべてを対象にしますか？\n\n"
+                   "（一覧で Ctrl+クリック・スペースキーでゲームをチェックできます）")
+        if not messagebox.askyesno("一括編集", message):
+            return None
+        return list(self.filtered_games)
+        
+    def open_batch_edit(self, mode):
+        """作者・タグの一括編集ダイアログを開く"""
+        if self.is_loading():
+            return
+        # 変わるゲームを数えるので、シャード形式では本体を読み込んでおく
+        self.core.load_all()
+        games = self.batch_targets()
+        if games:
+            BatchEditDialog(self.root, mode, games, on_apply=self.apply_batch_edit)
+            
+    def apply_batch_edit(self, games, edit):
+        """一括編集をまとめて反映（一覧の更新とジャーナルの書き込みは1回だけ）
+        
+        Returns:
+            int: 内容が変わったゲームの数
+        """
+        if self.is_loading():
+            return 0
+        changed = self.core.batch_update([self.catalog.id_of(game) for game in games], edit)
+        if changed:
+            self.on_catalog_changed()
+            self.on_search_change()
+            # 編集中のゲームが変わった場合は編集欄を合わせる
+            if self.selected_game_id in changed and not self.is_new_game_mode:
+                self.load_game_to_fields(self.catalog.get(self.selected_game_id))
+        self.show_status(f"{len(changed)}件のゲームを更新しました（保存するまで games.json は変わりません）", "success")
+        return len(changed)
+        
+    def delete_marked_games(self):
+        """チェックしたゲームをまとめて削除"""
+        if self.is_loading():
+            return
+        games = self.marked_games()
+        if not games:
+            self.show_status("削除するゲームを一覧でチェックしてください（Ctrl+クリック・スペースキー）", "warning")
+            return
+        names = [game.get("name", "名前なし") for game in games[:10]]
+        if len(games) > len(names):
+            names.append(f"ほか{len(games) - len(names)}件")
+        if not messagebox.askyesno("確認", f"{len(games)}件のゲームを削除しますか？\n\n" + "\n".join(names)):
+            return
+        game_ids = [self.catalog.id_of(game) for game in games]
+        self.core.remove_many(game_ids)
+        self.on_catalog_changed()
+        self.on_search_change()
+        if self.selected_game_id in game_ids:
+            self.clear_edit_fields()
+            self.selected_game = None
+            self.selected_game_id = None
+            self.update_edit_frame_title()
+        self.show_status(f"{len(games)}件のゲームを削除しました", "success")
+        
+    def open_bulk_import(self):
+        """CSV / JSONL のファイルを選んで一括インポートのウィンドウを開く"""
+        if self.is_loading():
+            return
+        path = filedialog.askopenfilename(
+            title="取り込むファイル",
+            filetypes=[("CSV / JSONL", "*.csv *.jsonl *.ndjson *.json"), ("すべてのファイル", "*.*")])
+        if not path:
+            return
+        try:
+            plan = self.core.plan_import(path)
+        except (OSError, ImportFileError) as e:
+            messagebox.showerror("一括インポート", f"ファイルを読み込めません:\n{str(e)}")
+            return
+        BulkImportWindow(self.root, plan, os.path.basename(path), cache=self.url_checker.cache,
+                         on_import=self.import_games)
+        
+    def import_games(self, plan, replace=False, allow_broken_links=False):
+        """一括インポートの行を取り込み、一覧の更新・保存・コミットを1回ずつ行う
+        
+        Returns:
+            tuple: (追加した数, 置き換えた数)。読み込み中で取り込めなければ None
+        """
+        if self.is_loading():
+            return None
+        added, replaced = self.core.import_plan(plan, replace, allow_broken_links)
+        if not added and not replaced:
+            return added, replaced
+        self.on_catalog_changed()
+        # 編集中のゲームが置き換わった場合は編集欄を合わせる
+        if self.selected_game_id in self.catalog and not self.is_new_game_mode:
+            self.load_game_to_fields(self.catalog.get(self.selected_game_id))
+        self.on_search_change()
+        self.save_catalog()
+        return added, replaced
+        
+    def open_link_audit(self):
+        """カタログ全体のリンク監査ウィンドウを開く"""
+        if self.is_loading():
+            return
+        self.core.load_all()
+        if not self.games_data:
+            self.show_status("監査するゲームがありません", "warning")
+            return
+        LinkAuditWindow(self.root, self.games_data, cache=self.url_checker.cache, on_finish=self.show_status)
+        self.show_status("リンク監査を開始しました", "info")
+        
+    def show_game_history(self):
+        """選択中のゲームのGit上の変更履歴を表示"""
+        if self.is_new_game_mode or not self.selected_game or self.selected_game_id not in self.catalog:
+            self.show_status("履歴を表示するゲームを選択してください", "warning")
+            return
+        name = self.selected_game.get("name", "")
+        GameHistoryWindow(self.root, self.git_history, name, on_restore=self.restore_games, on_status=self.show_status)
         
     def clear_search(self):
         """検索をクリア"""
         self.search_var.set("")
         
-    def get_actual_index(self, filtered_index):
-        """フィルター後のインデックスから元のインデックスを取得"""
-        if filtered_index < len(self.filtered_games):
-            filtered_game = self.filtered_games[filtered_index]
-            return self.games_data.index(filtered_game)
-        return filtered_index
-        
-    def _check_urls_sync(self, game_data):
-        """URL検証の同期版（保存時用）"""
-        url_fields = {
-            "unityroomurl": "unityroomURL", 
-            "githuburl": "GitHubURL",
-            "image": "画像URL"
-        }
+    def toggle_perf_overlay(self):
+        """処理時間の表示ウィンドウを開く・閉じる"""
+        if self.perf_overlay is not None and self.perf_overlay.window.winfo_exists():
+            self.perf_overlay.close()
+            self.perf_overlay = None
+        else:
+            self.perf_overlay = PerfOverlayWindow(self.root, RECORDER, on_export=self.export_trace)
+            
+    def export_trace(self):
+        """これまでの処理時間を Chrome のトレース形式で書き出す"""
+        path = filedialog.asksaveasfilename(
+            title="トレースの書き出し先",
+            initialfile=f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json"), ("すべてのファイル", "*.*")])
+        if not path:
+            return
+        try:
+            count = RECORDER.export_chrome_trace(path)
+        except OSError as e:
+            self.show_status(f"トレースを書き出せませんでした: {str(e)}", "error", auto_clear=False)
+            return
+        self.show_status(f"{count}件の記録を書き出しました（chrome://tracing などで開けます）", "success")
+
+class PerfOverlayWindow:
+    """処理時間の表示ウィンドウ
+    
+    処理ごとの回数・直近・中央値・p95・最大と、直近の記録を PERF_OVERLAY_MS ごとに更新する。
+    処理を選ぶと、直近の所要時間の分布を表示する。
+    """
+    
+    COLUMNS = (
+        ("name", "処理", 170),
+        ("count", "回数", 50),
+        ("last", "直近", 70),
+        ("median", "中央値", 70),
+        ("p95", "p95", 70),
+        ("max", "最大", 70),
+    )
+    
+    def __init__(self, parent, recorder, on_export=None):
+        self.recorder = recorder
+        
+        self.window = tk.Toplevel(parent)
+        self.window.title("処理時間")
+        self.window.geometry("540x520")
+        self.window.attributes("-topmost", True)
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.window.bind('<F12>', lambda e: self.close())
+        
+        frame = ttk.Frame(self.window, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        # 処理ごとの要約
+        self.tree = ttk.Treeview(frame, columns=[c[0] for c in self.COLUMNS], show="headings", height=10)
+        for column, text, width in self.COLUMNS:
+            self.tree.heading(column, text=text)
+            self.tree.column(column, width=width, anchor=tk.W if column == "name" else tk.E)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+        self.tree.bind('<<TreeviewSelect>>', lambda e: self.refresh_histogram())
+        
+        # 選んだ処理の分布
+        self.histogram_text = tk.Text(frame, height=7, state="disabled")
+        self.histogram_text.pack(fill=tk.X, pady=(5, 0))
+        
+        # 直近の記録
+        ttk.Label(frame, text="直近の記録:").pack(anchor=tk.W, pady=(5, 0))
+        self.recent_text = tk.Text(frame, height=8, state="disabled")
+        self.recent_text.pack(fill=tk.X)
+        
+        button_frame = ttk.Frame(frame)
+        button_frame.pack(pady=(5, 0))
+        ttk.Button(button_frame, text="記録を消去", command=self.clear).pack(side=tk.LEFT, padx=(0, 5))
+        if on_export is not None:
+            ttk.Button(button_frame, text="トレースを書き出す...", command=on_export).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(button_frame, text="閉じる", command=self.close).pack(side=tk.LEFT)
+        
+        self.refresh()
+        
+    def close(self):
+        self.window.destroy()
+        
+    def clear(self):
+        self.recorder.clear()
+        self.tree.delete(*self.tree.get_children())
+        self.refresh_histogram()
+        
+    def refresh(self):
+        """表示を更新して、次の更新を予約する"""
+        if not self.window.winfo_exists():
+            return
+        for name, summary in self.recorder.stats():
+            values = (name, summary["count"]) + tuple(
+                format_duration(summary[key]) for key in ("last", "median", "p95", "max"))
+            if self.tree.exists(name):
+                self.tree.item(name, values=values)
+            else:
+                self.tree.insert("", tk.END, iid=name, values=values)
+                
+        lines = []
+        for name, duration, args in self.recorder.recent(limit=8):
+            detail = " ".join(f"{key}={value}" for key, value in (args or {}).items())
+            lines.append(f"{format_duration(duration):>9}  {name}  {detail}".rstrip())
+        self._set_text(self.recent_text, "\n".join(lines))
+        self.refresh_histogram()
+        self.window.after(PERF_OVERLAY_MS, self.refresh)
+        
+    def refresh_histogram(self):
+        """選んだ処理の直近の所要時間を区切りごとの棒で表示"""
+        selection = self.tree.selection()
+        histogram = self.recorder.histogram(selection[0]) if selection else None
+        if histogram is None:
+            self._set_text(self.histogram_text, "処理を選ぶと所要時間の分布を表示します")
+            return
+        counts = histogram.buckets()
+        labels = [f"≤{bound}ms" for bound in HISTOGRAM_BOUNDS_MS] + [f">{HISTOGRAM_BOUNDS_MS[-1]}ms"]
+        largest = max(counts) or 1
+        # 記録のある区切りだけを並べる（ウィンドウに収まるように）
+        lines = [f"{label:>9} {'█' * max(1, round(count * 30 / largest))} {count}"
+                 for label, count in zip(labels, counts) if count]
+        self._set_text(self.histogram_text, "\n".join(lines))
+        
+    @staticmethod
+    def _set_text(widget, text):
+        widget.configure(state="normal")
+        widget.delete(1.0, tk.END)
+        widget.insert(1.0, text)
+        widget.configure(state="disabled")
+
+class FacetWindow:
+    """タグ・作者で絞り込むウィンドウ
+    
+    タグ・作者ごとのゲーム数を多い順に表示する。値をクリックすると絞り込みに加え（もう一度で外す）、
+    選んだ値をすべて持つゲームだけを一覧に表示する。「絞り込み中」の列は今の絞り込みに
+    その値を加えたときの件数。表記ゆれの可能性がある値（正規化すると同じになる値）はオレンジで表示する。
+    
+    filters は GamesEditor.facet_filters をそのまま書き換え、変えたら on_change を呼ぶ。
+    """
+    
+    FIELDS = (("tags", "タグ"), ("authors", "作者"))
+    COLUMNS = (
+        ("value", "値", 200),
+        ("count", "件数", 60),
+        ("within", "絞り込み中", 80),
+    )
+    
+    def __init__(self, parent, facet_index, filters, on_change):
+        self.facet_index = facet_index
+        self.filters = filters
+        self.on_change = on_change
+        self.trees = {}
+        self.values = {}          # 項目 → 表の行の値（行のIDは番号）
+        self.variant_labels = {}
+        self.shown_state = None   # 前回表示した（索引の版, 絞り込み, 値の絞り込み）
+        
+        self.window = tk.Toplevel(parent)
+        self.window.title("タグ・作者で絞り込み")
+        self.window.geometry("420x520")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        
+        frame = ttk.Frame(self.window, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        # 表示する値の絞り込み（タグが多いとき用）
+        filter_frame = ttk.Frame(frame)
+        filter_frame.pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(filter_frame, text="値で絞り込み:").pack(side=tk.LEFT, padx=(0, 5))
+        self.text_var = tk.StringVar()
+        self.text_var.trace('w', lambda *args: self.refresh())
+        ttk.Entry(filter_frame, textvariable=self.text_var, width=25).pack(side=tk.LEFT)
+        
+        self.notebook = ttk.Notebook(frame)
+        self.notebook.pack(fill=tk.BOTH, expand=True)
+        for field, label in self.FIELDS:
+            tab = ttk.Frame(self.notebook, padding="5")
+            self.notebook.add(tab, text=label)
+            tree_frame = ttk.Frame(tab)
+            tree_frame.pack(fill=tk.BOTH, expand=True)
+            tree = ttk.Treeview(tree_frame, columns=[c[0] for c in self.COLUMNS], show="headings", selectmode="none")
+            for column, text, width in self.COLUMNS:
+                tree.heading(column, text=text)
+                tree.column(column, width=width, anchor=tk.W if column == "value" else tk.E)
+            tree.tag_configure("variant", foreground="orange")
+            tree.tag_configure("selected", background="#cce5ff")
+            scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=tree.yview)
+            tree.configure(yscrollcommand=scrollbar.set)
+            tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            tree.bind('<Button-1>', lambda e, f=field: self.on_click(f, e))
+            self.trees[field] = tree
+            self.values[field] = []
+            self.variant_labels[field] = ttk.Label(tab, text="", foreground="orange")
+            self.variant_labels[field].pack(anchor=tk.W, pady=(5, 0))
+            
+        self.summary_label = ttk.Label(frame, text="")
+        self.summary_label.pack(anchor=tk.W, pady=(5, 0))
+        
+        button_frame = ttk.Frame(frame)
+        button_frame.pack(pady=(5, 0))
+        ttk.Button(button_frame, text="絞り込みを解除", command=self.clear).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(button_frame, text="閉じる", command=self.close).pack(side=tk.LEFT)
+        
+        self.refresh()
+        
+    def close(self):
+        self.window.destroy()
+        
+    def on_click(self, field, event):
+        """クリックした値を絞り込みに加える・外す"""
+        row = self.trees[field].identify_row(event.y)
+        if not row:
+            return None
+        value = self.values[field][int(row)]
+        selected = self.filters[field]
+        if value in selected:
+            selected.discard(value)
+        else:
+            selected.add(value)
+        self.refresh()
+        self.on_change()
+        return "break"
+        
+    def clear(self):
+        for values in self.filters.values():
+            values.clear()
+        self.refresh()
+        self.on_change()
+        
+    def refresh(self):
+        """件数を表示し直す（索引も絞り込みも変わっていなければ何もしない）"""
+        text = self.text_var.get().strip().lower()
+        state = (self.facet_index.version, tuple(frozenset(self.filters[field]) for field, _ in self.FIELDS), text)
+        if state == self.shown_state:
+            return
+        self.shown_state = state
+        
+        within = self.facet_index.matching(self.filters)
+        for field, _ in self.FIELDS:
+            totals = dict(self.facet_index.counts(field))
+            counts = self.facet_index.counts(field, within) if within is not None else list(totals.items())
+            groups = self.facet_index.variants(field)
+            variants = {value for values in groups for value in values}
+            selected = self.filters[field]
+            # 選んだ値は先頭に、それ以外は値で絞り込んだものだけを表示する
+            rows = [(value, count) for value, count in counts if value in selected]
+            # 一括編集などでなくなった値も、外せるように残す
+            rows += [(value, 0) for value in sorted(selected) if value not in totals]
+            rows += [(value, count) for value, count in counts
+                     if value not in selected and (not text or text in value.lower())]
+            
+            tree = self.trees[field]
+            tree.delete(*tree.get_children())
+            self.values[field] = [value for value, _ in rows]
+            for index, (value, count) in enumerate(rows):
+                tags = ("selected",) if value in selected else ()
+                if value in variants:
+                    tags += ("variant",)
+                label = f"✔ {value}" if value in selected else value
+                tree.insert("", tk.END, iid=str(index), values=(label, totals.get(value, 0), count), tags=tags)
+            self.variant_labels[field].configure(
+                text=f"表記ゆれの可能性: {len(groups)}組（オレンジの値）" if groups else "")
+            
+        if within is None:
+            self.summary_label.configure(text="値をクリックすると、その値を持つゲームだけを一覧に表示します")
+        else:
+            chosen = ", ".join(value for field, _ in self.FIELDS for value in sorted(self.filters[field]))
+            self.summary_label.configure(text=f"{chosen}: {len(within)}件（検索語があればさらに絞り込みます）")
+
+class BatchEditDialog:
+    """作者・タグの一括編集ダイアログ
+    
+    mode が "replace" なら作者またはタグの値を置き換え、"add" / "remove" ならタグを追加・削除する。
+    入力するたびに、変わるゲームの数を表示する。
+    """
+    
+    TITLES = {"replace": "作者・タグを置換", "add": "タグを追加", "remove": "タグを削除"}
+    FIELDS = (("tags", "タグ"), ("authors", "作者"))
+    
+    def __init__(self, parent, mode, games, on_apply):
+        self.mode = mode
+        self.games = games
+        self.on_apply = on_apply
+        
+        self.window = tk.Toplevel(parent)
+        self.window.title(self.TITLES[mode])
+        self.window.resizable(False, False)
+        self.window.transient(parent)
+        
+        frame = ttk.Frame(self.window, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+        ttk.Label(frame, text=f"対象: {len(games)}件のゲーム").grid(row=0, column=0, columnspan=2, sticky=tk.W, pady=(0, 5))
+        
+        self.field_var = tk.StringVar(value=self.FIELDS[0][1])
+        self.find_var = tk.StringVar()
+        self.replacement_var = tk.StringVar()
+        self.partial_var = tk.BooleanVar(value=False)
+        if mode == "replace":
+            ttk.Label(frame, text="項目:").grid(row=1, column=0, sticky=tk.W)
+            ttk.Combobox(frame, textvariable=self.field_var, values=[label for _, label in self.FIELDS],
+                         state="readonly", width=10).grid(row=1, column=1, sticky=tk.W, pady=2)
+            ttk.Label(frame, text="置換前:").grid(row=2, column=0, sticky=tk.W)
+            find_entry = ttk.Entry(frame, textvariable=self.find_var, width=40)
+            find_entry.grid(row=2, column=1, sticky=tk.W, pady=2)
+            ttk.Label(frame, text="置換後:").grid(row=3, column=0, sticky=tk.W)
+            ttk.Entry(frame, textvariable=self.replacement_var, width=40).grid(row=3, column=1, sticky=tk.W, pady=2)
+            ttk.Checkbutton(frame, text="値の一部に一致したところも置き換える", variable=self.partial_var,
+                            command=self.update_preview).grid(row=4, column=1, sticky=tk.W)
+            ttk.Label(frame, text="置換後を空にすると、一致した値を削除します", foreground="gray").grid(
+                row=5, column=1, sticky=tk.W)
+        else:
+            ttk.Label(frame, text="タグ:").grid(row=1, column=0, sticky=tk.W)
+            find_entry = ttk.Entry(frame, textvariable=self.find_var, width=40)
+            find_entry.grid(row=1, column=1, sticky=tk.W, pady=2)
+            ttk.Label(frame, text="複数ある場合はカンマ区切り（例: #夏チーム_2025, #アクション）", foreground="gray").grid(
+                row=2, column=1, sticky=tk.W)
+        for variable in (self.field_var, self.find_var, self.replacement_var):
+            variable.trace('w', self.update_preview)
+            
+        self.preview_label = ttk.Label(frame, text="")
+        self.preview_label.grid(row=6, column=0, columnspan=2, sticky=tk.W, pady=(5, 0))
+        
+        button_frame = ttk.Frame(frame)
+        button_frame.grid(row=7, column=0, columnspan=2, pady=(10, 0))
+        self.apply_button = ttk.Button(button_frame, text="適用", command=self.apply, state="disabled")
+        self.apply_button.pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(button_frame, text="キャンセル", command=self.window.destroy).pack(side=tk.LEFT)
+        
+        find_entry.focus_set()
+        self.update_preview()
+        
+    def build_edit(self):
+        """入力から編集を作る（入力が足りなければ None）"""
+        if self.mode == "replace":
+            field = dict((label, field) for field, label in self.FIELDS)[self.field_var.get()]
+            find = self.find_var.get().strip()
+            if not find:
+                return None
+            return replace_values(field, find, self.replacement_var.get().strip(), partial=self.partial_var.get())
+        tags = split_values(self.find_var.get())
+        if not tags:
+            return None
+        return add_values("tags", tags) if self.mode == "add" else remove_values("tags", tags)
+        
+    def update_preview(self, *args):
+        """変わるゲームの数を表示"""
+        edit = self.build_edit()
+        if edit is None:
+            self.preview_label.configure(text="値を入力してください")
+            self.apply_button.configure(state="disabled")
+            return
+        count = len(preview_edit(self.games, edit))
+        self.preview_label.configure(text=f"{len(self.games)}件中 {count}件のゲームが変わります")
+        self.apply_button.configure(state="normal" if count else "disabled")
         
-        results = []
-        valid_count = 0
-        total_count = 0
-        
-        for field, label in url_fields.items():
-            url = game_data.get(field, "").strip()
-            if url:
-                total_count += 1
-                status = self._check_single_url(url)
-                if status == "有効":
-                    valid_count += 1
-                    results.append(f"✅ {label}: {status}")
-                else:
-                    results.append(f"❌ {label}: {status}")
-        
-        return {
-            'has_urls': total_count > 0,
-            'total_count': total_count,
-            'valid_count': valid_count,
-            'all_valid': valid_count == total_count and total_count > 0,
-            'results': results
-        }
+    def apply(self):
+        edit = self.build_edit()
+        if edit is None:
+            return
+        self.on_apply(self.games, edit)
+        self.window.destroy()
+
+class BulkImportWindow:
+    """一括インポートの確認ウィンドウ
+    
+    ファイルの行ごとに、追加・置き換え・変更なし・重複・エラーの分類を表示する。
+    「URLをチェック」で取り込む行のURLを並行してチェックし、無効なURLがある行を示す。
+    「取り込んで保存」で、選んだ行をまとめて追加してから1回だけ保存する。
+    """
+    
+    COLUMNS = (
+        ("line", "行", 45),
+        ("name", "ゲーム", 170),
+        ("status", "分類", 70),
+        ("detail", "詳細", 320),
+    )
+    
+    def __init__(self, parent, plan, file_name, cache=None, on_import=None):
+        self.plan = plan
+        self.cache = cache
+        self.on_import = on_import
+        self.audit = None
+        
+        self.window = tk.Toplevel(parent)
+        self.window.title(f"一括インポート - {file_name}")
+        self.window.geometry("640x520")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        
+        frame = ttk.Frame(self.window, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        # 行ごとの分類
+        tree_frame = ttk.Frame(frame)
+        tree_frame.pack(fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(tree_frame, columns=[c[0] for c in self.COLUMNS], show="headings")
+        for column, text, width in self.COLUMNS:
+            self.tree.heading(column, text=text)
+            self.tree.column(column, width=width, anchor=tk.E if column == "line" else tk.W)
+        self.tree.tag_configure("skipped", foreground="gray")
+        self.tree.tag_configure("replace", foreground="darkorange")
+        self.tree.tag_configure("failed", foreground="red")
+        scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.summary_label = ttk.Label(frame, text="")
+        self.summary_label.pack(anchor=tk.W, pady=(5, 0))
+        
+        # 取り込み方
+        self.replace_var = tk.BooleanVar(value=False)
+        self.allow_broken_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(frame, text="同じ名前のゲームを置き換える", variable=self.replace_var,
+                        command=self.update_summary).pack(anchor=tk.W)
+        ttk.Checkbutton(frame, text="無効なURLがあるゲームも取り込む", variable=self.allow_broken_var,
+                        command=self.update_summary).pack(anchor=tk.W)
+        
+        button_frame = ttk.Frame(frame)
+        button_frame.pack(pady=(5, 0))
+        self.check_button = ttk.Button(button_frame, text="URLをチェック", command=self.start_url_check)
+        self.check_button.pack(side=tk.LEFT, padx=(0, 5))
+        self.import_button = ttk.Button(button_frame, text="取り込んで保存", command=self.import_rows)
+        self.import_button.pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(button_frame, text="閉じる", command=self.close).pack(side=tk.LEFT)
+        
+        self.show_rows()
+        
+    def show_rows(self):
+        """行ごとの分類とURLチェックの結果を表示"""
+        self.tree.delete(*self.tree.get_children())
+        for index, row in enumerate(self.plan.rows):
+            detail = "; ".join(([row.message] if row.message else []) + row.url_errors)
+            if row.url_errors:
+                tags = ("failed",)
+            elif row.status == IMPORT_REPLACE:
+                tags = ("replace",)
+            elif not row.actionable:
+                tags = ("skipped",)
+            else:
+                tags = ()
+            values = (row.line, row.name or "名前なし", IMPORT_LABELS[row.status], detail)
+            self.tree.insert("", tk.END, iid=str(index), values=values, tags=tags)
+        self.update_summary()
+        
+    def update_summary(self):
+        """分類ごとの件数と、今の設定で取り込む件数を表示"""
+        selected = self.plan.selected(self.replace_var.get(), self.allow_broken_var.get())
+        url_note = "" if self.plan.url_checked else "（URLは未チェック）"
+        self.summary_label.configure(text=f"{self.plan.summary()} → {len(selected)}件を取り込みます{url_note}")
+        self.import_button.configure(state="normal" if selected and self.audit is None else "disabled")
+        
+    def start_url_check(self):
+        """取り込む行のURLチェックを始める"""
+        if self.audit is not None:
+            return
+        self.audit = self.plan.start_url_check(cache=self.cache)
+        self.check_button.configure(state="disabled")
+        self.import_button.configure(state="disabled")
+        self.window.after(100, self._poll, self.audit)
         
-    def _check_single_url(self, url):
-        """単一URLの有効性をチェック"""
+    def _poll(self, audit):
+        if audit is not self.audit or not self.window.winfo_exists():
+            return
+        finished = audit.done
+        self.plan.add_url_results(audit.poll())
+        if not finished:
+            self.summary_label.configure(text=f"URLチェック中... ({audit.completed}/{audit.total})")
+            self.window.after(100, self._poll, audit)
+            return
+        self.audit = None
+        self.plan.url_checked = True
+        self.check_button.configure(state="normal")
+        self.show_rows()
+        
+    def import_rows(self):
+        """選んだ行を取り込んで保存"""
+        replace = self.replace_var.get()
+        allow_broken = self.allow_broken_var.get()
+        selected = self.plan.selected(replace, allow_broken)
+        new_count = sum(1 for row in selected if row.status == IMPORT_NEW)
+        message = f"{new_count}件を追加し、{len(selected) - new_count}件を置き換えて保存します。よろしいですか？"
+        if not self.plan.url_checked:
+            message = "URLはまだチェックしていません。\n" + message
+        if not messagebox.askyesno("一括インポート", message, parent=self.window):
+            return
+        result = self.on_import(self.plan, replace, allow_broken) if self.on_import else None
+        if result is None:
+            return
+        added, replaced = result
+        messagebox.showinfo("一括インポート", f"{added}件を追加し、{replaced}件を置き換えました", parent=self.window)
+        self.close()
+        
+    def close(self):
+        if self.audit is not None:
+            self.audit.cancel()
+            self.audit = None
+        self.window.destroy()
+
+class LinkAuditWindow:
+    """リンク監査レポートウィンドウ
+    
+    監査結果は完了したものから順に表に追加される。列見出しをクリックすると並べ替える。
+    """
+    
+    COLUMNS = (
+        ("game", "ゲーム", 150),
+        ("label", "項目", 90),
+        ("status", "状態", 130),
+        ("elapsed", "時間(ms)", 70),
+        ("host", "ホスト", 150),
+    )
+    
+    def __init__(self, parent, games, cache=None, on_finish=None):
+        self.games = list(games)
+        self.cache = cache
+        self.on_finish = on_finish
+        self.audit = None
+        self.sort_column = None
+        self.sort_reverse = False
+        
+        self.window = tk.Toplevel(parent)
+        self.window.title("リンク監査")
+        self.window.geometry("640x520")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        
+        frame = ttk.Frame(self.window, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        # 結果一覧
+        tree_frame = ttk.Frame(frame)
+        tree_frame.pack(fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(tree_frame, columns=[c[0] for c in self.COLUMNS], show="headings")
+        for column, text, width in self.COLUMNS:
+            self.tree.heading(column, text=text, command=lambda c=column: self.sort_by(c))
+            self.tree.column(column, width=width, anchor=tk.E if column == "elapsed" else tk.W)
+        self.tree.tag_configure("failed", foreground="red")
+        scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        # 進捗とホスト別統計
+        self.summary_label = ttk.Label(frame, text="")
+        self.summary_label.pack(anchor=tk.W, pady=(5, 0))
+        self.stats_text = tk.Text(frame, height=6, state="disabled")
+        self.stats_text.pack(fill=tk.X, pady=(5, 0))
+        
+        button_frame = ttk.Frame(frame)
+        button_frame.pack(pady=(5, 0))
+        self.rerun_button = ttk.Button(button_frame, text="再実行", command=self.start)
+        self.rerun_button.pack(side=tk.LEFT, padx=(0, 5))
+        self.stop_button = ttk.Button(button_frame, text="停止", command=self.stop)
+        self.stop_button.pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(button_frame, text="閉じる", command=self.close).pack(side=tk.LEFT)
+        
+        self.start()
+        
+    def start(self):
+        """監査を（再）開始"""
+        self.stop()
+        self.tree.delete(*self.tree.get_children())
+        self.audit = LinkAudit(self.games, cache=self.cache).start()
+        self.rerun_button.configure(state="disabled")
+        self.stop_button.configure(state="normal")
+        self.window.after(100, self._poll, self.audit)
+        
+    def stop(self):
+        """実行中の監査を打ち切る"""
+        if self.audit is not None and not self.audit.done:
+            self.audit.cancel()
+            self.update_summary("監査を停止しました")
+        self.rerun_button.configure(state="normal")
+        self.stop_button.configure(state="disabled")
+        
+    def close(self):
+        self.stop()
+        self.window.destroy()
+        
+    def _poll(self, audit):
+        if audit is not self.audit or audit.cancelled or not self.window.winfo_exists():
+            return
+            
+        finished = audit.done
+        results = audit.poll()
+        for result in results:
+            values = (result.game_name, result.label, result.status, f"{result.elapsed * 1000:.0f}", result.host)
+            self.tree.insert("", tk.END, values=values, tags=() if result.ok else ("failed",))
+        if results and self.sort_column:
+            self._apply_sort()
+            
+        if finished:
+            failed = sum(1 for r in audit.results if not r.ok)
+            message = f"監査完了: {audit.total}件中 {failed}件失敗 / 所要時間 {audit.wall_time:.2f}秒"
+            self.update_summary(message)
+            self.rerun_button.configure(state="normal")
+            self.stop_button.configure(state="disabled")
+            if self.on_finish:
+                self.on_finish(message, "warning" if failed else "success")
+        else:
+            self.update_summary(f"監査中... ({audit.completed}/{audit.total}) {audit.wall_time:.1f}秒")
+            self.window.after(100, self._poll, audit)
+            
+    def update_summary(self, message):
+        """進捗ラベルとホスト別統計を更新"""
+        self.summary_label.configure(text=message)
+        if self.audit is None:
+            return
+        self.stats_text.configure(state="normal")
+        self.stats_text.delete(1.0, tk.END)
+        self.stats_text.insert(1.0, "\n".join(format_host_stats(self.audit.host_stats())))
+        self.stats_text.configure(state="disabled")
+        
+    def sort_by(self, column):
+        """列見出しクリックで並べ替え（同じ列なら昇順・降順を切り替え）"""
+        if self.sort_column == column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column = column
+            self.sort_reverse = False
+        self._apply_sort()
+        
+    def _apply_sort(self):
+        column = self.sort_column
+        rows = [(self.tree.set(item, column), item) for item in self.tree.get_children("")]
+        if column == "elapsed":
+            rows.sort(key=lambda row: float(row[0] or 0), reverse=self.sort_reverse)
+        else:
+            rows.sort(key=lambda row: row[0].lower(), reverse=self.sort_reverse)
+        for position, (_, item) in enumerate(rows):
+            self.tree.move(item, "", position)
+
+class BackupBrowserWindow:
+    """バックアップの比較・復元ウィンドウ
+    
+    2つの版（または版と現在のカタログ）で追加・削除・変更されたゲームを一覧し、
+    比較元の版のゲームを1件ずつ、またはカタログ全体を復元する。
+    """
+    
+    CURRENT_LABEL = "現在のカタログ（未保存の変更を含む）"
+    KIND_LABELS = {DIFF_ADDED: "追加", DIFF_REMOVED: "削除", DIFF_CHANGED: "変更"}
+    
+    def __init__(self, parent, backup_store, get_games, on_restore, on_status=None):
+        self.backup_store = backup_store
+        self.get_games = get_games
+        self.on_restore = on_restore
+        self.on_status = on_status
+        self.snapshots = []
+        self.rows = {}
+        
+        self.window = tk.Toplevel(parent)
+        self.window.title("バックアップの比較・復元")
+        self.window.geometry("640x560")
+        
+        frame = ttk.Frame(self.window, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        # 比較する版の選択
+        select_frame = ttk.Frame(frame)
+        select_frame.pack(fill=tk.X)
+        ttk.Label(select_frame, text="比較元:").grid(row=0, column=0, sticky=tk.W)
+        self.old_combo = ttk.Combobox(select_frame, state="readonly", width=40)
+        self.old_combo.grid(row=0, column=1, sticky=tk.W, padx=(5, 0))
+        ttk.Label(select_frame, text="比較先:").grid(row=1, column=0, sticky=tk.W, pady=(5, 0))
+        self.new_combo = ttk.Combobox(select_frame, state="readonly", width=40)
+        self.new_combo.grid(row=1, column=1, sticky=tk.W, padx=(5, 0), pady=(5, 0))
+        ttk.Button(select_frame, text="比較", command=self.compare).grid(row=0, column=2, rowspan=2, padx=(10, 0))
+        self.old_combo.bind('<<ComboboxSelected>>', lambda e: self.compare())
+        self.new_combo.bind('<<ComboboxSelected>>', lambda e: self.compare())
+        
+        # 差分のあるゲームの一覧
+        tree_frame = ttk.Frame(frame)
+        tree_frame.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
+        self.tree = ttk.Treeview(tree_frame, columns=("kind", "game"), show="headings", height=8)
+        self.tree.heading("kind", text="比較元→比較先")
+        self.tree.heading("game", text="ゲーム")
+        self.tree.column("kind", width=100)
+        self.tree.column("game", width=480)
+        self.tree.tag_configure(DIFF_ADDED, foreground="green")
+        self.tree.tag_configure(DIFF_REMOVED, foreground="red")
+        scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+        
+        self.summary_label = ttk.Label(frame, text="")
+        self.summary_label.pack(anchor=tk.W, pady=(5, 0))
+        
+        # 選択したゲームの差分
+        self.detail_text = tk.Text(frame, height=10, state="disabled", wrap=tk.NONE)
+        self.detail_text.tag_configure("removed", foreground="red")
+        self.detail_text.tag_configure("added", foreground="green")
+        self.detail_text.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
+        
+        button_frame = ttk.Frame(frame)
+        button_frame.pack(pady=(5, 0))
+        ttk.Button(button_frame, text="このゲームを比較元の版に戻す", command=self.restore_selected).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(button_frame, text="カタログ全体を比較元の版に戻す", command=self.restore_all).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(button_frame, text="旧形式のバックアップを取り込む", command=self.import_legacy).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(button_frame, text="閉じる", command=self.window.destroy).pack(side=tk.LEFT)
+        
+        self.load_snapshots()
+        
+    def load_snapshots(self):
+        """版の一覧を読み込む（index.json だけを読むので各版は開かない）"""
+        self.snapshots = self.backup_store.list_snapshots()
+        labels = [self.snapshot_label(snapshot) for snapshot in self.snapshots]
+        self.old_combo.configure(values=labels)
+        self.new_combo.configure(values=[self.CURRENT_LABEL] + labels)
+        if not self.snapshots:
+            self.summary_label.configure(text="バックアップがありません")
+            return
+        self.old_combo.current(0)
+        self.new_combo.current(0)
+        self.compare()
+        
+    @staticmethod
+    def snapshot_label(snapshot):
+        timestamp = datetime.strptime(snapshot["timestamp"], "%Y%m%d_%H%M%S").strftime("%Y-%m-%d %H:%M:%S")
+        games = snapshot.get("games")
+        return f"{timestamp}  ({games}件)" if games is not None else timestamp
+        
+    def old_snapshot(self):
+        index = self.old_combo.current()
+        return self.snapshots[index] if index >= 0 else None
+        
+    def new_snapshot(self):
+        """比較先の版（現在のカタログならNone）"""
+        index = self.new_combo.current()
+        return self.snapshots[index - 1] if index > 0 else None
+        
+    def compare(self):
+        """比較元と比較先で変わったゲームを一覧表示"""
+        old = self.old_snapshot()
+        if old is None:
+            return
+        new = self.new_snapshot()
+        if new is None:
+            diff = self.backup_store.diff_with_games(old, self.get_games())
+        else:
+            diff = self.backup_store.diff(old, new)
+            
+        self.tree.delete(*self.tree.get_children())
+        self.rows = {}
+        for key, kind, _, _ in diff:
+            item = self.tree.insert("", tk.END, values=(self.KIND_LABELS[kind], key), tags=(kind,))
+            self.rows[item] = key
+        self.summary_label.configure(text=f"{len(diff)}件のゲームが異なります" if diff else "違いはありません")
+        self.show_detail(None)
+        
+    def old_game(self, key):
+        return self.backup_store.get_game(self.old_snapshot()["sha256"], key)
+        
+    def new_game(self, key):
+        new = self.new_snapshot()
+        if new is None:
+            return dict(keyed_games(self.get_games())).get(key)
+        return self.backup_store.get_game(new["sha256"], key)
+        
+    def selected_key(self):
+        selection = self.tree.selection()
+        return self.rows.get(selection[0]) if selection else None
+        
+    def on_select(self, event):
+        key = self.selected_key()
+        if key is not None:
+            self.show_detail(key)
+            
+    def show_detail(self, key):
+        """選択したゲームの比較元と比較先の差分を表示"""
+        self.detail_text.configure(state="normal")
+        self.detail_text.delete(1.0, tk.END)
+        if key is not None:
+            old_lines = self._game_lines(self.old_game(key))
+            new_lines = self._game_lines(self.new_game(key))
+            for line in difflib.unified_diff(old_lines, new_lines, "比較元", "比較先", lineterm="", n=2):
+                tag = "removed" if line.startswith("-") else "added" if line.startswith("+") else ""
+                self.detail_text.insert(tk.END, line + "\n", tag)
+        self.detail_text.configure(state="disabled")
+        
+    @staticmethod
+    def _game_lines(game):
+        if game is None:
+            return []
+        return json.dumps(game, ensure_ascii=False, indent=2, default=json_default).splitlines()
+        
+    def restore_selected(self):
+        """選択したゲームを比較元の版の内容に戻す"""
+        key = self.selected_key()
+        if key is None:
+            messagebox.showinfo("復元", "復元するゲームを選択してください", parent=self.window)
+            return
+        game = self.old_game(key)
+        action = "削除" if game is None else "比較元の版の内容に戻"
+        if not messagebox.askyesno("確認", f"'{key}' を{action}しますか？", parent=self.window):
+            return
+        self.finish_restore(self.on_restore({key: game}))
+        
+    def restore_all(self):
+        """カタログ全体を比較元の版の内容に戻す"""
+        old = self.old_snapshot()
+        if old is None:
+            return
+        message = f"カタログ全体を {self.snapshot_label(old)} の版に戻しますか？\n（保存するまで games.json は変わりません）"
+        if not messagebox.askyesno("確認", message, parent=self.window):
+            return
+        games = dict(keyed_games(self.backup_store.read_games(old["sha256"])))
+        self.finish_restore(self.on_restore(games, remove_missing=True))
+        
+    def finish_restore(self, changed):
+        if self.on_status:
+            self.on_status(f"バックアップから{changed}件のゲームを復元しました", "success")
+        if self.new_snapshot() is None:
+            self.compare()
+            
+    def import_legacy(self):
+        """backup/ にある旧形式の games_backup_*.json を取り込む"""
+        added, skipped = self.backup_store.import_legacy()
+        messagebox.showinfo("取り込み", f"{added}版を取り込みました（重複 {skipped}件はスキップ）", parent=self.window)
+        self.load_snapshots()
+
+class GameHistoryWindow:
+    """ゲームの変更履歴ウィンドウ
+    
+    履歴インデックスの更新（前回以降のコミットの処理）はバックグラウンドで行い、
+    終わったら一覧を表示する。版を選ぶとその直前の版との差分を表示する。
+    """
+    
+    COLUMNS = (
+        ("time", "日時", 120),
+        ("commit", "コミット", 70),
+        ("kind", "種類", 50),
+        ("author", "作者", 90),
+        ("subject", "メッセージ", 260),
+    )
+    
+    def __init__(self, parent, git_history, name, on_restore, on_status=None):
+        self.git_history = git_history
+        self.name = name
+        self.on_restore = on_restore
+        self.on_status = on_status
+        self.revisions = {}
+        self._result = None
+        
+        self.window = tk.Toplevel(parent)
+        self.window.title(f"変更履歴 - {name}")
+        self.window.geometry("640x520")
+        
+        frame = ttk.Frame(self.window, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        tree_frame = ttk.Frame(frame)
+        tree_frame.pack(fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(tree_frame, columns=[c[0] for c in self.COLUMNS], show="headings", height=8)
+        for column, text, width in self.COLUMNS:
+            self.tree.heading(column, text=text)
+            self.tree.column(column, width=width)
+        scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+        
+        self.summary_label = ttk.Label(frame, text="履歴を読み込み中...")
+        self.summary_label.pack(anchor=tk.W, pady=(5, 0))
+        
+        self.detail_text = tk.Text(frame, height=12, state="disabled", wrap=tk.NONE)
+        self.detail_text.tag_configure("removed", foreground="red")
+        self.detail_text.tag_configure("added", foreground="green")
+        self.detail_text.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
+        
+        button_frame = ttk.Frame(frame)
+        button_frame.pack(pady=(5, 0))
+        ttk.Button(button_frame, text="この版に戻す", command=self.restore_selected).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(button_frame, text="閉じる", command=self.window.destroy).pack(side=tk.LEFT)
+        
+        threading.Thread(target=self._update_index, daemon=True).start()
+        self.window.after(100, self._poll)
+        
+    def _update_index(self):
         try:
-            # User-Agentを設定してリクエスト
-            req = urllib.request.Request(url)
-            req.add_header('User-Agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-            
-            # タイムアウト5秒でリクエスト実行
-            with urllib.request.urlopen(req, timeout=5) as response:
-                if response.getcode() == 200:
-                    return "有効"
-                else:
-                    return f"エラー (HTTP {response.getcode()})"
-        except urllib.error.HTTPError as e:
-            return f"HTTPエラー ({e.code})"
-        except urllib.error.URLError as e:
-            return f"URLエラー ({str(e)})"
-        except Exception as e:
-            return f"エラー ({str(e)})"
+            self.git_history.update()
+            self._result = (True, self.git_history.history(self.name))
+        except GitHistoryError as e:
+            self._result = (False, str(e))
+            
+    def _poll(self):
+        if not self.window.winfo_exists():
+            return
+        if self._result is None:
+            self.window.after(100, self._poll)
+            return
+        ok, value = self._result
+        if not ok:
+            self.summary_label.configure(text=f"履歴を読み込めません: {value}")
+            return
+        for revision in value:
+            when = datetime.fromtimestamp(revision["time"]).strftime("%Y-%m-%d %H:%M")
+            values = (when, revision["commit"][:8], KIND_LABELS[revision["kind"]], revision["author"], revision["subject"])
+            item = self.tree.insert("", tk.END, values=values)
+            self.revisions[item] = revision
+        self.summary_label.configure(text=f"{len(value)}件の変更" if value else "このゲームの履歴はありません")
+        
+    def selected_revision(self):
+        selection = self.tree.selection()
+        return self.revisions.get(selection[0]) if selection else None
+        
+    def on_select(self, event):
+        """選択した版と直前の版の差分を表示"""
+        revision = self.selected_revision()
+        if revision is None:
+            return
+        before = self.git_history.previous_game(self.name, revision)
+        after = self.git_history.game(revision)
+        self.detail_text.configure(state="normal")
+        self.detail_text.delete(1.0, tk.END)
+        old_lines = json.dumps(before, ensure_ascii=False, indent=2).splitlines() if before is not None else []
+        new_lines = json.dumps(after, ensure_ascii=False, indent=2).splitlines() if after is not None else []
+        for line in difflib.unified_diff(old_lines, new_lines, "直前の版", revision["commit"][:8], lineterm="", n=2):
+            tag = "removed" if line.startswith("-") else "added" if line.startswith("+") else ""
+            self.detail_text.insert(tk.END, line + "\n", tag)
+        self.detail_text.configure(state="disabled")
+        
+    def restore_selected(self):
+        """選択した版の内容をエディターのゲームに反映（保存するまで games.json は変わらない）"""
+        revision = self.selected_revision()
+        if revision is None:
+            messagebox.showinfo("復元", "戻す版を選択してください", parent=self.window)
+            return
+        game = self.git_history.game(revision)
+        action = "削除" if game is None else f"{revision['commit'][:8]} の内容に戻"
+        if not messagebox.askyesno("確認", f"'{self.name}' を{action}しますか？", parent=self.window):
+            return
+        changed = self.on_restore({self.name: game})
+        if self.on_status:
+            self.on_status(f"履歴から{changed}件のゲームを復元しました", "success")
 
-def main():
+def main(json_file=None):
     root = tk.Tk()
-    app = GamesEditor(root)
+    if json_file is None:
+        json_file = sys.argv[1] if len(sys.argv) > 1 else "games.json"
+    app = GamesEditor(root, json_file)
     root.mainloop()
 
 if __name__ == "__main__":
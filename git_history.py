@@ -0,0 +1,249 @@
+"""games.json のゲームごとの変更履歴（Git から作るインデックス）
+
+`git log --first-parent --raw` を1回流し読みして games.json を変更したコミットと
+そのときのファイルの内容（blob）を順にたどり、`git cat-file --batch` で内容を読んで
+ゲームごとのハッシュを直前のコミットと比べる。変わったゲームだけを履歴に記録する。
+
+結果は .games_history.json に保存し、次回は前回処理したコミットより後の
+コミットだけを処理する（履歴が書き換えられていたら作り直す）。
+ゲームの履歴を調べるときは保存済みのインデックスを引くだけなので、差分の計算はしない。
+
+ゲームは名前で対応付ける（backup_store と同じキー）。名前を変えたゲームは
+古い名前の削除と新しい名前の追加として記録される。
+
+コマンドラインからも使える:
+    python git_history.py "ゲーム名"
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+from datetime import datetime
+
+from backup_store import keyed_games, game_hash, DIFF_ADDED, DIFF_REMOVED, DIFF_CHANGED
+from catalog_store import atomic_write_bytes
+
+DEFAULT_INDEX_FILE = ".games_history.json"
+INDEX_VERSION = 1
+
+# git log の出力でコミットの区切りとフィールドの区切りに使う文字
+_COMMIT_MARK = "\x1e"
+_FIELD_SEPARATOR = "\x1f"
+_NULL_SHA = "0" * 40
+
+
+class GitHistoryError(Exception):
+    """git の実行に失敗した"""
+
+
+class GitHistory:
+    """ゲームごとの変更履歴インデックス
+
+    Args:
+        repo_dir (str): リポジトリのディレクトリ
+        path (str): リポジトリ内の games.json のパス
+        index_path (str): インデックスの保存先（省略時は repo_dir/.games_history.json）
+    """
+
+    def __init__(self, repo_dir, path="games.json", index_path=None):
+        self.repo_dir = repo_dir
+        self.path = path
+        self.index_path = index_path or os.path.join(repo_dir, DEFAULT_INDEX_FILE)
+        self._lock = threading.Lock()
+        self._index = None
+
+    def update(self):
+        """前回以降のコミットを処理してインデックスを更新
+
+        Returns:
+            int: 新しく処理したコミットの数
+        """
+        with self._lock:
+            index = self._load()
+            head = self._git("rev-parse", "--verify", "--quiet", "HEAD", check=False)
+            if not head:
+                return 0
+            if index["head"] == head:
+                return 0
+            if index["head"] and not self._is_ancestor(index["head"], head):
+                # 履歴が書き換えられている
+                index = self._empty_index()
+
+            processed = self._scan(index, index["head"], head)
+            index["head"] = head
+            self._index = index
+            self._save()
+            return processed
+
+    def history(self, key):
+        """ゲームの変更履歴（新しい順）
+
+        Returns:
+            list: {"commit", "time", "author", "subject", "kind", "hash"} のリスト
+        """
+        with self._lock:
+            index = self._load()
+            return list(reversed(index["history"].get(key, [])))
+
+    def game(self, revision):
+        """履歴の版でのゲームの内容（削除された版ならNone）"""
+        with self._lock:
+            return self._load()["games"].get(revision["hash"]) if revision["hash"] else None
+
+    def previous_game(self, key, revision):
+        """その版の直前の版でのゲームの内容（最初の版ならNone）"""
+        revisions = self.history(key)
+        position = revisions.index(revision)
+        if position + 1 < len(revisions):
+            return self.game(revisions[position + 1])
+        return None
+
+    # --- インデックスの作成 ----------------------------------------------
+
+    def _scan(self, index, since, head):
+        """since（含まない）から head までの games.json を変更したコミットを処理"""
+        revision_range = f"{since}..{head}" if since else head
+        log = subprocess.Popen(
+            ["git", "log", "--reverse", "--first-parent", "--raw", "--no-abbrev", "--no-renames",
+             f"--format={_COMMIT_MARK}%H{_FIELD_SEPARATOR}%at{_FIELD_SEPARATOR}%an{_FIELD_SEPARATOR}%s",
+             revision_range, "--", self.path],
+            cwd=self.repo_dir, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, encoding="utf-8", errors="replace")
+        cat_file = subprocess.Popen(["git", "cat-file", "--batch"], cwd=self.repo_dir,
+                                    stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        processed = 0
+        try:
+            commit = None
+            for line in log.stdout:
+                line = line.rstrip("\n")
+                if line.startswith(_COMMIT_MARK):
+                    commit = dict(zip(("commit", "time", "author", "subject"),
+                                      line[1:].split(_FIELD_SEPARATOR, 3)))
+                    commit["time"] = int(commit["time"])
+                elif line.startswith(":") and commit is not None:
+                    blob = line.split()[3]
+                    games = [] if blob == _NULL_SHA else self._read_blob(cat_file, blob)
+                    if games is not None:
+                        self._record(index, commit, games)
+                    processed += 1
+                    commit = None
+        finally:
+            cat_file.stdin.close()
+            cat_file.wait()
+            log.stdout.close()
+            log.wait()
+        if log.returncode != 0:
+            raise GitHistoryError("git log に失敗しました")
+        return processed
+
+    def _read_blob(self, cat_file, blob):
+        cat_file.stdin.write((blob + "\n").encode("ascii"))
+        cat_file.stdin.flush()
+        header = cat_file.stdout.readline().split()
+        if len(header) < 3 or header[1] != b"blob":
+            raise GitHistoryError(f"blob を読めません: {blob}")
+        data = cat_file.stdout.read(int(header[2]))
+        cat_file.stdout.read(1)  # 末尾の改行
+        try:
+            games = json.loads(data.decode("utf-8"))
+        except ValueError:
+            return None  # 壊れた JSON がコミットされていた場合は飛ばす
+        return games if isinstance(games, list) else None
+
+    def _record(self, index, commit, games):
+        """コミット時点のゲームを直前のコミットと比べて、変わったゲームを記録"""
+        manifest = {}
+        for key, game in keyed_games(games):
+            digest = game_hash(game)
+            manifest[key] = digest
+            index["games"].setdefault(digest, game)
+
+        previous = index["manifest"]
+        for key, digest in manifest.items():
+            before = previous.get(key)
+            if before == digest:
+                continue
+            kind = DIFF_ADDED if before is None else DIFF_CHANGED
+            index["history"].setdefault(key, []).append(dict(commit, kind=kind, hash=digest))
+        for key in previous:
+            if key not in manifest:
+                index["history"].setdefault(key, []).append(dict(commit, kind=DIFF_REMOVED, hash=None))
+        index["manifest"] = manifest
+
+    # --- 保存・読み込み -------------------------------------------------
+
+    def _empty_index(self):
+        return {"version": INDEX_VERSION, "path": self.path, "head": None,
+                "manifest": {}, "history": {}, "games": {}}
+
+    def _load(self):
+        if self._index is not None:
+            return self._index
+        index = None
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                index = None
+        if not index or index.get("version") != INDEX_VERSION or index.get("path") != self.path:
+            index = self._empty_index()
+        self._index = index
+        return index
+
+    def _save(self):
+        data = json.dumps(self._index, ensure_ascii=False).encode("utf-8")
+        atomic_write_bytes(self.index_path, data)
+
+    def _is_ancestor(self, commit, head):
+        result = subprocess.run(["git", "merge-base", "--is-ancestor", commit, head],
+                                cwd=self.repo_dir, capture_output=True)
+        return result.returncode == 0
+
+    def _git(self, *args, check=True):
+        try:
+            result = subprocess.run(["git"] + list(args), cwd=self.repo_dir, capture_output=True, text=True)
+        except OSError as e:
+            raise GitHistoryError(str(e))
+        if result.returncode != 0:
+            if check:
+                raise GitHistoryError(result.stderr.strip() or "Gitコマンドが失敗しました")
+            return None
+        return result.stdout.strip()
+
+
+KIND_LABELS = {DIFF_ADDED: "追加", DIFF_REMOVED: "削除", DIFF_CHANGED: "変更"}
+
+
+def format_revision(revision):
+    """履歴の版を1行の文字列にする"""
+    when = datetime.fromtimestamp(revision["time"]).strftime("%Y-%m-%d %H:%M")
+    return f"{when}  {revision['commit'][:8]}  [{KIND_LABELS[revision['kind']]}]  {revision['author']}: {revision['subject']}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="games.json のゲームごとの変更履歴を表示します")
+    parser.add_argument("name", help="ゲーム名")
+    parser.add_argument("--repo", default=os.path.dirname(os.path.abspath(__file__)), help="リポジトリのディレクトリ")
+    parser.add_argument("--path", default="games.json", help="リポジトリ内の games.json のパス")
+    args = parser.parse_args(argv)
+
+    history = GitHistory(args.repo, args.path)
+    try:
+        history.update()
+    except GitHistoryError as e:
+        print(f"履歴を読み込めません: {e}", file=sys.stderr)
+        return 1
+    revisions = history.history(args.name)
+    if not revisions:
+        print(f"履歴が見つかりません: {args.name}", file=sys.stderr)
+        return 1
+    for revision in revisions:
+        print(format_revision(revision))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""保存時の Git コミット・プッシュをバックグラウンドで実行するワーカー
+
+エディターのスレッドでは git を実行せず、コミットの依頼をキューに積むだけにする。
+    - 短い間隔で続けて保存された場合は、最後の保存から COALESCE_DELAY 秒待って
+      1回のコミットにまとめる
+    - コマンドはシェルを通さず引数のリストで実行する（コミットメッセージの引用符などで壊れない）
+    - プッシュが失敗したら待ち時間を倍にしながら再試行する（その間もコミットは受け付ける）
+進捗や失敗は poll で (種類, メッセージ) として取り出し、ステータスバーに表示する。
+
+このモジュールは tkinter を import しない。
+"""
+import subprocess
+import threading
+import time
+from collections import deque
+
+from perf_trace import span
+
+# 連続した保存を1回のコミットにまとめるための待ち時間（秒）
+COALESCE_DELAY = 2.0
+
+# プッシュの再試行回数と最初の待ち時間（秒）。待ち時間は失敗するたびに倍になる
+PUSH_RETRIES = 3
+PUSH_BACKOFF = 5.0
+
+# git コマンド1回の制限時間（秒）
+GIT_TIMEOUT = 60
+
+
+def run_git(args, cwd, timeout=GIT_TIMEOUT):
+    """git を引数リストで実行
+
+    Returns:
+        tuple: (成功したかどうか, 出力またはエラーメッセージ)
+    """
+    try:
+        with span("git." + (args[0] if args else "")):
+            result = subprocess.run(["git"] + list(args), capture_output=True, text=True, cwd=cwd, timeout=timeout)
+    except (OSError, subprocess.SubprocessError) as e:
+        return False, str(e)
+    if result.returncode == 0:
+        return True, result.stdout.strip()
+    return False, result.stderr.strip() or "Gitコマンドが失敗しました"
+
+
+class GitWorker:
+    """Git のコミット・プッシュを1本のスレッドで順に実行する
+
+    Args:
+        repo_dir (str): リポジトリのディレクトリ
+        paths (tuple): コミットするファイル
+        remote (str): プッシュ先のリモート
+        branch (str): プッシュするブランチ
+        coalesce_delay (float): 連続した保存をまとめる待ち時間（秒）
+        push_retries (int): プッシュの再試行回数
+        push_backoff (float): 最初の再試行までの待ち時間（秒）
+        runner (callable): run_git と同じ形の関数（テスト用に差し替えられる）
+    """
+
+    def __init__(self, repo_dir, paths=("games.json",), remote="origin", branch="main",
+                 coalesce_delay=COALESCE_DELAY, push_retries=PUSH_RETRIES, push_backoff=PUSH_BACKOFF, runner=None):
+        self.repo_dir = repo_dir
+        self.paths = tuple(paths)
+        self.remote = remote
+        self.branch = branch
+        self.coalesce_delay = coalesce_delay
+        self.push_retries = push_retries
+        self.push_backoff = push_backoff
+        self.runner = runner or run_git
+
+        self._condition = threading.Condition()
+        self._events = deque()
+        self._commit = None        # 待機中のコミット {"message", "push", "saves", "due"}
+        self._push = None          # 待機中のプッシュ {"attempt", "due"}
+        self._busy = False
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="git-worker", daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self):
+        """待機中・実行中のコミットやプッシュがあるかどうか"""
+        with self._condition:
+            return self._busy or self._commit is not None or self._push is not None
+
+    def request_commit(self, message, push=False):
+        """コミットを依頼する（待機中のコミットがあればまとめる）
+
+        Args:
+            message (str): コミットメッセージ（まとめた場合は最後の保存のもの）
+            push (bool): コミット後にプッシュするかどうか
+        """
+        with self._condition:
+            due = time.monotonic() + self.coalesce_delay
+            if self._commit is None:
+                self._commit = {"message": message, "push": push, "saves": 1, "due": due}
+            else:
+                self._commit["message"] = message
+                self._commit["push"] = self._commit["push"] or push
+                self._commit["saves"] += 1
+                self._commit["due"] = due
+            self._condition.notify()
+
+    def flush(self):
+        """待機中のコミットとプッシュをすぐに実行する"""
+        with self._condition:
+            now = time.monotonic()
+            for job in (self._commit, self._push):
+                if job is not None:
+                    job["due"] = now
+            self._condition.notify()
+
+    def poll(self):
+        """進捗・結果のメッセージを取り出す
+
+        Returns:
+            list: (種類, メッセージ) のリスト。種類は "info" / "success" / "warning" / "error"
+        """
+        events = []
+        while self._events:
+            events.append(self._events.popleft())
+        return events
+
+    def close(self, timeout=10.0):
+        """待機中のコミットを実行してからワーカーを止める（プッシュの再試行は打ち切る）
+
+        Returns:
+            bool: 制限時間内に終わったかどうか
+        """
+        with self._condition:
+            self._stopping = True
+            if self._commit is not None:
+                self._commit["due"] = time.monotonic()
+            self._condition.notify()
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    # --- ワーカースレッド ------------------------------------------------
+
+    def _run(self):
+        while True:
+            with self._condition:
+                job = self._next_job()
+                while job is None:
+                    if self._stopping:
+                        return
+                    self._condition.wait(self._wait_time())
+                    job = self._next_job()
+                self._busy = True
+            try:
+                if job[0] == "commit":
+                    self._do_commit(job[1])
+                else:
+                    self._do_push(job[1]["attempt"])
+            finally:
+                with self._condition:
+                    self._busy = False
+
+    def _next_job(self):
+        # 期限の来た仕事を取り出す（コミットを優先。停止中はプッシュの再試行をしない）
+        now = time.monotonic()
+        if self._commit is not None and (self._commit["due"] <= now or self._stopping):
+            commit, self._commit = self._commit, None
+            return "commit", commit
+        if self._push is not None and not self._stopping and self._push["due"] <= now:
+            push, self._push = self._push, None
+            return "push", push
+        return None
+
+    def _wait_time(self):
+        dues = [job["due"] for job in (self._commit, self._push) if job is not None]
+        if not dues:
+            return None
+        return max(0.0, min(dues) - time.monotonic())
+
+    def _emit(self, status_type, message):
+        self._events.append((status_type, message))
+
+    def _git(self, *args):
+        ok, output = self.runner(list(args), self.repo_dir)
+        if not ok:
+            self._emit("error", f"Git エラー: {output}")
+        return ok, output
+
+    def _do_commit(self, commit):
+        self._emit("info", "Gitコミット中...")
+        ok, _ = self._git("add", "--", *self.paths)
+        if not ok:
+            return
+        ok, output = self._git("diff", "--staged", "--name-only")
+        if not ok:
+            return
+        if not output.strip():
+            self._emit("info", "コミットする変更がありません")
+            return
+        ok, _ = self._git("commit", "-m", commit["message"])
+        if not ok:
+            return
+
+        if commit["saves"] > 1:
+            self._emit("success", f"コミット完了（{commit['saves']}回の保存をまとめました）")
+        else:
+            self._emit("success", "コミット完了")
+        if commit["push"]:
+            self._do_push(0)
+
+    def _do_push(self, attempt):
+        with self._condition:
+            # これから行うプッシュが待機中の再試行を兼ねる
+            self._push = None
+        self._emit("info", "GitHubにプッシュ中..." if attempt == 0 else f"プッシュを再試行中... ({attempt}/{self.push_retries})")
+        ok, output = self.runner(["push", self.remote, self.branch], self.repo_dir)
+        if ok:
+            self._emit("success", "プッシュ完了")
+            return
+        if attempt >= self.push_retries or self._stopping:
+            self._emit("error", f"プッシュに失敗しました: {output}")
+            return
+        delay = self.push_backoff * (2 ** attempt)
+        self._emit("warning", f"プッシュに失敗しました。{delay:.0f}秒後に再試行します: {output}")
+        with self._condition:
+            # 再試行待ちの間にプッシュ付きのコミットが来れば、そのプッシュが再試行を兼ねる
+            self._push = {"attempt": attempt + 1, "due": time.monotonic() + delay}
@@ -0,0 +1,324 @@
+"""カタログ全体のリンク監査
+
+games.json の全ゲームの unityroomURL・GitHubURL・画像URL を、
+上限付きのワーカープールでチェックする。同じホストへの同時接続数は
+ホストごとに制限し、unityroom / GitHub / Discord CDN に負荷をかけすぎないようにする。
+
+コマンドラインからも実行できる:
+    python link_audit.py [games.json] [--workers 8] [--per-host 2]
+"""
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from perf_trace import span
+from url_checker import (
+    URL_FIELDS, VALID_STATUS, DEFAULT_TIMEOUT, DEFAULT_CACHE_FILE, DEFAULT_CACHE_TTL,
+    UrlCheckCache, check_single_url
+)
+
+DEFAULT_WORKERS = 8
+DEFAULT_PER_HOST = 2
+
+AuditResult = namedtuple("AuditResult", "game_name field label url host status ok elapsed")
+
+
+def url_host(url):
+    """URLからホスト名を取り出す（取れない場合は空文字）"""
+    try:
+        return (urlparse(url).hostname or "").lower()
+    except ValueError:
+        return ""
+
+
+def collect_audit_targets(games):
+    """カタログ全体からチェック対象を集める
+
+    Returns:
+        list: (ゲーム名, フィールド, 表示名, URL) のリスト
+    """
+    targets = []
+    for game in games:
+        name = game.get("name", "名前なし")
+        for field, label in URL_FIELDS.items():
+            url = (game.get(field) or "").strip()
+            if url:
+                targets.append((name, field, label, url))
+    return targets
+
+
+class LinkAudit:
+    """カタログ全体のリンク監査
+
+    ホストごとの待ち行列を持ち、同時実行数が上限未満のホストからだけ
+    ワーカープールにチェックを投入する。待ち行列で待つのはワーカーではなく
+    未投入のURLなので、遅いホストが他のホストのチェックを塞ぐことはない。
+    同じURLが複数のゲームで使われている場合は1回だけチェックする。
+    """
+
+    def __init__(self, games, max_workers=DEFAULT_WORKERS, per_host=DEFAULT_PER_HOST,
+                 host_limits=None, check_func=None, timeout=DEFAULT_TIMEOUT, cache=None):
+        self.targets = collect_audit_targets(games)
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.host_limits = dict(host_limits or {})
+        self.cache = cache
+        if check_func is None:
+            if cache is not None:
+                check_func = lambda url: cache.check(url, timeout)
+            else:
+                check_func = lambda url: check_single_url(url, timeout)
+        self._check_func = check_func
+
+        self.results = []
+        self.started_at = None
+        self.finished_at = None
+        self._events = queue.Queue()
+        self._lock = threading.Lock()
+        self._done_event = threading.Event()
+        self._cancel_event = threading.Event()
+        self._executor = None
+
+        # URLごとの参照元とホストごとの待ち行列
+        self._url_targets = {}
+        self._pending = {}
+        self._in_flight = {}
+        for target in self.targets:
+            url = target[3]
+            if url not in self._url_targets:
+                self._url_targets[url] = []
+                self._pending.setdefault(url_host(url), deque()).append(url)
+            self._url_targets[url].append(target)
+        self._remaining = len(self._url_targets)
+
+    @property
+    def total(self):
+        return len(self.targets)
+
+    @property
+    def completed(self):
+        with self._lock:
+            return len(self.results)
+
+    @property
+    def done(self):
+        return self._done_event.is_set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    @property
+    def wall_time(self):
+        """監査開始からの経過時間（完了後は総所要時間）"""
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return end - self.started_at
+
+    def limit_for(self, host):
+        return self.host_limits.get(host, self.per_host)
+
+    def start(self):
+        """監査を開始（結果は poll で順次取り出す）"""
+        self.started_at = time.perf_counter()
+        if self._remaining == 0:
+            self._finish()
+            return self
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="link-audit")
+        with self._lock:
+            self._dispatch()
+        return self
+
+    def run(self):
+        """監査を実行して完了まで待つ"""
+        self.start()
+        self.wait()
+        return self.results
+
+    def wait(self, timeout=None):
+        return self._done_event.wait(timeout)
+
+    def cancel(self):
+        """未チェックのURLを破棄して監査を打ち切る"""
+        self._cancel_event.set()
+        with self._lock:
+            self._pending.clear()
+        self._finish()
+
+    def poll(self):
+        """前回のpoll以降に完了した結果を返す"""
+        events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def host_stats(self):
+        """ホストごとの件数と応答時間の統計
+
+        Returns:
+            dict: ホスト名 -> {count, failed, min, avg, max, p90}（時間は秒）
+        """
+        with self._lock:
+            results = list(self.results)
+
+        elapsed_by_host = {}
+        failed_by_host = {}
+        seen = set()
+        for result in results:
+            failed_by_host.setdefault(result.host, 0)
+            if not result.ok:
+                failed_by_host[result.host] += 1
+            # 同じURLの重複分は応答時間の統計に含めない
+            if result.url in seen:
+                continue
+            seen.add(result.url)
+            elapsed_by_host.setdefault(result.host, []).append(result.elapsed)
+
+        stats = {}
+        for host, values in elapsed_by_host.items():
+            values.sort()
+            stats[host] = {
+                "count": len(values),
+                "failed": failed_by_host.get(host, 0),
+                "min": values[0],
+                "avg": sum(values) / len(values),
+                "max": values[-1],
+                "p90": values[min(len(values) - 1, int(len(values) * 0.9))],
+            }
+        return stats
+
+    def _dispatch(self):
+        # self._lock を保持した状態で呼ぶこと
+        if self.cancelled:
+            return
+        for host, pending in self._pending.items():
+            while pending and self._in_flight.get(host, 0) < self.limit_for(host):
+                url = pending.popleft()
+                self._in_flight[host] = self._in_flight.get(host, 0) + 1
+                self._executor.submit(self._check, host, url)
+
+    def _check(self, host, url):
+        if self.cancelled:
+            return
+        begin = time.perf_counter()
+        try:
+            with span("url.audit", host=host):
+                status = self._check_func(url)
+        except Exception as e:
+            status = f"エラー ({str(e)})"
+        elapsed = time.perf_counter() - begin
+        ok = status == VALID_STATUS
+
+        finished = False
+        with self._lock:
+            self._in_flight[host] -= 1
+            if self.cancelled:
+                return
+            for name, field, label, _ in self._url_targets[url]:
+                result = AuditResult(name, field, label, url, host, status, ok, elapsed)
+                self.results.append(result)
+                self._events.put(result)
+            self._remaining -= 1
+            finished = self._remaining == 0
+            self._dispatch()
+
+        if finished:
+            self._finish()
+
+    def _finish(self):
+        if self.finished_at is None:
+            self.finished_at = time.perf_counter()
+        self._done_event.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        if self.cache is not None:
+            try:
+                self.cache.save()
+            except OSError:
+                pass
+
+
+def format_host_stats(stats):
+    """ホスト別統計を表示用の行に整形"""
+    lines = []
+    for host, s in sorted(stats.items()):
+        lines.append(
+            f"{host or '(不明)'}: {s['count']}件 失敗{s['failed']} "
+            f"平均{s['avg'] * 1000:.0f}ms 最大{s['max'] * 1000:.0f}ms p90 {s['p90'] * 1000:.0f}ms"
+        )
+    return lines
+
+
+def main(argv=None, games=None):
+    """コマンドラインから監査する
+
+    Args:
+        argv (list): 引数（None ならコマンドラインの引数）
+        games (list): 監査するゲーム（渡すと json_file は読まない。CatalogCore で読み込んだものなど）
+    """
+    parser = argparse.ArgumentParser(description="games.json の全リンクを監査します")
+    parser.add_argument("json_file", nargs="?", default="games.json", help="監査するJSONファイル")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="ワーカー数")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST, help="ホストごとの同時接続数")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="1URLあたりのタイムアウト（秒）")
+    parser.add_argument("--cache-file", default=DEFAULT_CACHE_FILE, help="URLチェック結果のキャッシュファイル")
+    parser.add_argument("--ttl", type=float, default=DEFAULT_CACHE_TTL, help="キャッシュの有効期限（秒）")
+    parser.add_argument("--no-cache", action="store_true", help="キャッシュを使わずに全URLをチェック")
+    parser.add_argument("--failed-only", action="store_true", help="失敗したURLだけ表示")
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力")
+    args = parser.parse_args(argv)
+
+    if games is None:
+        with open(args.json_file, 'r', encoding='utf-8') as f:
+            games = json.load(f)
+
+    cache = None if args.no_cache else UrlCheckCache(args.cache_file, ttl=args.ttl)
+    audit = LinkAudit(games, max_workers=args.workers, per_host=args.per_host,
+                      timeout=args.timeout, cache=cache)
+    audit.start()
+    try:
+        finished = False
+        while not finished:
+            finished = audit.wait(0.1)
+            for result in audit.poll():
+                if args.json or (args.failed_only and result.ok):
+                    continue
+                mark = "✅" if result.ok else "❌"
+                print(f"{mark} [{audit.completed}/{audit.total}] {result.game_name} / {result.label}: "
+                      f"{result.status} ({result.elapsed * 1000:.0f}ms) {result.url}", flush=True)
+    except KeyboardInterrupt:
+        audit.cancel()
+        print("中断しました", file=sys.stderr)
+        return 130
+
+    failed = [r for r in audit.results if not r.ok]
+    stats = audit.host_stats()
+    if args.json:
+        json.dump({
+            "wall_time": audit.wall_time,
+            "total": audit.total,
+            "failed": len(failed),
+            "results": [r._asdict() for r in audit.results],
+            "hosts": stats,
+        }, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print()
+        print(f"監査完了: {audit.total}件中 {len(failed)}件失敗 / 所要時間 {audit.wall_time:.2f}秒")
+        for line in format_host_stats(stats):
+            print("  " + line)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,374 @@
+"""ゲーム一覧の差分更新
+
+リストボックスの中身を毎回作り直す代わりに、表示中の行と新しい行の差分
+（削除と挿入の最小手順）を計算して、変わった行だけを更新する。
+選択中のゲームとスクロール位置は更新後も維持する。
+
+件数が多い場合は仮想表示に切り替え、リストボックスには画面に見えている
+行だけを入れる（スクロールバーは全件に対する位置を表示する）。
+
+選択（1件）とは別に、複数の項目にチェックを付けられる（Ctrl+クリック・スペースキー）。
+チェックはキーで覚えるので、仮想表示でスクロールしたり検索で絞り込んだりしても消えない。
+チェックした行は先頭に MARK_PREFIX を付けて表示する。
+
+ウィジェットは呼び出し側から渡されるので、このモジュール自体は tkinter を import しない。
+"""
+from bisect import bisect_left
+
+# この件数を超えたら仮想表示にする
+VIRTUAL_THRESHOLD = 2000
+
+# チェックした行の先頭に付ける印
+MARK_PREFIX = "✔ "
+
+
+def diff_sequences(old_keys, new_keys):
+    """2つのキー列の差分を計算
+
+    キーはそれぞれの列の中で一意であること。残す行は最長共通部分列なので、
+    削除＋挿入の回数は最小になる（一意なキー同士なのでLISで求まる）。
+
+    Returns:
+        tuple: (削除するoldのインデックス, 挿入するnewのインデックス) いずれも昇順
+    """
+    new_positions = {key: i for i, key in enumerate(new_keys)}
+
+    # oldに残っている行の、newでの位置の列
+    common = [(i, new_positions[key]) for i, key in enumerate(old_keys) if key in new_positions]
+
+    # 最長増加部分列（patience sorting）
+    tails = []
+    tail_indices = []
+    previous = [-1] * len(common)
+    for n, (_, position) in enumerate(common):
+        k = bisect_left(tails, position)
+        if k == len(tails):
+            tails.append(position)
+            tail_indices.append(n)
+        else:
+            tails[k] = position
+            tail_indices[k] = n
+        previous[n] = tail_indices[k - 1] if k > 0 else -1
+
+    kept_old = set()
+    kept_new = set()
+    n = tail_indices[-1] if tail_indices else -1
+    while n >= 0:
+        kept_old.add(common[n][0])
+        kept_new.add(common[n][1])
+        n = previous[n]
+
+    deletions = [i for i in range(len(old_keys)) if i not in kept_old]
+    insertions = [i for i in range(len(new_keys)) if i not in kept_new]
+    return deletions, insertions
+
+
+def index_ranges(indices):
+    """昇順のインデックス列を連続区間 (start, end) に分割"""
+    ranges = []
+    for index in indices:
+        if ranges and ranges[-1][1] == index - 1:
+            ranges[-1][1] = index
+        else:
+            ranges.append([index, index])
+    return [tuple(r) for r in ranges]
+
+
+class ListView:
+    """リストボックスに差分だけを反映する表示層
+
+    Args:
+        listbox: 表示先の tk.Listbox
+        scrollbar: リストボックス用の縦スクロールバー
+        label_func (callable): 項目から表示文字列を作る関数
+        key_func (callable): 項目を識別するキーを返す関数
+        virtual_threshold (int): 仮想表示に切り替える件数
+        on_marks_changed (callable): チェックが変わったときに呼ぶ関数（引数なし）
+    """
+
+    def __init__(self, listbox, scrollbar, label_func, key_func=id, virtual_threshold=VIRTUAL_THRESHOLD,
+                 on_marks_changed=None):
+        self.listbox = listbox
+        self.scrollbar = scrollbar
+        self.label_func = label_func
+        self.key_func = key_func
+        self.virtual_threshold = virtual_threshold
+        self.on_marks_changed = on_marks_changed
+
+        self.items = []
+        self.virtual = False
+        self.offset = 0            # 仮想表示で先頭に表示している項目のインデックス
+        self.last_ops = (0, 0)     # 直近の更新で削除・挿入した行数
+        self._keys = []
+        self._positions = {}
+        self._rows = []            # リストボックスに入っている (キー, 表示文字列)
+        self._selected_key = None
+        self._marks = set()        # チェックした項目のキー
+
+        self.listbox.bind('<<ListboxSelect>>', self._on_listbox_select, add="+")
+        self.listbox.bind('<Control-Button-1>', self._on_mark_click, add="+")
+        self.listbox.bind('<space>', self._on_mark_key, add="+")
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            self.listbox.bind(sequence, self._on_mouse_wheel, add="+")
+        for sequence in ('<Up>', '<Down>', '<Prior>', '<Next>'):
+            self.listbox.bind(sequence, self._on_key_navigate, add="+")
+
+    def __len__(self):
+        return len(self.items)
+
+    # --- 公開API -------------------------------------------------------
+
+    def set_items(self, items):
+        """表示する項目を差し替える（変わった行だけを更新）"""
+        had_selection = bool(self.listbox.curselection())
+        top_key = self._top_key()
+
+        self.items = list(items)
+        self._keys = [self.key_func(item) for item in self.items]
+        self._positions = {key: i for i, key in enumerate(self._keys)}
+        if self._selected_key not in self._positions:
+            self._selected_key = None
+
+        self._set_virtual(len(self.items) > self.virtual_threshold)
+
+        # スクロール位置：先頭に見えていた項目を先頭に保つ
+        top = self._positions.get(top_key)
+        if self.virtual:
+            if top is not None:
+                self.offset = top
+            self._clamp_offset()
+            self._render()
+        else:
+            self._render()
+            if top is not None:
+                self.listbox.yview(top)
+
+        if had_selection or self.virtual:
+            self._restore_selection()
+
+    def index_of(self, item):
+        """項目のインデックス（表示されていなければNone）"""
+        return self._positions.get(self.key_func(item))
+
+    def selected_index(self):
+        """選択中の項目のインデックス（選択がなければNone）"""
+        selection = self.listbox.curselection()
+        if selection:
+            index = selection[0] + (self.offset if self.virtual else 0)
+            if index < len(self.items):
+                self._selected_key = self._keys[index]
+                return index
+            return None
+        if self.virtual and self._selected_key is not None and not self._key_in_window(self._selected_key):
+            # 仮想表示で選択行が画面外にスクロールされている
+            return self._positions.get(self._selected_key)
+        return None
+
+    def selected_item(self):
+        index = self.selected_index()
+        return self.items[index] if index is not None else None
+
+    def select(self, index):
+        """項目を選択して表示範囲に入れる"""
+        if not 0 <= index < len(self.items):
+            return
+        self._selected_key = self._keys[index]
+        self.see(index)
+        self._restore_selection()
+
+    def clear_selection(self):
+        self._selected_key = None
+        self.listbox.selection_clear(0, "end")
+
+    # --- チェック -------------------------------------------------------
+
+    @property
+    def marked_keys(self):
+        """チェックした項目のキー（表示されていない項目も含む）"""
+        return frozenset(self._marks)
+
+    def is_marked(self, item):
+        return self.key_func(item) in self._marks
+
+    def toggle_mark(self, index):
+        """項目のチェックを付け外しする"""
+        if not 0 <= index < len(self.items):
+            return
+        key = self._keys[index]
+        if key in self._marks:
+            self._marks.discard(key)
+        else:
+            self._marks.add(key)
+        self._marks_changed()
+
+    def mark_all(self):
+        """表示中の項目すべてにチェックを付ける"""
+        self._marks.update(self._keys)
+        self._marks_changed()
+
+    def unmark(self, keys):
+        """指定したキーのチェックを外す（削除した項目など）"""
+        self._marks.difference_update(keys)
+        self._marks_changed()
+
+    def clear_marks(self):
+        self._marks.clear()
+        self._marks_changed()
+
+    def _marks_changed(self):
+        self._render()
+        self._restore_selection()
+        if self.on_marks_changed is not None:
+            self.on_marks_changed()
+
+    def see(self, index):
+        """項目が見えるようにスクロール"""
+        if not 0 <= index < len(self.items):
+            return
+        if not self.virtual:
+            self.listbox.see(index)
+            return
+        visible = self._visible_rows()
+        if index < self.offset:
+            self.offset = index
+        elif index >= self.offset + visible:
+            self.offset = index - visible + 1
+        else:
+            return
+        self._clamp_offset()
+        self._render()
+
+    # --- 内部処理 ------------------------------------------------------
+
+    def _set_virtual(self, virtual):
+        if virtual == self.virtual:
+            return
+        self.virtual = virtual
+        if virtual:
+            self.listbox.configure(yscrollcommand="")
+            self.scrollbar.configure(command=self._on_scrollbar)
+        else:
+            self.offset = 0
+            self.listbox.configure(yscrollcommand=self.scrollbar.set)
+            self.scrollbar.configure(command=self.listbox.yview)
+
+    def _visible_rows(self):
+        return max(1, int(self.listbox.cget("height")))
+
+    def _clamp_offset(self):
+        self.offset = max(0, min(self.offset, len(self.items) - self._visible_rows()))
+
+    def _window(self):
+        if self.virtual:
+            return range(self.offset, min(len(self.items), self.offset + self._visible_rows()))
+        return range(len(self.items))
+
+    def _key_in_window(self, key):
+        position = self._positions.get(key)
+        return position is not None and position in self._window()
+
+    def _top_key(self):
+        if not self._rows:
+            return None
+        if self.virtual:
+            return self._rows[0][0]
+        top = self.listbox.nearest(0)
+        return self._rows[top][0] if 0 <= top < len(self._rows) else None
+
+    def _render(self):
+        """表示範囲の行を差分でリストボックスに反映"""
+        new_rows = []
+        for i in self._window():
+            key = self._keys[i]
+            label = self.label_func(self.items[i])
+            new_rows.append((key, MARK_PREFIX + label if key in self._marks else label))
+        deletions, insertions = diff_sequences(self._rows, new_rows)
+
+        for start, end in reversed(index_ranges(deletions)):
+            self.listbox.delete(start, end)
+        for start, end in index_ranges(insertions):
+            self.listbox.insert(start, *[new_rows[i][1] for i in range(start, end + 1)])
+
+        self._rows = new_rows
+        self.last_ops = (len(deletions), len(insertions))
+        if self.virtual:
+            self._update_scrollbar()
+
+    def _restore_selection(self):
+        self.listbox.selection_clear(0, "end")
+        position = self._positions.get(self._selected_key)
+        if position is None or position not in self._window():
+            return
+        row = position - (self.offset if self.virtual else 0)
+        self.listbox.selection_set(row)
+        self.listbox.activate(row)
+
+    def _update_scrollbar(self):
+        total = len(self.items)
+        if total == 0:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        first = self.offset / total
+        last = min(1.0, (self.offset + self._visible_rows()) / total)
+        self.scrollbar.set(first, last)
+
+    def _scroll_to(self, offset):
+        self.offset = offset
+        self._clamp_offset()
+        self._render()
+        self._restore_selection()
+
+    def _on_scrollbar(self, *args):
+        if not args:
+            return
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * len(self.items)))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= self._visible_rows()
+            self._scroll_to(self.offset + amount)
+
+    def _on_mouse_wheel(self, event):
+        if not self.virtual:
+            return None
+        if getattr(event, "num", None) == 4:
+            step = -1
+        elif getattr(event, "num", None) == 5:
+            step = 1
+        else:
+            step = -1 if event.delta > 0 else 1
+        self._scroll_to(self.offset + step * 3)
+        return "break"
+
+    def _on_key_navigate(self, event):
+        if not self.virtual or not self.items:
+            return None
+        current = self.selected_index()
+        if current is None:
+            current = self.offset
+        page = self._visible_rows()
+        step = {"Up": -1, "Down": 1, "Prior": -page, "Next": page}.get(event.keysym, 0)
+        target = max(0, min(len(self.items) - 1, current + step))
+        self.select(target)
+        self.listbox.event_generate('<<ListboxSelect>>')
+        return "break"
+
+    def _on_mark_click(self, event):
+        row = self.listbox.nearest(event.y)
+        if 0 <= row < len(self._rows):
+            self.toggle_mark(row + (self.offset if self.virtual else 0))
+        return "break"
+
+    def _on_mark_key(self, event):
+        index = self.selected_index()
+        if index is not None:
+            self.toggle_mark(index)
+        return "break"
+
+    def _on_listbox_select(self, event):
+        selection = self.listbox.curselection()
+        if selection:
+            index = selection[0] + (self.offset if self.virtual else 0)
+            if index < len(self.items):
+                self._selected_key = self._keys[index]
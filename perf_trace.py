@@ -0,0 +1,262 @@
+"""処理時間の計測（主な処理のタイマーとトレースの書き出し）
+
+読み込み・検索・一覧の更新・保存・バックアップ・URLチェック・git などの処理を
+span（with 文）や timed（デコレーター）で囲むと、処理ごとに直近の所要時間を残す。
+    - 処理ごとの直近 DEFAULT_WINDOW 回の所要時間（中央値・p95・最大と、時間帯ごとの件数）
+    - 直近 DEFAULT_TRACE_SIZE 件の記録（どのスレッドでいつ動いたか）
+記録は Chrome のトレース形式（chrome://tracing や https://ui.perfetto.dev で開ける JSON）で
+書き出せるので、遅いと感じたセッションの後から何に時間がかかったかを確認できる。
+
+ワーカースレッドからも記録できる。1回の記録は perf_counter 2回とロック1回なので、
+常に有効にしておいてよい。
+
+このモジュールは tkinter を import しない。
+"""
+import json
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+# 所要時間を数える区切り（ミリ秒）。最後の区切りより長いものは「それ以上」に数える
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+DEFAULT_WINDOW = 200        # 処理ごとに残す直近の所要時間の数
+DEFAULT_TRACE_SIZE = 20000  # トレースに残す直近の記録の数
+
+
+class LatencyHistogram:
+    """1つの処理の直近の所要時間（秒）
+
+    Args:
+        window (int): 残す所要時間の数（古いものから捨てる）
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.recent = deque(maxlen=window)
+        self.count = 0      # 捨てた分も含めた回数
+        self.total = 0.0    # 捨てた分も含めた合計時間
+
+    def add(self, seconds):
+        self.recent.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    @property
+    def last(self):
+        return self.recent[-1] if self.recent else None
+
+    def percentile(self, percent):
+        """直近の所要時間のパーセンタイル（記録がなければ None）"""
+        if not self.recent:
+            return None
+        values = sorted(self.recent)
+        return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+    def buckets(self):
+        """直近の所要時間を HISTOGRAM_BOUNDS_MS の区切りで数える
+
+        Returns:
+            list: 区切りごとの件数（最後の要素は最後の区切りより長いもの）
+        """
+        counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        for seconds in self.recent:
+            milliseconds = seconds * 1000
+            for index, bound in enumerate(HISTOGRAM_BOUNDS_MS):
+                if milliseconds <= bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[-1] += 1
+        return counts
+
+    def summary(self):
+        """回数・直近・中央値・p95・最大（秒）をまとめる"""
+        values = list(self.recent)
+        return {
+            "count": self.count,
+            "last": self.last,
+            "median": statistics.median(values) if values else None,
+            "p95": self.percentile(95),
+            "max": max(values) if values else None,
+        }
+
+
+class _Span:
+    """PerfRecorder.span の with 文（抜けたときに所要時間を記録する）"""
+
+    __slots__ = ("recorder", "name", "args", "started")
+
+    def __init__(self, recorder, name, args):
+        self.recorder = recorder
+        self.name = name
+        self.args = args
+        self.started = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.started
+        args = self.args
+        if exc_type is not None:
+            args = dict(args or {}, error=exc_type.__name__)
+        self.recorder.record(self.name, self.started, duration, args)
+        return False
+
+
+class PerfRecorder:
+    """処理ごとの所要時間とトレースの記録
+
+    Args:
+        window (int): 処理ごとに残す直近の所要時間の数
+        trace_size (int): トレースに残す直近の記録の数
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW, trace_size=DEFAULT_TRACE_SIZE):
+        self.window = window
+        self.enabled = True
+        self.origin = time.perf_counter()  # トレースの時刻の起点
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._events = deque(maxlen=trace_size)
+        self._thread_names = {}
+
+    def span(self, name, **args):
+        """with 文で囲んだ処理の時間を記録する
+
+        Args:
+            name (str): 処理の名前（例: "ui.refresh_game_list"）
+            **args: トレースに添える情報（件数など）
+        """
+        return _Span(self, name, args or None)
+
+    def timed(self, name):
+        """関数を呼ぶたびに時間を記録するデコレーター"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with _Span(self, name, None):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, name, started, duration, args=None):
+        """所要時間を記録する
+
+        Args:
+            name (str): 処理の名前
+            started (float): 開始時刻（time.perf_counter の値）
+            duration (float): 所要時間（秒）
+            args (dict): トレースに添える情報
+        """
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram(self.window)
+            histogram.add(duration)
+            self._events.append((name, started, duration, thread.ident, args))
+            self._thread_names.setdefault(thread.ident, thread.name)
+
+    def histogram(self, name):
+        """処理の LatencyHistogram の写し（まだ記録がなければ None）"""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                return None
+            snapshot = LatencyHistogram(self.window)
+            snapshot.recent.extend(histogram.recent)
+            snapshot.count = histogram.count
+            snapshot.total = histogram.total
+            return snapshot
+
+    def stats(self):
+        """処理ごとの要約
+
+        Returns:
+            list: (処理の名前, LatencyHistogram.summary の辞書) を名前順に並べたもの
+        """
+        with self._lock:
+            return [(name, histogram.summary()) for name, histogram in sorted(self._histograms.items())]
+
+    def recent(self, limit=20):
+        """直近の記録 (処理の名前, 所要時間(秒), 添えた情報) を新しい順に返す"""
+        with self._lock:
+            events = list(self._events)[-limit:]
+        return [(name, duration, args) for name, _, duration, _, args in reversed(events)]
+
+    def clear(self):
+        """記録をすべて消す"""
+        with self._lock:
+            self._histograms.clear()
+            self._events.clear()
+            self._thread_names.clear()
+            self.origin = time.perf_counter()
+
+    # --- トレースの書き出し ----------------------------------------------
+
+    def chrome_trace(self):
+        """Chrome のトレース形式（Trace Event Format）の辞書にする"""
+        with self._lock:
+            events = list(self._events)
+            thread_names = dict(self._thread_names)
+        pid = os.getpid()
+        trace_events = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}}
+            for tid, thread_name in thread_names.items()
+        ]
+        for name, started, duration, tid, args in events:
+            event = {
+                "name": name,
+                "cat": name.split(".", 1)[0],
+                "ph": "X",
+                "ts": round((started - self.origin) * 1e6, 1),
+                "dur": round(duration * 1e6, 1),
+                "pid": pid,
+                "tid": tid,
+            }
+            if args:
+                event["args"] = {key: value if isinstance(value, (int, float, bool)) else str(value)
+                                 for key, value in args.items()}
+            trace_events.append(event)
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path):
+        """Chrome のトレース形式で書き出す
+
+        Returns:
+            int: 書き出した記録の数
+        """
+        trace = self.chrome_trace()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(trace, f, ensure_ascii=False)
+        return sum(1 for event in trace["traceEvents"] if event["ph"] == "X")
+
+
+def format_duration(seconds):
+    """所要時間を表示用にする（None は "-"）"""
+    if seconds is None:
+        return "-"
+    if seconds >= 1:
+        return f"{seconds:.2f}s"
+    return f"{seconds * 1000:.1f}ms"
+
+
+# アプリ全体で使う記録先
+RECORDER = PerfRecorder()
+
+
+def span(name, **args):
+    """RECORDER.span の短縮形"""
+    return RECORDER.span(name, **args)
+
+
+def timed(name):
+    """RECORDER.timed の短縮形"""
+    return RECORDER.timed(name)
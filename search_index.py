@@ -0,0 +1,253 @@
+"""ゲーム検索用のN-gramインデックス
+
+ゲーム名・作者・タグ・説明を小文字化して連結したテキストを、1文字と2文字の
+N-gramで転置インデックスにする。日本語のように空白で区切られないテキストでも
+部分一致検索ができ、キーストロークごとに全ゲームの文字列を作り直す必要がない。
+
+SearchWorker は検索をバックグラウンドスレッドで実行し、新しい検索語が来たら
+古い検索を打ち切って最新の結果だけを返す。
+"""
+import sys
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+# searchable_text は Game なら連結済みのテキスト（キャッシュ）を返す
+from game_record import FIELD_SEPARATOR, searchable_text
+from perf_trace import span
+
+# 検索中にキャンセルを確認する間隔（候補数）
+CANCEL_CHECK_INTERVAL = 512
+
+
+def _position_or_last(position):
+    return position if position is not None else sys.maxsize
+
+
+def text_grams(text):
+    """テキストに含まれる1文字・2文字のN-gramの集合"""
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    grams.discard(FIELD_SEPARATOR)
+    return {gram for gram in grams if FIELD_SEPARATOR not in gram}
+
+
+def query_grams(query):
+    """検索語を絞り込むのに使うN-gram（2文字以上なら2-gramだけで十分）"""
+    if len(query) == 1:
+        return {query}
+    return {query[i:i + 2] for i in range(len(query) - 1)}
+
+
+class SearchIndex:
+    """ゲームの部分一致検索インデックス
+
+    N-gramの転置インデックスで候補を絞り込み、候補だけを部分文字列で確認する。
+    直前の検索語を含む検索語（入力が伸びた場合）は、前回の結果だけを確認する。
+    ゲームの追加・更新・削除はインデックスに差分で反映する。
+    order_func（キー→表示位置）を渡すと、結果はその順に並べる（渡さなければ set_order の順）。
+    検索はワーカースレッドからも呼ばれるので、操作はロックで直列化する。
+    """
+
+    def __init__(self, key_func=id, order_func=None):
+        self.key_func = key_func
+        self.order_func = order_func
+        self.version = 0
+        self._lock = threading.RLock()
+        self._games = {}
+        self._texts = {}
+        self._positions = {}
+        self._next_position = 0
+        self._postings = defaultdict(set)
+        self._last_query = None
+        self._last_keys = None
+        self._last_version = None
+
+    def __len__(self):
+        return len(self._games)
+
+    def rebuild(self, games):
+        """全ゲームからインデックスを作り直す"""
+        with self._lock:
+            self._games.clear()
+            self._texts.clear()
+            self._positions.clear()
+            self._next_position = 0
+            self._postings.clear()
+            for game in games:
+                self.add(game)
+
+    def add(self, game):
+        """ゲームをインデックスに追加（表示位置は末尾）"""
+        with self._lock:
+            key = self.key_func(game)
+            text = searchable_text(game)
+            self._games[key] = game
+            self._texts[key] = text
+            self._positions[key] = self._next_position
+            self._next_position += 1
+            for gram in text_grams(text):
+                self._postings[gram].add(key)
+            self.version += 1
+
+    def remove(self, game):
+        """ゲームをインデックスから削除"""
+        with self._lock:
+            key = self.key_func(game)
+            text = self._texts.pop(key, None)
+            if text is None:
+                return
+            del self._games[key]
+            del self._positions[key]
+            for gram in text_grams(text):
+                keys = self._postings.get(gram)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._postings[gram]
+            self.version += 1
+
+    def update(self, game):
+        """内容が変わったゲームを索引し直す（表示位置は維持）"""
+        with self._lock:
+            position = self._positions.get(self.key_func(game))
+            self.remove(game)
+            self.add(game)
+            if position is not None:
+                self._positions[self.key_func(game)] = position
+
+    def set_order(self, games):
+        """表示順（並べ替え後のゲームリスト）を反映"""
+        with self._lock:
+            self._positions = {self.key_func(game): i for i, game in enumerate(games)}
+            self._next_position = len(self._positions)
+
+    def search(self, query, cancelled=None):
+        """検索語に一致するゲームを表示順で返す
+
+        Args:
+            query (str): 検索語
+            cancelled (callable): Trueを返したら検索を打ち切る（Noneを返す）
+        """
+        query = query.lower()
+        with self._lock:
+            if not query:
+                keys = list(self._games)
+            else:
+                if (self._last_query is not None and self._last_version == self.version
+                        and self._last_query in query):
+                    # 入力が伸びただけなら前回の結果から絞り込む
+                    candidates = self._last_keys
+                else:
+                    candidates = self._candidates(query)
+
+                texts = self._texts
+                keys = []
+                for start in range(0, len(candidates), CANCEL_CHECK_INTERVAL):
+                    if cancelled is not None and cancelled():
+                        return None
+                    keys.extend(key for key in candidates[start:start + CANCEL_CHECK_INTERVAL]
+                                if query in texts[key])
+                self._last_query = query
+                self._last_keys = keys
+                self._last_version = self.version
+
+            if self.order_func is not None:
+                order_func = self.order_func
+                keys.sort(key=lambda key: _position_or_last(order_func(key)))
+            else:
+                positions = self._positions
+                keys.sort(key=lambda key: positions.get(key, len(positions)))
+            return [self._games[key] for key in keys]
+
+    def _candidates(self, query):
+        postings = []
+        for gram in query_grams(query):
+            keys = self._postings.get(gram)
+            if not keys:
+                return []
+            postings.append(keys)
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for keys in postings[1:]:
+            candidates &= keys
+            if not candidates:
+                break
+        return list(candidates)
+
+
+class SearchWorker:
+    """検索をバックグラウンドで実行するワーカー
+
+    submit するたびに前の検索をキャンセルし、最新の検索語の結果だけを残す。
+    結果は UI スレッドから poll で取り出す。
+    fuzzy_index（fuzzy_search.FuzzyIndex）を渡すと、submit(fuzzy=True) であいまい検索もできる。
+    """
+
+    def __init__(self, index, fuzzy_index=None):
+        self.index = index
+        self.fuzzy_index = fuzzy_index
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._cancel_event = None
+        self._result = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search")
+
+    @property
+    def pending(self):
+        """最新の検索がまだ終わっていないかどうか"""
+        with self._lock:
+            return self._cancel_event is not None
+
+    def submit(self, query, fuzzy=False):
+        """検索を開始（実行中・待機中の古い検索はキャンセル）
+
+        Args:
+            query (str): 検索語
+            fuzzy (bool): あいまい検索（結果は一致度の高い順）
+        """
+        with self._lock:
+            self._cancel_locked()
+            self.generation += 1
+            generation = self.generation
+            cancel_event = threading.Event()
+            self._cancel_event = cancel_event
+            self._result = None
+        index = self.fuzzy_index if fuzzy else self.index
+        self._executor.submit(self._run, generation, query, cancel_event, index,
+                              "search.fuzzy" if fuzzy else "search.filter")
+        return generation
+
+    def cancel(self):
+        """実行中の検索をキャンセルし、未取得の結果も捨てる"""
+        with self._lock:
+            self._cancel_locked()
+            self.generation += 1
+            self._result = None
+
+    def _cancel_locked(self):
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+            self._cancel_event = None
+
+    def poll(self):
+        """最新の検索が終わっていれば (検索語, 結果) を返す（1回だけ）"""
+        with self._lock:
+            result = self._result
+            self._result = None
+            return result
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, generation, query, cancel_event, index, span_name):
+        if cancel_event.is_set():
+            return
+        with span(span_name, query=query):
+            results = index.search(query, cancelled=cancel_event.is_set)
+        with self._lock:
+            if results is None or generation != self.generation:
+                return
+            self._result = (query, results)
+            self._cancel_event = None
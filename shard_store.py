@@ -0,0 +1,330 @@
+"""大きなカタログ向けのシャード形式の保存（任意）
+
+games.json の代わりに、ゲーム1件を1ファイルにしたフォルダで保存する。
+
+    games.d/
+        manifest.json      {"version": 1, "games": [{"file", "name", "sort_key", "sha256"}, ...]}
+        games/<file>.json  ゲーム1件
+
+    - 読み込みは manifest.json だけを読み、各ゲームは名前だけの状態（スタブ）で並べる。
+      本体は選択されたときなど、必要になったときに ensure_loaded で読み込む
+    - 保存は読み込まれた（＝変更された可能性のある）ゲームのうち、ハッシュが変わったものだけを
+      書き出し、最後に manifest.json を置き換える。削除されたゲームのファイルは消す
+    - ランチャーが読む games.json 形式には export_flat で書き出せる
+
+保存と保存の間の編集ジャーナルは CatalogStore と同じ仕組み（games.d.journal）で、
+基準のハッシュは manifest.json の内容のハッシュになる。
+
+バックアップ（backup_dir を渡したとき）も保存と同じく変更したゲームの分だけ作る。
+保存でシャードを書き換える・消す前に、元のシャードを内容のハッシュの名前で
+backup/shards/objects/ に写し、元の manifest.json を backup/shards/manifests/<日時>.json に残す。
+変わっていないシャードは今のフォルダにあるので、どの版も manifest と objects と今のシャードから
+games.json 形式に戻せる（read_backup）。カタログ全体を読み直したり書き出したりはしない。
+
+コマンドラインから変換できる:
+    python shard_store.py split games.json games.d
+    python shard_store.py export games.d games.json
+    python shard_store.py backups games.d
+    python shard_store.py export-backup games.d <版> games.json
+"""
+import argparse
+import json
+import os
+import sys
+import uuid
+
+from datetime import datetime
+
+from backup_store import DEFAULT_BACKUP_DIR, TIMESTAMP_FORMAT, game_hash
+from catalog import collation_key
+from catalog_store import CatalogStore, atomic_write_bytes, content_hash, serialize_games
+from game_record import Game, json_default
+
+MANIFEST_FILE = "manifest.json"
+SHARD_DIRNAME = "games"
+MANIFEST_VERSION = 1
+SHARD_BACKUP_DIRNAME = "shards"
+
+
+def is_sharded(path):
+    """シャード形式のフォルダかどうか"""
+    return os.path.isdir(path)
+
+
+def _stub(entry):
+    return Game(name=entry["name"])
+
+
+class ShardedCatalogStore(CatalogStore):
+    """シャード形式のカタログの読み込み・保存（CatalogStore と同じ使い方ができる）
+
+    Args:
+        directory (str): シャード形式のフォルダ（例: games.d）
+        backup_dir (str): バックアップフォルダ（None ならバックアップを作らない）
+    """
+
+    def __init__(self, directory, backup_dir=None):
+        directory = directory.rstrip("/\\")
+        super().__init__(directory)
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, MANIFEST_FILE)
+        self.shard_dir = os.path.join(directory, SHARD_DIRNAME)
+        self.backup_dir = os.path.join(backup_dir, SHARD_BACKUP_DIRNAME) if backup_dir else None
+        self._manifest_data = None  # 直前に読み込んだ・保存した manifest.json の内容（バックアップ用）
+        self.shards_read = 0      # 読み込んだシャードの数
+        self.shards_written = 0   # 直近の保存で書き出したシャードの数
+        # id(ゲーム) → [ゲーム, マニフェストの項目, 本体を読み込んだか]
+        # ゲームへの参照を持っておくので、id が別のゲームに使い回されることはない
+        self._records = {}
+
+    # --- 読み込み ------------------------------------------------------
+
+    def load(self):
+        """manifest.json を読み込み、名前だけのゲーム（スタブ）のリストを返す"""
+        self._records = {}
+        self._manifest_data = None
+        if not os.path.exists(self.manifest_path):
+            self.base_hash = None
+            return []
+        with open(self.manifest_path, 'rb') as f:
+            data = f.read()
+        self.base_hash = content_hash(data)
+        self._manifest_data = data
+        manifest = json.loads(data.decode('utf-8'))
+
+        games = []
+        for entry in manifest.get("games", []):
+            game = _stub(entry)
+            self._records[id(game)] = [game, entry, False]
+            games.append(game)
+        return games
+
+    def iter_load(self, progress=None, **kwargs):
+        """manifest.json は小さいので、スタブをまとめて1回で返す"""
+        games = self.load()
+        if progress is not None:
+            progress(1, 1)
+        if games:
+            yield games
+
+    def is_loaded(self, game):
+        """ゲームの本体が読み込まれているか（スタブでなければ True）"""
+        record = self._records.get(id(game))
+        if record is None or record[2]:
+            return True
+        # 編集ジャーナルの再生などで中身が置き換えられていればスタブではない
+        return game != _stub(record[1])
+
+    def ensure_loaded(self, game):
+        """スタブならシャードから本体を読み込む（辞書をその場で書き換える）
+
+        Returns:
+            bool: 新しく読み込んだかどうか
+        """
+        record = self._records.get(id(game))
+        if record is None or record[2]:
+            return False
+        record[2] = True
+        if game != _stub(record[1]):
+            return False
+        game.fill_from_dict(self.read_shard(record[1]["file"]))
+        return True
+
+    def read_shard(self, file_name):
+        with open(os.path.join(self.shard_dir, file_name), 'r', encoding='utf-8') as f:
+            self.shards_read += 1
+            return json.load(f)
+
+    def full_games(self, games):
+        """ゲームの本体のリスト（スタブはシャードから読むが、games 自体は書き換えない）"""
+        result = []
+        for game in games:
+            record = self._records.get(id(game))
+            if record is not None and not self.is_loaded(game):
+                result.append(self.read_shard(record[1]["file"]))
+            else:
+                result.append(game)
+        return result
+
+    def saved_bytes(self):
+        """シャード形式のバックアップは save の中で変わったシャードの分だけ作るので、常に None"""
+        return None
+
+    # --- バックアップ ----------------------------------------------------
+
+    def list_backups(self):
+        """バックアップの版（日時）の一覧（古い順）"""
+        manifests_dir = os.path.join(self.backup_dir, "manifests") if self.backup_dir else None
+        if manifests_dir is None or not os.path.isdir(manifests_dir):
+            return []
+        return sorted(name[:-len(".json")] for name in os.listdir(manifests_dir) if name.endswith(".json"))
+
+    def read_backup(self, version):
+        """バックアップの版のゲームのリスト（games.json 形式の辞書）
+
+        Raises:
+            OSError: 版やシャードが見つからない
+        """
+        with open(os.path.join(self.backup_dir, "manifests", version + ".json"), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        games = []
+        for entry in manifest.get("games", []):
+            path = os.path.join(self.backup_dir, "objects", entry["sha256"] + ".json")
+            if not os.path.exists(path):
+                # 書き換えられていないシャードは今のフォルダにある
+                path = os.path.join(self.shard_dir, entry["file"])
+            with open(path, 'r', encoding='utf-8') as f:
+                games.append(json.load(f))
+        return games
+
+    def _backup_shard(self, entry):
+        """書き換える・消す前のシャードを objects/<ハッシュ>.json に写す（写してあれば何もしない）"""
+        if self.backup_dir is None:
+            return
+        path = os.path.join(self.backup_dir, "objects", entry["sha256"] + ".json")
+        if os.path.exists(path):
+            return
+        try:
+            with open(os.path.join(self.shard_dir, entry["file"]), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write_bytes(path, data)
+
+    def _backup_manifest(self):
+        """置き換える前の manifest.json を manifests/<日時>.json に残す"""
+        if self.backup_dir is None or self._manifest_data is None:
+            return
+        manifests_dir = os.path.join(self.backup_dir, "manifests")
+        os.makedirs(manifests_dir, exist_ok=True)
+        version = datetime.now().strftime(TIMESTAMP_FORMAT)
+        path = os.path.join(manifests_dir, version + ".json")
+        suffix = 1
+        while os.path.exists(path):
+            path = os.path.join(manifests_dir, f"{version}_{suffix}.json")
+            suffix += 1
+        atomic_write_bytes(path, self._manifest_data)
+
+    # --- 保存 ----------------------------------------------------------
+
+    def save(self, games, ids, revision):
+        """変わったゲームのシャードだけを書き出し、manifest.json を置き換える"""
+        os.makedirs(self.shard_dir, exist_ok=True)
+        records = {}
+        entries = []
+        written = 0
+        for game in games:
+            record = self._records.get(id(game))
+            if record is not None and not self.is_loaded(game):
+                entry = record[1]
+            else:
+                old_entry = record[1] if record is not None else None
+                entry = self._write_if_changed(game, old_entry)
+                if entry is not old_entry:
+                    written += 1
+            records[id(game)] = [game, entry, self.is_loaded(game) if record is not None else True]
+            entries.append(entry)
+
+        manifest = {"version": MANIFEST_VERSION, "games": entries}
+        data = json.dumps(manifest, ensure_ascii=False, indent=1).encode('utf-8')
+        if data != self._manifest_data:
+            self._backup_manifest()
+        atomic_write_bytes(self.manifest_path, data)
+
+        # 削除されたゲームのシャードを消す（manifest.json を置き換えた後なので途中で止まっても壊れない）
+        kept = {entry["file"] for entry in entries}
+        for record in self._records.values():
+            if record[1]["file"] not in kept:
+                self._backup_shard(record[1])
+                try:
+                    os.remove(os.path.join(self.shard_dir, record[1]["file"]))
+                except OSError:
+                    pass
+
+        self._records = records
+        self.shards_written = written
+        self.base_hash = content_hash(data)
+        self._manifest_data = data
+        self.discard_journal()
+        self.begin(ids, revision)
+
+    def _write_if_changed(self, game, entry):
+        """内容が変わっていればシャードを書き出して新しい項目を返す（変わっていなければ entry）"""
+        digest = game_hash(game)
+        name = game.get("name", "")
+        if entry is not None and entry["sha256"] == digest:
+            return entry
+        if entry is not None:
+            self._backup_shard(entry)
+        file_name = entry["file"] if entry is not None else uuid.uuid4().hex[:16] + ".json"
+        atomic_write_bytes(os.path.join(self.shard_dir, file_name),
+                           json.dumps(game, ensure_ascii=False, indent=2, default=json_default).encode('utf-8'))
+        return {"file": file_name, "name": name, "sort_key": collation_key(name), "sha256": digest}
+
+
+def export_flat(store, games, path):
+    """games.json 形式（1つの配列）で書き出す"""
+    atomic_write_bytes(path, serialize_games(store.full_games(games)).encode('utf-8'))
+
+
+def split_flat(json_file, directory):
+    """games.json をシャード形式に変換
+
+    Returns:
+        int: 書き出したゲームの数
+    """
+    with open(json_file, 'r', encoding='utf-8') as f:
+        games = json.load(f)
+    games.sort(key=lambda game: collation_key(game.get("name", "")))
+    store = ShardedCatalogStore(directory)
+    store.load()
+    store.save(games, list(range(len(games))), 0)
+    store.discard_journal()
+    return len(games)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="games.json とシャード形式を相互に変換します")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    split_parser = subparsers.add_parser("split", help="games.json をシャード形式に変換")
+    split_parser.add_argument("json_file", help="変換元の games.json")
+    split_parser.add_argument("directory", help="シャード形式のフォルダ")
+    export_parser = subparsers.add_parser("export", help="シャード形式を games.json 形式で書き出す")
+    export_parser.add_argument("directory", help="シャード形式のフォルダ")
+    export_parser.add_argument("json_file", help="書き出し先")
+    backups_parser = subparsers.add_parser("backups", help="バックアップの版の一覧")
+    backups_parser.add_argument("directory", help="シャード形式のフォルダ")
+    export_backup_parser = subparsers.add_parser("export-backup", help="バックアップの版を games.json 形式で書き出す")
+    export_backup_parser.add_argument("directory", help="シャード形式のフォルダ")
+    export_backup_parser.add_argument("version", help="版（backups で表示される日時）")
+    export_backup_parser.add_argument("json_file", help="書き出し先")
+    for command_parser in (backups_parser, export_backup_parser):
+        command_parser.add_argument("--backup-dir", default=DEFAULT_BACKUP_DIR, help="バックアップフォルダ")
+    args = parser.parse_args(argv)
+
+    if args.command == "split":
+        count = split_flat(args.json_file, args.directory)
+        print(f"{count}件のゲームを {args.directory} に書き出しました")
+    elif args.command == "export":
+        store = ShardedCatalogStore(args.directory)
+        games = store.load()
+        export_flat(store, games, args.json_file)
+        print(f"{len(games)}件のゲームを {args.json_file} に書き出しました")
+    elif args.command == "backups":
+        for version in ShardedCatalogStore(args.directory, backup_dir=args.backup_dir).list_backups():
+            print(version)
+    else:
+        store = ShardedCatalogStore(args.directory, backup_dir=args.backup_dir)
+        try:
+            games = store.read_backup(args.version)
+        except OSError as e:
+            print(f"バックアップを読めません: {str(e)}", file=sys.stderr)
+            return 1
+        atomic_write_bytes(args.json_file, serialize_games(games).encode('utf-8'))
+        print(f"{len(games)}件のゲームを {args.json_file} に書き出しました")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+"""ゲームアイコン（image フィールド）のサムネイルキャッシュ
+
+2段のキャッシュを持つ。
+    - メモリ: デコード済みの画像（呼び出し側が作った PhotoImage など）を件数上限つきのLRUで保持
+    - ディスク: 縮小したPNGを .thumbnail_cache/ に保存し、合計サイズが上限を超えたら
+      最近使っていないものから削除する
+ダウンロードはワーカースレッドで並行して行う。選択中のゲームの画像を最優先で読み込み、
+前後のゲームの画像は先読みする（先読み対象が変わったら、まだ始まっていない先読みは取り消す）。
+
+Pillow がインストールされていれば、ワーカースレッドでJPEG・WebPなども含めて縮小して
+PNGにする。Pillow がない場合はPNG・GIFだけを扱い、縮小はUI側（PhotoImage.subsample）で行って
+store_thumbnail でディスクに保存する。
+
+このモジュールは tkinter を import しない。結果は poll で取り出す。
+"""
+import hashlib
+import io
+import os
+import threading
+import urllib.request
+from collections import OrderedDict, deque, namedtuple
+
+from catalog_store import atomic_write_bytes
+from url_checker import USER_AGENT, DEFAULT_TIMEOUT
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+DEFAULT_CACHE_DIR = ".thumbnail_cache"
+THUMBNAIL_SIZE = 64                      # サムネイルの最大の幅・高さ（ピクセル）
+DEFAULT_MEMORY_ITEMS = 64                # メモリに置くサムネイルの数
+DEFAULT_DISK_BYTES = 20 * 1024 * 1024    # ディスクキャッシュの上限（バイト）
+MAX_DOWNLOAD_BYTES = 5 * 1024 * 1024     # これより大きい画像はダウンロードしない
+DEFAULT_WORKERS = 4
+
+# Pillow なしで PhotoImage が読める形式のシグネチャ
+_TK_SIGNATURES = (b"\x89PNG\r\n\x1a\n", b"GIF87a", b"GIF89a")
+
+# 読み込み結果
+#   data: 画像のバイト列（失敗時は None）
+#   thumbnail: data がすでに縮小済みのサムネイル（ディスクキャッシュ・Pillowで縮小）かどうか
+#   error: 失敗した理由
+ThumbnailResult = namedtuple("ThumbnailResult", "url data thumbnail error")
+
+
+def fetch_image(url, timeout=DEFAULT_TIMEOUT, max_bytes=MAX_DOWNLOAD_BYTES):
+    """画像をダウンロード
+
+    Returns:
+        bytes: 画像のバイト列
+
+    Raises:
+        OSError: ダウンロードに失敗した、または大きすぎる
+    """
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        data = response.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise OSError("画像が大きすぎます")
+    return data
+
+
+def tk_readable(data):
+    """Pillow なしの PhotoImage で読める形式かどうか"""
+    return data.startswith(_TK_SIGNATURES)
+
+
+def make_thumbnail(data, size=THUMBNAIL_SIZE):
+    """Pillow で縮小してPNGにする（Pillow がなければ None）"""
+    if Image is None:
+        return None
+    with Image.open(io.BytesIO(data)) as image:
+        image.thumbnail((size, size))
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        output = io.BytesIO()
+        image.save(output, format="PNG")
+    return output.getvalue()
+
+
+class ThumbnailCache:
+    """メモリとディスクの2段のサムネイルキャッシュと、バックグラウンドの読み込み
+
+    Args:
+        cache_dir (str): ディスクキャッシュのフォルダ
+        size (int): サムネイルの最大の幅・高さ
+        memory_items (int): メモリに置くサムネイルの数
+        disk_bytes (int): ディスクキャッシュの合計サイズの上限
+        max_workers (int): 同時にダウンロードする数
+        fetch_func (callable): URLから画像のバイト列を返す関数（テスト用に差し替えられる）
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, size=THUMBNAIL_SIZE, memory_items=DEFAULT_MEMORY_ITEMS,
+                 disk_bytes=DEFAULT_DISK_BYTES, max_workers=DEFAULT_WORKERS, fetch_func=None):
+        self.cache_dir = cache_dir
+        self.size = size
+        self.memory_items = memory_items
+        self.disk_bytes = disk_bytes
+        self.fetch_func = fetch_func or fetch_image
+
+        self._memory = OrderedDict()
+        self._condition = threading.Condition()
+        self._queue = deque()        # 読み込み待ちのURL（先頭から処理）
+        self._prefetched = set()     # _queue のうち先読みで積んだURL
+        self._in_flight = set()
+        self._results = deque()
+        self._stopping = False
+        self._threads = [threading.Thread(target=self._run, name=f"thumbnail-{i}", daemon=True)
+                         for i in range(max_workers)]
+        for thread in self._threads:
+            thread.start()
+
+    # --- メモリキャッシュ（UIスレッドから使う） --------------------------
+
+    def get(self, url):
+        """メモリにあるサムネイル（なければ None）"""
+        if url not in self._memory:
+            return None
+        self._memory.move_to_end(url)
+        return self._memory[url]
+
+    def put(self, url, image):
+        """デコード済みのサムネイルをメモリに置く（古いものから追い出す）"""
+        self._memory[url] = image
+        self._memory.move_to_end(url)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def __contains__(self, url):
+        return url in self._memory
+
+    # --- 読み込み ------------------------------------------------------
+
+    def request(self, url):
+        """URLを最優先で読み込む"""
+        with self._condition:
+            if url in self._in_flight:
+                return
+            if url in self._queue:
+                self._queue.remove(url)
+            self._prefetched.discard(url)
+            self._queue.appendleft(url)
+            self._condition.notify()
+
+    def prefetch(self, urls):
+        """URLを先読みする（前回の先読みのうち、まだ始まっていないものは取り消す）"""
+        with self._condition:
+            wanted = [url for url in urls if url and url not in self._memory and url not in self._in_flight]
+            for url in self._prefetched - set(wanted):
+                self._queue.remove(url)
+            self._prefetched.intersection_update(wanted)
+            for url in wanted:
+                if url not in self._queue:
+                    self._queue.append(url)
+                    self._prefetched.add(url)
+            self._condition.notify_all()
+
+    @property
+    def pending(self):
+        """読み込み待ち・読み込み中・未取得の結果があるかどうか"""
+        with self._condition:
+            return bool(self._queue or self._in_flight or self._results)
+
+    def poll(self):
+        """読み込みが終わった結果を取り出す
+
+        Returns:
+            list: ThumbnailResult のリスト
+        """
+        with self._condition:
+            results = list(self._results)
+            self._results.clear()
+        return results
+
+    def store_thumbnail(self, url, png_data):
+        """UI側で縮小したサムネイル（PNG）をディスクに保存"""
+        self._write_disk(url, png_data)
+
+    def shutdown(self):
+        with self._condition:
+            self._stopping = True
+            self._queue.clear()
+            self._prefetched.clear()
+            self._condition.notify_all()
+
+    # --- ディスクキャッシュ -------------------------------------------
+
+    def disk_path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".png")
+
+    def _read_disk(self, url):
+        path = self.disk_path(url)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # 最近使ったものとして残す
+            return data
+        except OSError:
+            return None
+
+    def _write_disk(self, url, data):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            atomic_write_bytes(self.disk_path(url), data)
+            self._trim_disk()
+        except OSError:
+            pass  # キャッシュに書けなくても表示はできる
+
+    def _trim_disk(self):
+        """ディスクキャッシュが上限を超えていたら、最近使っていないものから削除"""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(".png"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        if total <= self.disk_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.disk_bytes:
+                break
+
+    # --- ワーカースレッド ------------------------------------------------
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._stopping:
+                    self._condition.wait()
+                if self._stopping:
+                    return
+                url = self._queue.popleft()
+                self._prefetched.discard(url)
+                self._in_flight.add(url)
+            result = self._load(url)
+            with self._condition:
+                self._in_flight.discard(url)
+                if not self._stopping:
+                    self._results.append(result)
+
+    def _load(self, url):
+        data = self._read_disk(url)
+        if data is not None:
+            return ThumbnailResult(url, data, True, None)
+        try:
+            data = self.fetch_func(url)
+        except (OSError, ValueError) as e:
+            reason = getattr(e, "reason", None) or getattr(e, "code", None) or e
+            return ThumbnailResult(url, None, False, f"ダウンロードできません ({reason})")
+
+        try:
+            thumbnail = make_thumbnail(data, self.size)
+        except Exception:
+            # Pillow でも読めない画像
+            return ThumbnailResult(url, None, False, "画像を読み込めません")
+        if thumbnail is not None:
+            self._write_disk(url, thumbnail)
+            return ThumbnailResult(url, thumbnail, True, None)
+        if not tk_readable(data):
+            return ThumbnailResult(url, None, False, "PNG・GIF以外の画像の表示には Pillow が必要です")
+        return ThumbnailResult(url, data, False, None)
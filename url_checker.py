@@ -0,0 +1,372 @@
+"""URL検証エンジン
+
+ゲームエントリのURL（unityroomURL・GitHubURL・画像URL）をワーカープールで
+並行してチェックする。tkinterには依存しないので、結果はジョブのキューに積まれ、
+呼び出し側（UIスレッド）が root.after でポーリングして取り出す。
+
+チェック結果は UrlCheckCache でディスクにキャッシュでき、期限切れのURLは
+HEAD（ETag / Last-Modified があれば条件付き）で再検証する。
+"""
+import json
+import os
+import queue
+import threading
+import time
+import urllib.request
+import urllib.error
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from catalog_store import atomic_write_bytes
+from perf_trace import span
+
+# チェック対象のフィールドと表示名（表示順）
+URL_FIELDS = {
+    "unityroomurl": "unityroomURL",
+    "githuburl": "GitHubURL",
+    "image": "画像URL"
+}
+
+VALID_STATUS = "有効"
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+DEFAULT_TIMEOUT = 5
+
+# キャッシュ設定
+DEFAULT_CACHE_FILE = ".url_check_cache.json"
+DEFAULT_CACHE_TTL = 24 * 60 * 60      # 有効だったURLは1日
+DEFAULT_FAILURE_TTL = 10 * 60         # 失敗したURLは一時的な障害の可能性があるので10分
+DEFAULT_CACHE_SIZE = 2000
+
+# HEADを受け付けないサーバーが返すステータス（GETでやり直す）
+HEAD_UNSUPPORTED_CODES = (403, 405, 501)
+
+
+def check_single_url(url, timeout=DEFAULT_TIMEOUT):
+    """単一URLの有効性をチェック
+
+    Returns:
+        str: 有効な場合は "有効"、それ以外はエラー内容
+    """
+    try:
+        # User-Agentを設定してリクエスト
+        req = urllib.request.Request(url)
+        req.add_header('User-Agent', USER_AGENT)
+
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            if response.getcode() == 200:
+                return VALID_STATUS
+            else:
+                return f"エラー (HTTP {response.getcode()})"
+    except urllib.error.HTTPError as e:
+        return f"HTTPエラー ({e.code})"
+    except urllib.error.URLError as e:
+        return f"URLエラー ({str(e)})"
+    except Exception as e:
+        return f"エラー ({str(e)})"
+
+
+def _open_url(url, method, headers, timeout):
+    req = urllib.request.Request(url, headers=headers, method=method)
+    # 本文は読まずに閉じるので、GETでも画像全体はダウンロードしない
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        return response.getcode(), response.headers
+
+
+def revalidate_url(url, entry=None, timeout=DEFAULT_TIMEOUT):
+    """HEAD（必要ならGET）でURLを確認する
+
+    キャッシュエントリに ETag / Last-Modified があれば条件付きリクエストにし、
+    304 が返れば前回の結果をそのまま有効とみなす。
+
+    Returns:
+        tuple: (ステータス, ETag, Last-Modified)
+    """
+    headers = {'User-Agent': USER_AGENT}
+    if entry and entry.get("status") == VALID_STATUS:
+        if entry.get("etag"):
+            headers['If-None-Match'] = entry["etag"]
+        if entry.get("last_modified"):
+            headers['If-Modified-Since'] = entry["last_modified"]
+
+    try:
+        try:
+            code, response_headers = _open_url(url, 'HEAD', headers, timeout)
+        except urllib.error.HTTPError as e:
+            if e.code not in HEAD_UNSUPPORTED_CODES:
+                raise
+            code, response_headers = _open_url(url, 'GET', headers, timeout)
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return VALID_STATUS, entry.get("etag"), entry.get("last_modified")
+        return f"HTTPエラー ({e.code})", None, None
+    except urllib.error.URLError as e:
+        return f"URLエラー ({str(e)})", None, None
+    except Exception as e:
+        return f"エラー ({str(e)})", None, None
+
+    if code == 200:
+        return VALID_STATUS, response_headers.get('ETag'), response_headers.get('Last-Modified')
+    return f"エラー (HTTP {code})", None, None
+
+
+class UrlCheckCache:
+    """URLチェック結果のディスクキャッシュ
+
+    URLごとにステータス・ETag・Last-Modified・チェック時刻を保存する。
+    期限内の結果はそのまま返し、期限切れなら条件付きリクエストで再検証する。
+    件数が max_entries を超えたら最も長く使われていないものから捨てる（LRU）。
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_FILE, ttl=DEFAULT_CACHE_TTL,
+                 failure_ttl=DEFAULT_FAILURE_TTL, max_entries=DEFAULT_CACHE_SIZE):
+        self.path = path
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def load(self):
+        """キャッシュファイルを読み込む（壊れていれば空から始める）"""
+        entries = OrderedDict()
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                # ファイル上は古い順に並んでいる
+                for item in data.get("entries", []):
+                    entries[item["url"]] = item
+            except Exception:
+                entries = OrderedDict()
+        with self._lock:
+            self._entries = entries
+            self._evict()
+            self._dirty = False
+
+    def save(self):
+        """変更があればキャッシュファイルに書き出す"""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": 1, "entries": list(self._entries.values())}
+            self._dirty = False
+        # 監査と取り込み時の確認が同時に保存しても混ざらないように、一意な一時ファイルから置き換える
+        atomic_write_bytes(self.path, json.dumps(data, ensure_ascii=False).encode('utf-8'))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+
+    def get(self, url):
+        """キャッシュエントリを取得（LRU順を更新）"""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+                return dict(entry)
+            return None
+
+    def put(self, url, status, etag=None, last_modified=None, checked_at=None):
+        with self._lock:
+            self._entries[url] = {
+                "url": url,
+                "status": status,
+                "etag": etag,
+                "last_modified": last_modified,
+                "checked_at": checked_at if checked_at is not None else time.time(),
+            }
+            self._entries.move_to_end(url)
+            self._evict()
+            self._dirty = True
+
+    def is_fresh(self, entry, now=None):
+        """エントリが期限内かどうか"""
+        if entry is None:
+            return False
+        now = now if now is not None else time.time()
+        ttl = self.ttl if entry.get("status") == VALID_STATUS else self.failure_ttl
+        return now - entry.get("checked_at", 0) < ttl
+
+    def check(self, url, timeout=DEFAULT_TIMEOUT):
+        """キャッシュを使ってURLをチェック"""
+        entry = self.get(url)
+        fresh = self.is_fresh(entry)
+        with self._lock:
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if fresh:
+            return entry["status"]
+
+        status, etag, last_modified = revalidate_url(url, entry, timeout)
+        self.put(url, status, etag, last_modified)
+        return status
+
+    def _evict(self):
+        # self._lock を保持した状態で呼ぶこと
+        while self.max_entries and len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def collect_url_targets(game_data):
+    """ゲームデータからチェック対象の (フィールド, 表示名, URL) を取り出す"""
+    targets = []
+    for field, label in URL_FIELDS.items():
+        url = (game_data.get(field) or "").strip()
+        if url:
+            targets.append((field, label, url))
+    return targets
+
+
+class UrlCheckJob:
+    """1エントリ分のURLチェック
+
+    ワーカーは完了するたびに (フィールド, 表示名, ステータス) をキューに積む。
+    キャンセル後に届いた結果は捨てられる。
+    """
+
+    def __init__(self, targets):
+        self.targets = targets
+        self.results = {}
+        self._events = queue.Queue()
+        self._futures = []
+        self._cancel_event = threading.Event()
+        self._done_event = threading.Event()
+        self._lock = threading.Lock()
+        if not targets:
+            self._done_event.set()
+
+    @property
+    def total(self):
+        return len(self.targets)
+
+    @property
+    def completed(self):
+        with self._lock:
+            return len(self.results)
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    @property
+    def done(self):
+        return self._done_event.is_set()
+
+    def cancel(self):
+        """未開始のチェックを取り消し、以降の結果を無視する"""
+        self._cancel_event.set()
+        for future in self._futures:
+            future.cancel()
+        self._done_event.set()
+
+    def wait(self, timeout=None):
+        """全チェックの完了（またはキャンセル）を待つ"""
+        return self._done_event.wait(timeout)
+
+    def poll(self):
+        """前回のpoll以降に完了した結果を返す（UIスレッドから呼ぶ）"""
+        events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def summary(self):
+        """保存時の確認ダイアログ用に結果をまとめる"""
+        results = []
+        valid_count = 0
+        with self._lock:
+            finished = dict(self.results)
+
+        for field, label, _ in self.targets:
+            status = finished.get(field)
+            if status is None:
+                continue
+            if status == VALID_STATUS:
+                valid_count += 1
+                results.append(f"✅ {label}: {status}")
+            else:
+                results.append(f"❌ {label}: {status}")
+
+        total_count = len(self.targets)
+        return {
+            'has_urls': total_count > 0,
+            'total_count': total_count,
+            'valid_count': valid_count,
+            'all_valid': valid_count == total_count and total_count > 0,
+            'results': results
+        }
+
+    def _run_one(self, check_func, field, label, url):
+        if self.cancelled:
+            return
+        with span("url.check", url=url):
+            status = check_func(url)
+        if self.cancelled:
+            return
+        with self._lock:
+            self.results[field] = status
+            finished = len(self.results) == len(self.targets)
+        self._events.put((field, label, status))
+        if finished:
+            self._done_event.set()
+
+
+class UrlChecker:
+    """URLチェック用のワーカープール"""
+
+    def __init__(self, max_workers=4, timeout=DEFAULT_TIMEOUT, check_func=None, cache=None):
+        self.timeout = timeout
+        self.cache = cache
+        if check_func is None:
+            if cache is not None:
+                check_func = lambda url: cache.check(url, self.timeout)
+            else:
+                check_func = lambda url: check_single_url(url, self.timeout)
+        self._check_func = check_func
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="url-check")
+
+    def check(self, url):
+        """単一URLを同期的にチェック"""
+        return self._check_func(url)
+
+    def start(self, game_data):
+        """ゲームデータ内のURLチェックを開始してジョブを返す"""
+        job = UrlCheckJob(collect_url_targets(game_data))
+        for field, label, url in job.targets:
+            job._futures.append(self._executor.submit(job._run_one, self._check_func, field, label, url))
+        return job
+
+    def check_game(self, game_data, timeout=None):
+        """ゲームデータ内のURLを並行チェックし、完了まで待って結果をまとめる"""
+        job = self.start(game_data)
+        job.wait(timeout)
+        self.save_cache()
+        return job.summary()
+
+    def save_cache(self):
+        """キャッシュがあればディスクに書き出す"""
+        if self.cache is not None:
+            try:
+                self.cache.save()
+            except OSError:
+                pass
+
+    def shutdown(self):
+        """実行待ちのチェックを破棄してプールを閉じる"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.save_cache()